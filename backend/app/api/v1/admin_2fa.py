@@ -173,7 +173,7 @@ async def disable_2fa(
     
     # Verify password (you should verify against hashed password)
     from ...services.auth_service import auth_service
-    if not auth_service.verify_password(request.password, current_user.hashed_password):
+    if not await auth_service.verify_password_async(request.password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password"
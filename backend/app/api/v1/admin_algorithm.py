@@ -11,6 +11,7 @@ from datetime import datetime
 from ...core.database import get_db
 from ...models.admin import AdminUser, SystemSetting
 from ...core.admin_auth import get_current_admin_user, require_super_admin
+from ...services.valuation_cache import valuation_cache
 
 router = APIRouter(prefix="/admin/algorithm", tags=["admin-algorithm"])
 
@@ -179,6 +180,7 @@ async def update_algorithm_setting(
     
     db.commit()
     db.refresh(setting)
+    valuation_cache.settings_changed()
     
     return {
         "key": setting.key,
@@ -229,6 +231,7 @@ async def reset_algorithm_setting(
     
     db.commit()
     db.refresh(setting)
+    valuation_cache.settings_changed()
     
     return {
         "key": setting.key,
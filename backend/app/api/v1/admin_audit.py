@@ -11,9 +11,15 @@ from ...core.database import get_db
 from ...models.admin import AdminUser, AuditLog
 from ...core.admin_auth import get_current_admin_user, require_admin_or_super_admin
 from ...services.audit_service import AuditService
+from ...services.streaming_export import export_query_response
 
 router = APIRouter(prefix="/admin/audit", tags=["admin-audit"])
 
+AUDIT_CSV_FIELDS = [
+    "id", "timestamp", "admin_user_id", "admin_email", "action",
+    "resource_type", "resource_id", "description", "ip_address", "user_agent"
+]
+
 
 class AuditLogResponse(BaseModel):
     """Response model for audit log"""
@@ -75,7 +81,8 @@ async def get_audit_logs(
         start_date=start_date,
         end_date=end_date,
         limit=limit,
-        offset=offset
+        offset=offset,
+        with_admin=True
     )
     
     total = AuditService.get_audit_log_count(
@@ -156,32 +163,11 @@ async def get_audit_stats(
     
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    # Get all logs in the period
-    all_logs = AuditService.get_audit_logs(
-        db=db,
-        start_date=start_date,
-        limit=10000
-    )
-    
-    # Calculate statistics
-    total_logs = len(all_logs)
-    logs_by_action = {}
-    logs_by_resource_type = {}
-    logs_by_admin = {}
-    
-    for log in all_logs:
-        # By action
-        logs_by_action[log.action] = logs_by_action.get(log.action, 0) + 1
-        
-        # By resource type
-        logs_by_resource_type[log.resource_type] = logs_by_resource_type.get(log.resource_type, 0) + 1
-        
-        # By admin
-        admin_name = log.admin_user.full_name if log.admin_user else f"User {log.admin_user_id}"
-        logs_by_admin[admin_name] = logs_by_admin.get(admin_name, 0) + 1
+    # Counts are aggregated in SQL over the whole period
+    stats = AuditService.get_audit_stats(db=db, start_date=start_date)
     
     # Get recent activity (last 20)
-    recent_logs = AuditService.get_audit_logs(db=db, limit=20)
+    recent_logs = AuditService.get_audit_logs(db=db, limit=20, with_admin=True)
     recent_activity = [
         AuditLogResponse(
             id=log.id,
@@ -202,10 +188,10 @@ async def get_audit_stats(
     ]
     
     return AuditLogStatsResponse(
-        total_logs=total_logs,
-        logs_by_action=logs_by_action,
-        logs_by_resource_type=logs_by_resource_type,
-        logs_by_admin=logs_by_admin,
+        total_logs=stats["total_logs"],
+        logs_by_action=stats["logs_by_action"],
+        logs_by_resource_type=stats["logs_by_resource_type"],
+        logs_by_admin=stats["logs_by_admin"],
         recent_activity=recent_activity
     )
 
@@ -217,49 +203,25 @@ async def export_audit_logs_csv(
     resource_type: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
+    compress: bool = Query(False, description="Gzip the download"),
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Export audit logs as CSV"""
-    import csv
-    from io import StringIO
-    from fastapi.responses import Response
-    
-    logs = AuditService.export_audit_logs(
-        db=db,
-        admin_user_id=admin_user_id,
-        action=action,
-        resource_type=resource_type,
-        start_date=start_date,
-        end_date=end_date
-    )
-    
-    # Create CSV
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=[
-        "id", "timestamp", "admin_user_id", "admin_email", "action",
-        "resource_type", "resource_id", "description", "ip_address", "user_agent"
-    ])
-    writer.writeheader()
-    
-    for log in logs:
-        writer.writerow({
-            "id": log["id"],
-            "timestamp": log["timestamp"],
-            "admin_user_id": log["admin_user_id"],
-            "admin_email": log["admin_email"],
-            "action": log["action"],
-            "resource_type": log["resource_type"],
-            "resource_id": log["resource_id"],
-            "description": log["description"],
-            "ip_address": log["ip_address"],
-            "user_agent": log["user_agent"]
-        })
-    
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
+    """Export audit logs as CSV (streamed)"""
+    return export_query_response(
+        lambda session: AuditService.export_query(
+            db=session,
+            admin_user_id=admin_user_id,
+            action=action,
+            resource_type=resource_type,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        AuditService.export_record,
+        export_format="csv",
+        filename="audit_logs",
+        fieldnames=AUDIT_CSV_FIELDS,
+        compress=compress
     )
 
 
@@ -270,20 +232,24 @@ async def export_audit_logs_json(
     resource_type: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
+    ndjson: bool = Query(False, description="One JSON object per line instead of a JSON array"),
+    compress: bool = Query(False, description="Gzip the download"),
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Export audit logs as JSON"""
-    from fastapi.responses import JSONResponse
-    
-    logs = AuditService.export_audit_logs(
-        db=db,
-        admin_user_id=admin_user_id,
-        action=action,
-        resource_type=resource_type,
-        start_date=start_date,
-        end_date=end_date
+    """Export audit logs as JSON (streamed)"""
+    return export_query_response(
+        lambda session: AuditService.export_query(
+            db=session,
+            admin_user_id=admin_user_id,
+            action=action,
+            resource_type=resource_type,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        AuditService.export_record,
+        export_format="ndjson" if ndjson else "json",
+        filename="audit_logs",
+        compress=compress
     )
-    
-    return JSONResponse(content=logs)
 
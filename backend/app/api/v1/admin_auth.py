@@ -161,7 +161,7 @@ async def admin_login(
             )
         
         # Verify password
-        if not auth_service.verify_password(login_data.password, admin_user.hashed_password):
+        if not await auth_service.verify_password_async(login_data.password, admin_user.hashed_password):
             if two_factor_available:
                 try:
                     TwoFactorService.record_failed_login(db, admin_user)
@@ -532,7 +532,7 @@ async def reset_password(
             )
         
         # Update password
-        admin_user.hashed_password = auth_service.get_password_hash(request.new_password)
+        admin_user.hashed_password = await auth_service.get_password_hash_async(request.new_password)
         db.commit()
         
         # Send password reset confirmation email via Brevo
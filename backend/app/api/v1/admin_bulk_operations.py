@@ -4,17 +4,35 @@ Bulk Operations API for Admin Panel
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List, Optional
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional, Set
+import asyncio
 import csv
 import io
+import itertools
+import logging
 
 from ...core.database import get_db
 from ...models.admin import AdminUser
-from ...models.user import User
+from ...models.user import User, UserRole
 from ...core.admin_auth import require_admin_or_super_admin
 from ...services.audit_service import AuditService
+from ...services.streaming_export import export_value, export_query_response
 
 router = APIRouter(prefix="/admin/bulk", tags=["admin-bulk-operations"])
+logger = logging.getLogger(__name__)
+
+# CSV rows validated, hashed and inserted per round
+IMPORT_CHUNK_ROWS = 500
+MAX_REPORTED_ERRORS = 100
+
+USER_EXPORT_FIELDS = [
+    "id", "email", "username", "full_name", "company_name", "user_role",
+    "subscription_tier", "is_active", "is_verified", "created_at"
+]
 
 
 class BulkOperationRequest(BaseModel):
@@ -32,52 +50,68 @@ class BulkOperationResponse(BaseModel):
     errors: List[str] = []
 
 
-@router.post("/users/activate", response_model=BulkOperationResponse)
-async def bulk_activate_users(
-    request: BulkOperationRequest,
-    current_user: AdminUser = Depends(require_admin_or_super_admin),
-    db: Session = Depends(get_db)
-):
-    """Bulk activate users"""
-    processed = 0
-    failed = 0
-    errors = []
+def _set_users_active(
+    db: Session,
+    user_ids: List[int],
+    is_active: bool,
+    current_user: AdminUser
+) -> BulkOperationResponse:
+    """Flip is_active for a set of users with one UPDATE ... RETURNING"""
+    from ...core.principal_versions import principal_versions
     
-    for user_id in request.user_ids:
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                user.is_active = True
-                processed += 1
-                
-                # Log audit action
-                AuditService.log_update(
-                    db=db,
-                    admin_user_id=current_user.id,
-                    resource_type="user",
-                    resource_id=str(user_id),
-                    old_values={"is_active": False},
-                    new_values={"is_active": True},
-                    description=f"Bulk activated user: {user.email}"
-                )
-            else:
-                failed += 1
-                errors.append(f"User {user_id} not found")
-        except Exception as e:
-            failed += 1
-            errors.append(f"Error processing user {user_id}: {str(e)}")
+    ids = list(dict.fromkeys(user_ids))
+    verb = "activated" if is_active else "deactivated"
+    if not ids:
+        return BulkOperationResponse(success=False, message=f"{verb.capitalize()} 0 user(s)", processed=0, failed=0)
+    
+    # Only rows whose state actually changes are updated (and audited)
+    changed = db.execute(
+        update(User)
+        .where(User.id.in_(ids), User.is_active.is_distinct_from(is_active))
+        .values(is_active=is_active, updated_at=func.now())
+        .returning(User.id, User.email)
+    ).all()
+    changed_ids = {row.id for row in changed}
     
+    # Users not returned either already had the target state or do not exist
+    unchanged = [user_id for user_id in ids if user_id not in changed_ids]
+    existing = set(db.execute(select(User.id).where(User.id.in_(unchanged))).scalars()) if unchanged else set()
+    missing = [user_id for user_id in unchanged if user_id not in existing]
     db.commit()
     
+    for row in changed:
+        # Core UPDATEs are not seen by the session hooks that invalidate cached user snapshots
+        principal_versions.bump("user", row.id, row.email)
+        AuditService.log_update(
+            db=db,
+            admin_user_id=current_user.id,
+            resource_type="user",
+            resource_id=str(row.id),
+            old_values={"is_active": not is_active},
+            new_values={"is_active": is_active},
+            description=f"Bulk {verb} user: {row.email}"
+        )
+    
+    processed = len(ids) - len(missing)
     return BulkOperationResponse(
         success=processed > 0,
-        message=f"Activated {processed} user(s)",
+        message=f"{verb.capitalize()} {processed} user(s)",
         processed=processed,
-        failed=failed,
-        errors=errors
+        failed=len(missing),
+        errors=[f"User {user_id} not found" for user_id in missing]
     )
 
 
+@router.post("/users/activate", response_model=BulkOperationResponse)
+async def bulk_activate_users(
+    request: BulkOperationRequest,
+    current_user: AdminUser = Depends(require_admin_or_super_admin),
+    db: Session = Depends(get_db)
+):
+    """Bulk activate users"""
+    return _set_users_active(db, request.user_ids, True, current_user)
+
+
 @router.post("/users/deactivate", response_model=BulkOperationResponse)
 async def bulk_deactivate_users(
     request: BulkOperationRequest,
@@ -85,151 +119,216 @@ async def bulk_deactivate_users(
     db: Session = Depends(get_db)
 ):
     """Bulk deactivate users"""
-    processed = 0
-    failed = 0
-    errors = []
-    
-    for user_id in request.user_ids:
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                user.is_active = False
-                processed += 1
-                
-                # Log audit action
-                AuditService.log_update(
-                    db=db,
-                    admin_user_id=current_user.id,
-                    resource_type="user",
-                    resource_id=str(user_id),
-                    old_values={"is_active": True},
-                    new_values={"is_active": False},
-                    description=f"Bulk deactivated user: {user.email}"
-                )
-            else:
-                failed += 1
-                errors.append(f"User {user_id} not found")
-        except Exception as e:
-            failed += 1
-            errors.append(f"Error processing user {user_id}: {str(e)}")
-    
-    db.commit()
-    
-    return BulkOperationResponse(
-        success=processed > 0,
-        message=f"Deactivated {processed} user(s)",
-        processed=processed,
-        failed=failed,
-        errors=errors
-    )
+    return _set_users_active(db, request.user_ids, False, current_user)
 
 
 @router.post("/users/export")
 async def export_users_csv(
     user_ids: Optional[List[int]] = None,
+    format: str = "csv",
+    compress: bool = False,
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Export users to CSV"""
-    from fastapi.responses import Response
-    
-    query = db.query(User)
-    if user_ids:
-        query = query.filter(User.id.in_(user_ids))
-    
-    users = query.all()
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=[
-        "id", "email", "username", "full_name", "company_name", "user_role",
-        "subscription_tier", "is_active", "is_verified", "created_at"
-    ])
-    writer.writeheader()
+    """Export users to CSV (or NDJSON/JSON), streamed from a server-side cursor"""
+    def build_query(session: Session):
+        query = session.query(User)
+        if user_ids:
+            query = query.filter(User.id.in_(user_ids))
+        return query.order_by(User.id)
     
-    for user in users:
-        writer.writerow({
+    def to_record(user: User):
+        return {
             "id": user.id,
             "email": user.email,
             "username": user.username,
             "full_name": user.full_name,
             "company_name": user.company_name,
             "user_role": user.user_role.value if hasattr(user.user_role, 'value') else str(user.user_role),
-            "subscription_tier": user.subscription_tier.value if hasattr(user.subscription_tier, 'value') else str(user.subscription_tier),
+            "subscription_tier": export_value(getattr(user, 'subscription_tier', None)),  # column removed with subscriptions
             "is_active": user.is_active,
             "is_verified": user.is_verified,
-            "created_at": user.created_at.isoformat()
-        })
+            "created_at": user.created_at.isoformat() if user.created_at else None
+        }
     
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=users_export.csv"}
+    return export_query_response(
+        build_query,
+        to_record,
+        export_format=format,
+        filename="users_export",
+        fieldnames=USER_EXPORT_FIELDS,
+        compress=compress
     )
 
 
+def _parse_import_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one CSV row and turn it into users column values (password still in clear)"""
+    email = (row.get('email') or '').strip().lower()
+    full_name = (row.get('full_name') or '').strip()
+    if not email or '@' not in email:
+        raise ValueError("missing or invalid email")
+    if not full_name:
+        raise ValueError("missing full_name")
+    try:
+        user_role = UserRole((row.get('user_role') or 'others').strip())
+    except ValueError:
+        raise ValueError(f"unknown user_role '{row.get('user_role')}'")
+    return {
+        "email": email,
+        "username": (row.get('username') or '').strip() or email.split('@')[0],
+        "password": row.get('password') or 'TempPassword123!',
+        "full_name": full_name,
+        "company_name": row.get('company_name') or '',
+        "user_role": user_role,
+        "is_active": (row.get('is_active') or 'true').strip().lower() == 'true',
+        "is_verified": (row.get('is_verified') or 'false').strip().lower() == 'true',
+    }
+
+
+def _insert_users(db: Session, values: List[Dict[str, Any]]) -> List[Any]:
+    """Multi-row INSERT that skips rows conflicting with existing users; returns inserted (id, email)"""
+    insert_stmt = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert_stmt(User).values(values).on_conflict_do_nothing().returning(User.id, User.email)
+    return db.execute(statement).all()
+
+
+async def _hash_passwords(passwords: List[str]) -> List[Any]:
+    """Hash on the bcrypt pool, never holding more than its worker count so logins keep their queue room"""
+    from ...services.auth_service import auth_service
+    from ...services.password_hasher import password_hashing_pool
+    
+    limit = asyncio.Semaphore(password_hashing_pool.max_workers)
+    
+    async def hash_one(password: str):
+        async with limit:
+            return await auth_service.get_password_hash_async(password)
+    
+    return await asyncio.gather(*(hash_one(p) for p in passwords), return_exceptions=True)
+
+
 @router.post("/users/import")
 async def import_users_csv(
     file: UploadFile = File(...),
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Import users from CSV"""
-    from ...services.auth_service import auth_service
-    
-    content = await file.read()
-    csv_content = content.decode('utf-8')
-    reader = csv.DictReader(io.StringIO(csv_content))
-    
+    """Import users from CSV in chunks: bulk inserts, parallel hashing, per-row errors"""
     processed = 0
     failed = 0
-    errors = []
+    errors: List[str] = []
+    
+    def fail(line: int, email: Optional[str], reason: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(f"Row {line} ({email or 'unknown'}): {reason}")
     
-    for row in reader:
-        try:
-            # Check if user exists
-            existing = db.query(User).filter(User.email == row['email']).first()
-            if existing:
-                errors.append(f"User {row['email']} already exists")
-                failed += 1
+    # The upload is read from its spooled file chunk by chunk instead of decoded whole
+    text_stream = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text_stream)
+    seen_emails: Set[str] = set()
+    seen_usernames: Set[str] = set()
+    line = 1
+    
+    try:
+        while True:
+            rows = await run_in_threadpool(lambda: list(itertools.islice(reader, IMPORT_CHUNK_ROWS)))
+            if not rows:
+                break
+            
+            # Validate and drop duplicates inside the file
+            candidates = []
+            for row in rows:
+                line += 1
+                try:
+                    values = _parse_import_row(row)
+                except ValueError as e:
+                    fail(line, row.get('email'), str(e))
+                    continue
+                if values["email"] in seen_emails or values["username"] in seen_usernames:
+                    fail(line, values["email"], "duplicate email or username in file")
+                    continue
+                seen_emails.add(values["email"])
+                seen_usernames.add(values["username"])
+                candidates.append((line, values))
+            
+            # One lookup for users that already exist
+            if candidates:
+                emails = [v["email"] for _, v in candidates]
+                usernames = [v["username"] for _, v in candidates]
+                taken = db.execute(
+                    select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+                ).all()
+                taken_emails = {row.email for row in taken}
+                taken_usernames = {row.username for row in taken}
+                fresh = []
+                for row_line, values in candidates:
+                    if values["email"] in taken_emails:
+                        fail(row_line, values["email"], "user already exists")
+                    elif values["username"] in taken_usernames:
+                        fail(row_line, values["email"], f"username '{values['username']}' already taken")
+                    else:
+                        fresh.append((row_line, values))
+                candidates = fresh
+            if not candidates:
                 continue
             
-            # Create user
-            user = User(
-                email=row['email'],
-                username=row.get('username', row['email'].split('@')[0]),
-                hashed_password=auth_service.get_password_hash(row.get('password', 'TempPassword123!')),
-                full_name=row['full_name'],
-                company_name=row.get('company_name', ''),
-                user_role=row.get('user_role', 'others'),
-                subscription_tier=row.get('subscription_tier', 'free'),
-                is_active=row.get('is_active', 'true').lower() == 'true',
-                is_verified=row.get('is_verified', 'false').lower() == 'true'
-            )
+            hashes = await _hash_passwords([values.pop("password") for _, values in candidates])
+            ready = []
+            for (row_line, values), hashed in zip(candidates, hashes):
+                if isinstance(hashed, Exception):
+                    fail(row_line, values["email"], f"password hashing failed: {hashed}")
+                    continue
+                values["hashed_password"] = hashed
+                ready.append((row_line, values))
+            if not ready:
+                continue
             
-            db.add(user)
-            processed += 1
+            rejected: Set[int] = set()
+            try:
+                inserted = _insert_users(db, [values for _, values in ready])
+                db.commit()
+            except Exception as e:
+                # Some row is invalid for the database: insert this chunk row by row
+                db.rollback()
+                logger.warning(f"Bulk user insert failed ({e.__class__.__name__}), retrying row by row")
+                inserted = []
+                for row_line, values in ready:
+                    try:
+                        inserted.extend(_insert_users(db, [values]))
+                        db.commit()
+                    except Exception as row_error:
+                        db.rollback()
+                        rejected.add(row_line)
+                        fail(row_line, values["email"], str(row_error).split("\n")[0])
             
-            # Log audit action
-            AuditService.log_create(
-                db=db,
-                admin_user_id=current_user.id,
-                resource_type="user",
-                resource_id=str(user.id),
-                new_values={"email": user.email, "full_name": user.full_name},
-                description=f"Bulk imported user: {user.email}"
-            )
-        except Exception as e:
-            failed += 1
-            errors.append(f"Error importing user {row.get('email', 'unknown')}: {str(e)}")
-    
-    db.commit()
+            inserted_emails = {row.email for row in inserted}
+            for row_line, values in ready:
+                if values["email"] not in inserted_emails and row_line not in rejected:
+                    # Skipped by ON CONFLICT DO NOTHING: created concurrently
+                    fail(row_line, values["email"], "user already exists")
+            
+            for row in inserted:
+                processed += 1
+                AuditService.log_create(
+                    db=db,
+                    admin_user_id=current_user.id,
+                    resource_type="user",
+                    resource_id=str(row.id),
+                    new_values={"email": row.email},
+                    description=f"Bulk imported user: {row.email}"
+                )
+    except UnicodeDecodeError:
+        fail(line + 1, None, "file is not valid UTF-8; import stopped")
+    except csv.Error as e:
+        fail(line + 1, None, f"malformed CSV ({e}); import stopped")
+    finally:
+        text_stream.detach()
     
     return BulkOperationResponse(
         success=processed > 0,
         message=f"Imported {processed} user(s), {failed} failed",
         processed=processed,
         failed=failed,
-        errors=errors[:10]  # Limit errors returned
+        errors=errors
     )
-
@@ -13,6 +13,7 @@ from ...core.database import get_db
 from ...core.admin_auth import get_current_admin_user
 from ...services.fmv_report_service import FMVReportService
 from ...services.fmv_email_service import FMVEmailService
+from ...services.streaming_export import export_query_response
 from ...schemas.fmv_report import FMVReportResponse, StatusTransition, FMVReportUpdate
 from ...models.fmv_report import FMVReportStatus
 from pydantic import BaseModel
@@ -148,6 +149,68 @@ def get_fmv_email_service():
     return _fmv_email_service
 
 
+REPORT_EXPORT_FIELDS = [
+    "id", "user_id", "report_type", "status", "unit_count", "amount_paid", "payment_status",
+    "assigned_analyst", "created_at", "submitted_at", "completed_at", "delivered_at",
+    "turnaround_deadline", "pdf_url", "manufacturer", "model", "year"
+]
+
+
+@router.get("/export")
+async def export_admin_reports(
+    status_filter: Optional[str] = None,
+    format: str = "csv",
+    compress: bool = False,
+    current_user = Depends(get_current_admin_user)
+):
+    """Export all FMV reports (CSV, NDJSON or JSON), streamed from a server-side cursor"""
+    from ...models.fmv_report import FMVReport
+    
+    status_value = None
+    if status_filter:
+        try:
+            status_value = FMVReportStatus(status_filter)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown status: {status_filter}")
+    
+    def build_query(session: Session):
+        query = session.query(FMVReport)
+        if status_value is not None:
+            query = query.filter(FMVReport.status == status_value)
+        return query.order_by(FMVReport.id)
+    
+    def to_record(report) -> Dict[str, Any]:
+        crane_details = report.crane_details if isinstance(report.crane_details, dict) else {}
+        return {
+            "id": report.id,
+            "user_id": report.user_id,
+            "report_type": report.report_type,
+            "status": report.status,
+            "unit_count": report.unit_count,
+            "amount_paid": report.amount_paid,
+            "payment_status": report.payment_status,
+            "assigned_analyst": report.assigned_analyst,
+            "created_at": report.created_at,
+            "submitted_at": report.submitted_at,
+            "completed_at": report.completed_at,
+            "delivered_at": report.delivered_at,
+            "turnaround_deadline": report.turnaround_deadline,
+            "pdf_url": report.pdf_url,
+            "manufacturer": crane_details.get("manufacturer"),
+            "model": crane_details.get("model"),
+            "year": crane_details.get("year"),
+        }
+    
+    return export_query_response(
+        build_query,
+        to_record,
+        export_format=format,
+        filename="fmv_reports_export",
+        fieldnames=REPORT_EXPORT_FIELDS,
+        compress=compress
+    )
+
+
 @router.get("", response_model=Dict[str, Any])
 async def get_admin_reports(
     status_filter: Optional[str] = None,
@@ -6,13 +6,13 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import json
 
 from ...core.database import get_db
 from ...models.admin import AdminUser
 from ...models.user import User
 from ...core.admin_auth import require_admin_or_super_admin
 from ...services.audit_service import AuditService
+from ...services.streaming_export import export_value, stream_query, json_object_chunks, streaming_export_response
 
 router = APIRouter(prefix="/admin/gdpr", tags=["admin-gdpr"])
 
@@ -35,6 +35,51 @@ class GDPRExportResponse(BaseModel):
     created_at: datetime
 
 
+def _user_profile(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "full_name": user.full_name,
+        "company_name": user.company_name,
+        "user_role": user.user_role.value if hasattr(user.user_role, 'value') else str(user.user_role),
+        "subscription_tier": export_value(getattr(user, 'subscription_tier', None)),  # column removed with subscriptions
+        "created_at": user.created_at.isoformat(),
+        "last_login": user.last_login.isoformat() if user.last_login else None
+    }
+
+
+def _report_record(report) -> Dict[str, Any]:
+    return {
+        "id": report.id,
+        "report_type": report.report_type.value if hasattr(report.report_type, 'value') else str(report.report_type),
+        "status": report.status.value if hasattr(report.status, 'value') else str(report.status),
+        "amount_paid": float(report.amount_paid) if report.amount_paid else None,
+        "created_at": report.created_at.isoformat()
+    }
+
+
+def _payment_record(payment) -> Dict[str, Any]:
+    return {
+        "id": payment.id,
+        "amount": payment.amount,
+        "status": payment.status,
+        "created_at": payment.created_at.isoformat()
+    }
+
+
+def _user_data_sections() -> List[tuple]:
+    """(section name, model, record builder) for every table exported for a user"""
+    from ...models.fmv_report import FMVReport
+    from ...models.payment import Payment, Refund
+    
+    return [
+        ("fmv_reports", FMVReport, _report_record),
+        ("payments", Payment, _payment_record),
+        ("refunds", Refund, _payment_record),
+    ]
+
+
 @router.post("/export/{user_id}", response_model=GDPRExportResponse)
 async def export_user_data(
     user_id: int,
@@ -50,56 +95,10 @@ async def export_user_data(
         )
     
     # Collect all user data
-    from ...models.fmv_report import FMVReport
-    from ...models.payment import Payment, Refund
-    
-    user_data = {
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "username": user.username,
-            "full_name": user.full_name,
-            "company_name": user.company_name,
-            "user_role": user.user_role.value if hasattr(user.user_role, 'value') else str(user.user_role),
-            "subscription_tier": user.subscription_tier.value if hasattr(user.subscription_tier, 'value') else str(user.subscription_tier),
-            "created_at": user.created_at.isoformat(),
-            "last_login": user.last_login.isoformat() if user.last_login else None
-        },
-        "fmv_reports": [],
-        "payments": [],
-        "refunds": []
-    }
-    
-    # Get FMV reports
-    reports = db.query(FMVReport).filter(FMVReport.user_id == user_id).all()
-    for report in reports:
-        user_data["fmv_reports"].append({
-            "id": report.id,
-            "report_type": report.report_type.value if hasattr(report.report_type, 'value') else str(report.report_type),
-            "status": report.status.value if hasattr(report.status, 'value') else str(report.status),
-            "amount_paid": float(report.amount_paid) if report.amount_paid else None,
-            "created_at": report.created_at.isoformat()
-        })
-    
-    # Get payments
-    payments = db.query(Payment).filter(Payment.user_id == user_id).all()
-    for payment in payments:
-        user_data["payments"].append({
-            "id": payment.id,
-            "amount": payment.amount,
-            "status": payment.status,
-            "created_at": payment.created_at.isoformat()
-        })
-    
-    # Get refunds
-    refunds = db.query(Refund).filter(Refund.user_id == user_id).all()
-    for refund in refunds:
-        user_data["refunds"].append({
-            "id": refund.id,
-            "amount": refund.amount,
-            "status": refund.status,
-            "created_at": refund.created_at.isoformat()
-        })
+    user_data = {"user": _user_profile(user)}
+    for section, model, to_record in _user_data_sections():
+        rows = db.query(model).filter(model.user_id == user_id).all()
+        user_data[section] = [to_record(row) for row in rows]
     
     # Log audit action
     AuditService.log_view(
@@ -188,17 +187,37 @@ async def list_gdpr_requests(
 @router.get("/export/{user_id}/download")
 async def download_user_data(
     user_id: int,
+    compress: bool = False,
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
-    """Download user data export as JSON file"""
-    from fastapi.responses import Response
+    """Download user data export as a JSON file, streamed section by section"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
-    export_data = await export_user_data(user_id, current_user, db)
+    sections: Dict[str, Any] = {"user": _user_profile(user)}
+    for section, model, to_record in _user_data_sections():
+        rows = stream_query(
+            lambda session, model=model: session.query(model).filter(model.user_id == user_id).order_by(model.id)
+        )
+        sections[section] = (to_record(row) for row in rows)
+    
+    AuditService.log_view(
+        db=db,
+        admin_user_id=current_user.id,
+        resource_type="user",
+        resource_id=str(user_id),
+        description=f"Exported GDPR data for user: {user.email}"
+    )
     
-    return Response(
-        content=json.dumps(export_data.user_data, indent=2),
-        media_type="application/json",
-        headers={"Content-Disposition": f"attachment; filename=user_{user_id}_data_export.json"}
+    return streaming_export_response(
+        json_object_chunks(sections),
+        export_format="json",
+        filename=f"user_{user_id}_data_export",
+        compress=compress
     )
 
@@ -1,18 +1,30 @@
 """
 System Health Monitoring API
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from datetime import datetime
-import psutil
 import os
 
-from ...core.database import get_db, engine
+from ...core.config import settings
+from ...core.database import get_db, get_pool_metrics
 from ...models.admin import AdminUser
-from ...core.admin_auth import require_admin_or_super_admin
+from ...core.admin_auth import require_admin_or_super_admin, require_super_admin
+from ...core.admin_principal_cache import admin_principal_cache, admin_last_seen
+from ...core.token_verifier import token_verifier
+from ...services.audit_pipeline import audit_event_writer
+from ...services.system_metrics import system_metrics
+from ...services.service_container import services
+from ...services.valuation_cache import valuation_cache
+from ...services.fleet_valuation import fleet_valuation_executor
+from ...services.valuation_profiler import valuation_profiler
+from ...services.valuation_pipeline import valuation_pipeline
+from ...services.chart_cache import chart_artifact_cache
+from ...services.data_loader import data_loader
 
 router = APIRouter(prefix="/admin/system", tags=["admin-system-health"])
 
@@ -36,8 +48,17 @@ class PerformanceMetricsResponse(BaseModel):
     database_query_times: Dict[str, float]
 
 
+class ValuationProfilerSettings(BaseModel):
+    """Runtime valuation profiler settings (omitted fields are left unchanged)"""
+    enabled: Optional[bool] = None
+    slow_ms: Optional[float] = None
+    profile_sample_rate: Optional[float] = None
+    reset: bool = False
+
+
 @router.get("/health", response_model=SystemHealthResponse)
 async def get_system_health(
+    request: Request,
     current_user: AdminUser = Depends(require_admin_or_super_admin),
     db: Session = Depends(get_db)
 ):
@@ -61,32 +82,73 @@ async def get_system_health(
         health_status = "down"
         issues.append(f"Database error: {str(e)}")
     
+    # Connection pool metrics for every registered engine
+    try:
+        db_status["connection_pools"] = get_pool_metrics()
+        primary_pool = db_status["connection_pools"].get("primary", {})
+        if primary_pool.get("checkout_timeouts"):
+            issues.append("Database connection pool checkouts have timed out")
+            if health_status == "healthy":
+                health_status = "degraded"
+    except Exception as e:
+        db_status["connection_pools"] = {"error": str(e)}
+    
     # Check API status
     api_status = {"status": "healthy", "endpoints": []}
     # In a real implementation, you'd check actual API endpoints
     
+    # Per-request auth overhead: token verification and principal caches
+    api_status["auth_caches"] = {
+        "token_verifier": token_verifier.get_stats(),
+        "admin_principals": admin_principal_cache.get_stats(),
+        "admin_last_seen": admin_last_seen.get_stats(),
+    }
+    
+    # Shared valuation engines: how often each was built vs. looked up, result and adjustment memo hit rates
+    api_status["service_container"] = services.get_stats()
+    api_status["valuation_cache"] = valuation_cache.get_stats()
+    api_status["valuation_pipeline"] = valuation_pipeline.get_stats()
+    api_status["fleet_valuation"] = fleet_valuation_executor.get_stats()
+    api_status["analytics_charts"] = chart_artifact_cache.get_stats()
+    
+    # Startup: routers still waiting for their first request, and whether the valuation datasets have loaded
+    routers = getattr(request.app.state, "routers", None)
+    api_status["routers"] = routers.get_stats() if routers is not None else None
+    api_status["datasets"] = data_loader.get_status()
+    
+    # Audit/security event pipeline: queue depth and spill state
+    audit_stats = audit_event_writer.get_stats()
+    api_status["audit_pipeline"] = audit_stats
+    if audit_stats["spill_file_bytes"] or audit_stats["queue_depth"] > audit_stats["max_queue"] * 0.8:
+        issues.append("Audit events are backing up (queue nearly full or spilled to disk)")
+        if health_status == "healthy":
+            health_status = "degraded"
+    
     # Check server resources
     server_resources = {}
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # Latest background sample plus p50/p95 history; nothing is measured on the request path
+        sample = system_metrics.latest()
+        cpu_percent = sample["cpu_percent"]
         
         server_resources = {
             "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_gb": round(memory.available / (1024**3), 2),
-            "disk_percent": disk.percent,
-            "disk_free_gb": round(disk.free / (1024**3), 2)
+            "memory_percent": sample["memory_percent"],
+            "memory_available_gb": round(sample["memory_available_mb"] / 1024, 2),
+            "disk_percent": sample["disk_percent"],
+            "disk_free_gb": sample["disk_free_gb"],
+            "loop_lag_ms": sample["loop_lag_ms"],
+            "sample_age_seconds": sample["age_seconds"],
+            "history": system_metrics.window_stats()
         }
         
         if cpu_percent > 90:
             issues.append("High CPU usage")
             health_status = "degraded"
-        if memory.percent > 90:
+        if sample["memory_percent"] > 90:
             issues.append("High memory usage")
             health_status = "degraded"
-        if disk.percent > 90:
+        if sample["disk_percent"] > 90:
             issues.append("Low disk space")
             health_status = "degraded"
     except Exception as e:
@@ -124,15 +186,9 @@ async def get_database_status(
         db.execute(text("SELECT 1"))
         response_time = (datetime.utcnow() - start).total_seconds() * 1000
         
-        # Get connection pool info
-        pool = engine.pool
-        pool_status = {
-            "size": pool.size(),
-            "checked_in": pool.checkedin(),
-            "checked_out": pool.checkedout(),
-            "overflow": pool.overflow(),
-            "invalid": pool.invalid()
-        }
+        # Get connection pool info (including checkout wait times) for all registered engines
+        pool_metrics = get_pool_metrics()
+        pool_status = pool_metrics.get("primary", {})
         
         # Get database size (PostgreSQL specific)
         db_size = None
@@ -147,6 +203,7 @@ async def get_database_status(
             "status": "healthy",
             "response_time_ms": round(response_time, 2),
             "connection_pool": pool_status,
+            "connection_pools": pool_metrics,
             "database_size_gb": db_size,
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -190,6 +247,58 @@ async def get_performance_metrics(
     )
 
 
+@router.get("/valuation/metrics", response_class=PlainTextResponse)
+async def get_valuation_metrics(
+    current_user: AdminUser = Depends(require_admin_or_super_admin)
+):
+    """Valuation stage duration histograms in Prometheus text format"""
+    return PlainTextResponse(valuation_profiler.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/valuation/profile")
+async def get_valuation_profile(
+    limit: int = 30,
+    current_user: AdminUser = Depends(require_admin_or_super_admin)
+):
+    """Per-stage latency summary, recent slow valuations and the sampled cProfile report"""
+    stats = valuation_profiler.get_stats()
+    stats["profile_report"] = valuation_profiler.profile_report(limit=limit)
+    return stats
+
+
+@router.put("/valuation/profile")
+async def update_valuation_profile(
+    profiler_settings: ValuationProfilerSettings,
+    current_user: AdminUser = Depends(require_super_admin)
+):
+    """Toggle stage timing and the sampling profiler at runtime (this worker process only)"""
+    if profiler_settings.reset:
+        valuation_profiler.reset()
+    valuation_profiler.configure(
+        enabled=profiler_settings.enabled,
+        slow_ms=profiler_settings.slow_ms,
+        profile_sample_rate=profiler_settings.profile_sample_rate,
+    )
+    stats = valuation_profiler.get_stats()
+    return {key: stats[key] for key in ("enabled", "slow_ms", "profile_sample_rate", "profiled_valuations", "since")}
+
+
+@router.post("/datasets/reload")
+async def reload_datasets(
+    current_user: AdminUser = Depends(require_super_admin)
+):
+    """Re-read the valuation datasets; with shared datasets enabled every worker swaps to them without a restart"""
+    from starlette.concurrency import run_in_threadpool
+    try:
+        status = await run_in_threadpool(data_loader.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dataset reload failed: {e}")
+    if settings.shared_datasets_enabled:
+        from ...services.shared_datasets import shared_dataset_store
+        status["store"] = shared_dataset_store.get_stats()
+    return status
+
+
 @router.get("/errors/recent")
 async def get_recent_errors(
     limit: int = 50,
@@ -144,7 +144,7 @@ async def create_admin_user(
     new_user = AdminUser(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=auth_service.get_password_hash(user_data.password),
+        hashed_password=await auth_service.get_password_hash_async(user_data.password),
         full_name=user_data.full_name,
         admin_role=user_data.admin_role,
         permissions=user_data.permissions,
@@ -326,7 +326,7 @@ async def update_admin_user(
         admin_user.admin_role = user_data.admin_role
     
     if user_data.password is not None:
-        admin_user.hashed_password = auth_service.get_password_hash(user_data.password)
+        admin_user.hashed_password = await auth_service.get_password_hash_async(user_data.password)
     
     if user_data.permissions is not None:
         admin_user.permissions = user_data.permissions
@@ -10,7 +10,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import logging
 
-from ...services.advanced_analytics import advanced_analytics_service
+from ...services.advanced_analytics import advanced_analytics_service, ANALYTICS_CHARTS
 from ...api.v1.auth import get_current_user, User
 
 logger = logging.getLogger(__name__)
@@ -201,10 +201,14 @@ async def get_analytics_charts(
     start_date: Optional[datetime] = Query(default=None),
     end_date: Optional[datetime] = Query(default=None),
     chart_types: Optional[str] = Query(default="all"),
+    chart_format: str = Query(default="html", alias="format", regex="^(html|json)$"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get analytics charts and visualizations
+    
+    ``format=json`` returns the Plotly figure specs instead of embeddable HTML.
+    Only the requested charts are rendered (served from the chart artifact cache).
     """
     try:
         if not start_date:
@@ -212,25 +216,17 @@ async def get_analytics_charts(
         if not end_date:
             end_date = datetime.now()
         
+        # Filter charts based on request
+        requested_charts = None if chart_types == "all" else chart_types.split(",")
         analytics = await advanced_analytics_service.generate_comprehensive_analytics(
-            start_date, end_date
+            start_date, end_date, chart_format=chart_format, chart_types=requested_charts
         )
         
-        # Filter charts based on request
-        if chart_types != "all":
-            requested_charts = chart_types.split(",")
-            filtered_charts = {
-                chart_name: chart_html 
-                for chart_name, chart_html in analytics["charts"].items()
-                if chart_name in requested_charts
-            }
-        else:
-            filtered_charts = analytics["charts"]
-        
         return {
             "success": True,
-            "charts": filtered_charts,
-            "available_charts": list(analytics["charts"].keys()),
+            "charts": analytics["charts"],
+            "format": chart_format,
+            "available_charts": list(ANALYTICS_CHARTS),
             "period": analytics["period"]
         }
         
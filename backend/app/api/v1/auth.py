@@ -196,7 +196,10 @@ async def register_user(request: UserRegistrationRequest, db: Session = Depends(
         
         # Hash password with proper error handling
         try:
-            hashed_password = auth_service.get_password_hash(request.password)
+            hashed_password = await auth_service.get_password_hash_async(request.password)
+        except HTTPException:
+            # Hashing pool saturated (429) - let the client back off and retry
+            raise
         except ValueError as e:
             # Handle password hashing errors with user-friendly message
             return AuthResponse(
@@ -420,6 +423,8 @@ async def register_user(request: UserRegistrationRequest, db: Session = Depends(
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         logger.error(f"Registration exception for email {request.email}: {e}", exc_info=True)
@@ -643,7 +648,7 @@ async def login_user(request: UserLoginRequest, db: Session = Depends(get_db)):
             )
         
         # Verify password
-        if not auth_service.verify_password(request.password, user.hashed_password):
+        if not await auth_service.verify_password_async(request.password, user.hashed_password):
             return AuthResponse(
                 success=False,
                 message="Login failed",
@@ -707,6 +712,8 @@ async def login_user(request: UserLoginRequest, db: Session = Depends(get_db)):
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {e}", exc_info=True)
         return AuthResponse(
@@ -902,7 +909,7 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
             )
         
         # Update password
-        user.hashed_password = auth_service.get_password_hash(request.new_password)
+        user.hashed_password = await auth_service.get_password_hash_async(request.new_password)
         
         # Mark token as used
         reset_token_record.used = True
@@ -935,6 +942,8 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
             message="Password has been reset successfully. You can now log in with your new password."
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         return AuthResponse(
             success=False,
@@ -1030,7 +1039,7 @@ async def confirm_password_reset(request: PasswordResetConfirmRequest, db: Sessi
             )
         
         # Update password
-        user.hashed_password = auth_service.get_password_hash(request.new_password)
+        user.hashed_password = await auth_service.get_password_hash_async(request.new_password)
         user.updated_at = datetime.utcnow()
         db.commit()
         
@@ -1042,6 +1051,8 @@ async def confirm_password_reset(request: PasswordResetConfirmRequest, db: Sessi
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         return AuthResponse(
@@ -78,7 +78,7 @@ async def login(request: AuthRequest, db: Session = Depends(get_db)):
         print(f"User found: {user.email}, verified: {user.is_verified}, active: {user.is_active}")
         
         # Verify password
-        if not auth_service.verify_password(request.password, user.hashed_password):
+        if not await auth_service.verify_password_async(request.password, user.hashed_password):
             print("Password verification failed")
             return AuthResponse(
                 success=False,
@@ -153,6 +153,8 @@ async def login(request: AuthRequest, db: Session = Depends(get_db)):
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Login error: {str(e)}")
         return AuthResponse(
@@ -189,7 +191,7 @@ async def signup(request: AuthRequest, db: Session = Depends(get_db)):
         # Create new user with all required fields
         new_user = User(
             email=request.email,
-            hashed_password=auth_service.get_password_hash(request.password),
+            hashed_password=await auth_service.get_password_hash_async(request.password),
             full_name=request.full_name if hasattr(request, 'full_name') and request.full_name else request.email.split('@')[0],
             username=request.username if hasattr(request, 'username') and request.username else request.email.split('@')[0],
             company_name=request.company_name if hasattr(request, 'company_name') and request.company_name else "",
@@ -417,6 +419,8 @@ async def signup(request: AuthRequest, db: Session = Depends(get_db)):
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Signup error: {str(e)}")
         return AuthResponse(
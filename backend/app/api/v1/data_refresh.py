@@ -5,7 +5,7 @@ Handles data normalization and scraping operations
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel
 from datetime import datetime
@@ -280,6 +280,30 @@ async def enrich_crane_listing(
         logger.error(f"Error enriching crane listing: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/specs-catalog/enrich-batch", response_model=Dict[str, Any])
+async def enrich_crane_listings(
+    listings: List[Dict[str, Any]],
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Enrich a batch of crane listings with specification data in one pass
+    """
+    try:
+        enriched_listings = await asyncio.to_thread(specs_catalog_service.enrich_crane_listings, listings)
+        matched = sum(1 for listing in enriched_listings if listing.get('spec_data'))
+        
+        return {
+            "success": True,
+            "count": len(enriched_listings),
+            "matched": matched,
+            "enriched_listings": enriched_listings,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error enriching crane listings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Background task functions
 async def run_full_refresh():
     """Run full data refresh in background"""
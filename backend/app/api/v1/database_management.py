@@ -4,15 +4,17 @@ Provides real-time database table management, CRUD operations, and monitoring
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import text, inspect, MetaData
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
 from ...core.database import get_db, engine
+from ...core.schema_cache import schema_cache
 from ...core.auth import get_current_user
 from ...models.user import User
+from ...services.table_stats_service import table_stats_engine
 
 router = APIRouter()
 
@@ -195,11 +197,11 @@ async def get_database_tables(
 ):
     """Get all database tables with metadata and statistics"""
     try:
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        # Schema from the metadata cache, row counts for all tables in one catalog query
+        estimates = schema_cache.row_estimates(db)
         
         result = []
-        for table_name in tables:
+        for table_name in schema_cache.table_names():
             # Get table metadata (use predefined or generate default)
             metadata = TABLE_METADATA.get(table_name, {
                 "name": table_name.replace("_", " ").title(),
@@ -208,25 +210,12 @@ async def get_database_tables(
                 "color": "gray"
             })
             
-            # Get table statistics
-            try:
-                count_query = text(f"SELECT COUNT(*) FROM {table_name}")
-                count_result = db.execute(count_query)
-                record_count = count_result.scalar()
-            except Exception as e:
-                print(f"Error counting records in {table_name}: {e}")
-                record_count = 0
-            
-            # Get table columns
-            columns = inspector.get_columns(table_name)
-            column_count = len(columns)
-            
-            # Get table size (approximate) - simplified for SQLite
-            try:
-                # For SQLite, estimate size based on record count
-                table_size = record_count * 100  # Rough estimate
-            except:
-                table_size = 0
+            estimate = estimates.get(table_name, {})
+            record_count = estimate.get("rows", 0)
+            # Catalog size where the database reports one, otherwise a rough per-row estimate
+            table_size = estimate.get("size_bytes")
+            if table_size is None:
+                table_size = record_count * 100
             
             result.append({
                 "table_name": table_name,
@@ -235,7 +224,8 @@ async def get_database_tables(
                 "icon": metadata["icon"],
                 "color": metadata["color"],
                 "record_count": record_count,
-                "column_count": column_count,
+                "record_count_estimated": estimate.get("estimated", False),
+                "column_count": len(schema_cache.get_columns(table_name)),
                 "approximate_size": table_size,
                 "last_updated": datetime.now().isoformat()
             })
@@ -260,17 +250,15 @@ async def get_table_columns(
 ):
     """Get column information for a specific table"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
             )
         
-        columns = inspector.get_columns(table_name)
-        primary_keys = inspector.get_pk_constraint(table_name)
-        foreign_keys = inspector.get_foreign_keys(table_name)
+        columns = schema_cache.get_columns(table_name)
+        primary_keys = schema_cache.get_primary_key(table_name)
+        foreign_keys = schema_cache.get_foreign_keys(table_name)
         
         # Create foreign key lookup
         fk_lookup = {}
@@ -288,7 +276,7 @@ async def get_table_columns(
                 "type": str(column['type']),
                 "nullable": column['nullable'],
                 "default": str(column['default']) if column['default'] is not None else None,
-                "primary_key": column['name'] in primary_keys['constrained_columns'],
+                "primary_key": column['name'] in primary_keys,
                 "foreign_key": fk_lookup.get(column['name']),
                 "autoincrement": column.get('autoincrement', False),
                 "comment": column.get('comment')
@@ -322,16 +310,14 @@ async def get_table_records(
 ):
     """Get records from a specific table with pagination, search, and filtering"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
             )
         
         # Get table columns for search
-        columns = inspector.get_columns(table_name)
+        columns = schema_cache.get_columns(table_name)
         column_names = [col['name'] for col in columns]
         
         # Build base query
@@ -428,103 +414,41 @@ async def get_table_records(
 @router.get("/database/tables/{table_name}/stats")
 async def get_table_stats(
     table_name: str,
+    approximate: Optional[bool] = Query(None, description="Force sampled/catalog stats (default: automatic by table size)"),
+    refresh: bool = Query(False, description="Recompute instead of using cached stats"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get detailed statistics for a specific table"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
             )
         
-        # Get basic count
-        count_query = text(f"SELECT COUNT(*) as count FROM {table_name}")
-        count_result = db.execute(count_query).fetchone()
-        total_records = count_result[0] if count_result else 0
-        
-        # Get column statistics
-        columns = inspector.get_columns(table_name)
-        column_stats = {}
-        
-        for column in columns:
-            col_name = column['name']
-            col_type = str(column['type']).lower()
-            
-            stats = {
-                "name": col_name,
-                "type": col_type,
-                "nullable": column['nullable'],
-                "null_count": 0,
-                "unique_count": 0,
-                "distinct_count": 0
-            }
-            
-            # Get null count
-            null_query = text(f"SELECT COUNT(*) FROM {table_name} WHERE {col_name} IS NULL")
-            null_result = db.execute(null_query).fetchone()
-            stats["null_count"] = null_result[0] if null_result else 0
-            
-            # Get unique count
-            unique_query = text(f"SELECT COUNT(DISTINCT {col_name}) FROM {table_name}")
-            unique_result = db.execute(unique_query).fetchone()
-            stats["unique_count"] = unique_result[0] if unique_result else 0
-            
-            # Get distinct count (same as unique for most cases)
-            stats["distinct_count"] = stats["unique_count"]
-            
-            # For numeric columns, get min/max/avg
-            if 'int' in col_type or 'float' in col_type or 'numeric' in col_type or 'decimal' in col_type:
-                try:
-                    numeric_query = text(f"""
-                        SELECT 
-                            MIN({col_name}) as min_val,
-                            MAX({col_name}) as max_val,
-                            AVG({col_name}) as avg_val
-                        FROM {table_name} 
-                        WHERE {col_name} IS NOT NULL
-                    """)
-                    numeric_result = db.execute(numeric_query).fetchone()
-                    if numeric_result:
-                        stats["min_value"] = float(numeric_result[0]) if numeric_result[0] is not None else None
-                        stats["max_value"] = float(numeric_result[1]) if numeric_result[1] is not None else None
-                        stats["avg_value"] = float(numeric_result[2]) if numeric_result[2] is not None else None
-                except:
-                    pass
-            
-            # For string columns, get most common values
-            if 'varchar' in col_type or 'text' in col_type or 'string' in col_type:
-                try:
-                    common_query = text(f"""
-                        SELECT {col_name}, COUNT(*) as count 
-                        FROM {table_name} 
-                        WHERE {col_name} IS NOT NULL 
-                        GROUP BY {col_name} 
-                        ORDER BY count DESC 
-                        LIMIT 10
-                    """)
-                    common_result = db.execute(common_query).fetchall()
-                    stats["most_common_values"] = [
-                        {"value": row[0], "count": row[1]} 
-                        for row in common_result
-                    ]
-                except:
-                    pass
-            
-            column_stats[col_name] = stats
+        columns = schema_cache.get_columns(table_name)
+        # All column aggregates come from one scan (or pg_stats + TABLESAMPLE on large tables), cached
+        stats = table_stats_engine.get_table_stats(
+            db, table_name, columns, approximate=approximate, refresh=refresh
+        )
         
         return {
             "success": True,
             "table_name": table_name,
-            "total_records": total_records,
+            "total_records": stats["total_records"],
             "column_count": len(columns),
-            "column_stats": column_stats,
-            "last_updated": datetime.now().isoformat()
+            "column_stats": stats["column_stats"],
+            "approximate": stats["approximate"],
+            "sample_percent": stats.get("sample_percent"),
+            "computed_at": stats["computed_at"],
+            "cache_age_seconds": stats["cache_age_seconds"],
+            "stale_after_seconds": stats["stale_after_seconds"],
+            "last_updated": stats["computed_at"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -540,16 +464,14 @@ async def create_table_record(
 ):
     """Create a new record in a specific table"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
             )
         
         # Get table columns
-        columns = inspector.get_columns(table_name)
+        columns = schema_cache.get_columns(table_name)
         column_names = [col['name'] for col in columns]
         
         # Validate and prepare data
@@ -572,6 +494,7 @@ async def create_table_record(
         # Execute insert
         result = db.execute(insert_query, insert_data)
         db.commit()
+        table_stats_engine.invalidate(table_name)
         
         # Get the inserted record
         if hasattr(result, 'lastrowid') and result.lastrowid:
@@ -615,16 +538,14 @@ async def update_table_record(
 ):
     """Update a record in a specific table"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
             )
         
         # Get table columns
-        columns = inspector.get_columns(table_name)
+        columns = schema_cache.get_columns(table_name)
         column_names = [col['name'] for col in columns]
         
         # Check if record exists
@@ -659,6 +580,7 @@ async def update_table_record(
         # Execute update
         db.execute(update_query, update_data)
         db.commit()
+        table_stats_engine.invalidate(table_name)
         
         # Get updated record
         select_query = text(f"SELECT * FROM {table_name} WHERE id = :id")
@@ -700,9 +622,7 @@ async def delete_table_record(
 ):
     """Delete a record from a specific table"""
     try:
-        inspector = inspect(engine)
-        
-        if table_name not in inspector.get_table_names():
+        if not schema_cache.has_table(table_name):
             raise HTTPException(
                 status_code=404,
                 detail=f"Table '{table_name}' not found"
@@ -722,6 +642,7 @@ async def delete_table_record(
         delete_query = text(f"DELETE FROM {table_name} WHERE id = :id")
         db.execute(delete_query, {"id": record_id})
         db.commit()
+        table_stats_engine.invalidate(table_name)
         
         return {
             "success": True,
@@ -742,43 +663,21 @@ async def get_database_overview(
 ):
     """Get overall database statistics and health"""
     try:
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        # One catalog query for every table's row estimate and size
+        estimates = schema_cache.row_estimates(db)
         
-        total_tables = len(tables)
-        total_records = 0
-        total_size = 0
-        
-        table_stats = []
-        for table_name in tables:
-            # Get record count
-            try:
-                count_query = text(f"SELECT COUNT(*) FROM {table_name}")
-                count_result = db.execute(count_query)
-                record_count = count_result.scalar()
-            except Exception as e:
-                print(f"Error counting records in {table_name}: {e}")
-                record_count = 0
-            total_records += record_count
-            
-            # Get approximate size
-            try:
-                size_query = text(f"""
-                    SELECT SUM(LENGTH(CAST(*) AS TEXT)) as size
-                    FROM {table_name}
-                """)
-                size_result = db.execute(size_query).fetchone()
-                table_size = size_result[0] if size_result and size_result[0] else 0
-                total_size += table_size
-            except:
-                table_size = 0
-            
-            table_stats.append({
+        table_stats = [
+            {
                 "table_name": table_name,
-                "record_count": record_count,
-                "size": table_size,
+                "record_count": estimate["rows"],
+                "size": estimate["size_bytes"] or 0,
+                "estimated": estimate["estimated"],
                 "display_name": TABLE_METADATA.get(table_name, {}).get("name", table_name)
-            })
+            }
+            for table_name, estimate in estimates.items()
+        ]
+        total_records = sum(t["record_count"] for t in table_stats)
+        total_size = sum(t["size"] for t in table_stats)
         
         # Sort by record count
         table_stats.sort(key=lambda x: x["record_count"], reverse=True)
@@ -786,10 +685,11 @@ async def get_database_overview(
         return {
             "success": True,
             "overview": {
-                "total_tables": total_tables,
+                "total_tables": len(table_stats),
                 "total_records": total_records,
                 "total_size": total_size,
-                "database_type": "SQLite",
+                "database_type": "PostgreSQL" if engine.dialect.name == "postgresql" else "SQLite",
+                "schema_cache": schema_cache.get_stats(),
                 "last_updated": datetime.now().isoformat()
             },
             "table_stats": table_stats[:10],  # Top 10 tables by record count
@@ -11,13 +11,10 @@ from datetime import datetime
 import json
 
 from ...services.valuation_engine_unified import (
-    UnifiedValuationEngine as EnhancedValuationEngine,
     ValuationResult,
     CraneSpecs
 )
-# Backward compatibility aliases
-BloombergReportGenerator = None  # Will be implemented in unified engine if needed
-SpecsCatalogService = None  # Will be implemented in unified engine if needed
+from ...services.service_container import services
 from ...api.v1.auth import get_current_user
 from ...models.user import User
 
@@ -83,8 +80,8 @@ async def value_crane(
     Perform comprehensive crane valuation with Bloomberg-style analysis
     """
     try:
-        # Initialize the enhanced valuation engine
-        engine = EnhancedValuationEngine()
+        # Shared enhanced valuation engine (one market data session per process)
+        engine = services.get("enhanced_valuation_engine")
         
         # Convert request to dictionary
         request_data = request.dict()
@@ -134,8 +131,8 @@ async def get_specs_catalog(
     Get crane specifications from catalog
     """
     try:
-        # Initialize the specs service
-        specs_service = SpecsCatalogService()
+        # Shared specs service
+        specs_service = services.get("enhanced_specs_catalog")
         
         # Get filtered catalog
         catalog_data = await specs_service.get_specs_catalog(
@@ -175,8 +172,8 @@ async def get_specs_stats(current_user: User = Depends(get_current_user)):
     Get specifications catalog statistics
     """
     try:
-        # Initialize the specs service
-        specs_service = SpecsCatalogService()
+        # Shared specs service
+        specs_service = services.get("enhanced_specs_catalog")
         
         # Get all catalog data for stats
         all_catalog = await specs_service.get_specs_catalog()
@@ -210,8 +207,7 @@ async def get_market_trends(
     """
     try:
         # Initialize the market data service
-        from ...services.enhanced_valuation_engine import MarketDataService
-        market_service = MarketDataService()
+        market_service = services.get("enhanced_market_data")
         
         # Fetch comprehensive market data
         if make and model:
@@ -255,10 +251,10 @@ async def get_market_data_health(current_user: User = Depends(get_current_user))
     Get health status of all market data sources
     """
     try:
-        from ...services.real_time_market_data import real_time_market_data_service
+        real_time_market_data_service = services.get("real_time_market_data")
         
         # Initialize service if needed
-        if not hasattr(real_time_market_data_service, '_initialized') or not real_time_market_data_service._initialized:
+        if not real_time_market_data_service._initialized:
             await real_time_market_data_service.initialize()
         
         # Get health status
@@ -280,8 +276,7 @@ async def get_live_market_data(
     Get live market data from all sources
     """
     try:
-        from ...services.enhanced_valuation_engine import MarketDataService
-        market_service = MarketDataService()
+        market_service = services.get("enhanced_market_data")
         
         # Fetch comprehensive live market data
         market_data = await market_service.get_comprehensive_market_data(make, model)
@@ -311,8 +306,8 @@ async def trigger_specs_scraping(
         if current_user.role not in ["admin", "super_admin"]:
             raise HTTPException(status_code=403, detail="Admin access required")
         
-        # Initialize specs service
-        specs_service = SpecsCatalogService()
+        # Shared specs service
+        specs_service = services.get("enhanced_specs_catalog")
         
         # Trigger background scraping task
         if background_tasks:
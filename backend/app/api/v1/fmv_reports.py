@@ -19,7 +19,6 @@ from ...services.fallback_request_service import FallbackRequestService
 from ...schemas.fallback_request import FallbackRequestCreate, FallbackRequestResponse, FallbackRequestUpdate
 from ...models.fallback_request import FallbackRequest
 from ...services.stripe_service import StripeService
-from ...services.storage_service import get_storage_service
 from ...schemas.fmv_report import (
     FMVReportCreate, FMVReportResponse, StatusTransition, FMVReportUpdate,
     FMVReportTimelineResponse, FMVReportTimelineItem, FMVReportDraftUpdate
@@ -1475,6 +1474,8 @@ async def upload_service_records(
     
     # CRITICAL: Get storage service and verify initialization
     try:
+        # boto3 is only loaded for uploads
+        from ...services.storage_service import get_storage_service
         storage_service = get_storage_service()
     except Exception as e:
         logger.error(f"❌ Failed to get storage service: {e}", exc_info=True)
@@ -1581,6 +1582,8 @@ async def upload_bulk_file(
     
     # CRITICAL: Get storage service and verify initialization
     try:
+        # boto3 is only loaded for uploads
+        from ...services.storage_service import get_storage_service
         storage_service = get_storage_service()
     except Exception as e:
         logger.error(f"❌ Failed to get storage service for bulk upload: {e}", exc_info=True)
@@ -1679,6 +1682,7 @@ async def get_service_record_file(
     """Redirect to CDN URL for service record files (backward compatibility)"""
     from fastapi.responses import RedirectResponse
     from pathlib import Path
+    from ...services.storage_service import get_storage_service
     
     try:
         # Security: Prevent directory traversal
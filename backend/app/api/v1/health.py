@@ -8,11 +8,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
 from typing import Dict, Any, List
-import psutil
 import os
 import logging
 
 from app.config import get_db, engine
+from app.services.system_metrics import system_metrics
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -74,19 +74,22 @@ async def detailed_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]
     
     # System resources
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # Latest background sample; nothing is measured on the request path
+        sample = system_metrics.latest()
+        cpu_percent = sample["cpu_percent"]
+        memory_percent = sample["memory_percent"]
         
         health_status["checks"]["system"] = {
-            "status": HealthStatus.HEALTHY if cpu_percent < 80 and memory.percent < 80 else HealthStatus.DEGRADED,
+            "status": HealthStatus.HEALTHY if cpu_percent < 80 and memory_percent < 80 else HealthStatus.DEGRADED,
             "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "disk_percent": disk.percent,
+            "memory_percent": memory_percent,
+            "disk_percent": sample["disk_percent"],
+            "loop_lag_ms": sample["loop_lag_ms"],
+            "sample_age_seconds": sample["age_seconds"],
             "message": "System resources within acceptable limits"
         }
         
-        if cpu_percent > 90 or memory.percent > 90:
+        if cpu_percent > 90 or memory_percent > 90:
             overall_healthy = False
             health_status["checks"]["system"]["status"] = HealthStatus.UNHEALTHY
     except Exception as e:
@@ -209,16 +212,17 @@ async def metrics(db: Session = Depends(get_db)) -> Dict[str, Any]:
     
     # System metrics
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
+        sample = system_metrics.latest()
         metrics_data["system"] = {
-            "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_mb": memory.available / (1024 * 1024),
-            "disk_percent": disk.percent,
-            "disk_free_gb": disk.free / (1024 * 1024 * 1024)
+            "cpu_percent": sample["cpu_percent"],
+            "memory_percent": sample["memory_percent"],
+            "memory_available_mb": sample["memory_available_mb"],
+            "disk_percent": sample["disk_percent"],
+            "disk_free_gb": sample["disk_free_gb"],
+            "loop_lag_ms": sample["loop_lag_ms"],
+            "sample_age_seconds": sample["age_seconds"],
+            "history": system_metrics.window_stats(),
+            "sampler": system_metrics.get_stats()
         }
     except Exception as e:
         logger.error(f"Failed to collect system metrics: {str(e)}")
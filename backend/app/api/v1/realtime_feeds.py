@@ -167,9 +167,9 @@ async def websocket_simple(websocket: WebSocket):
     client_id = f"client_{id(websocket)}"
     if token:
         try:
-            from jose import jwt
             from ...core.config import settings
-            payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+            from ...core.token_verifier import token_verifier
+            payload = token_verifier.decode(token, settings.secret_key, "HS256")
             client_id = f"user_{payload.get('sub', client_id)}"
         except:
             pass
@@ -4,7 +4,9 @@ Provides professional crane valuation services via REST API with subscription-ba
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+import json
 from pydantic import BaseModel, Field
 import sys
 import os
@@ -17,16 +19,17 @@ from ...services.valuation_engine_unified import (
     CraneSpecs,
     ValuationResult
 )
-# Backward compatibility - use unified engine for both
-from ...services.valuation_engine_unified import UnifiedValuationEngine
-comprehensive_valuation_engine = UnifiedValuationEngine(use_real_time_data=True)
+from ...services.service_container import services
+from ...services.fleet_valuation import fleet_valuation_executor, portfolio_summary, unit_analysis
 from ...services.auth_service import get_current_user, require_api_access, require_portfolio_analysis
 from ...services.auth_service import subscription_service
 
 router = APIRouter(prefix="/valuation", tags=["Crane Valuation"])
 
-# Initialize the valuation engine
-valuation_engine = CraneValuationEngine()
+
+def get_valuation_engine() -> CraneValuationEngine:
+    """Process-wide valuation engine (built once by the service container, shared by all requests)"""
+    return services.get("realtime_valuation_engine")
 
 
 class CraneValuationRequest(BaseModel):
@@ -108,7 +111,7 @@ async def value_crane_enhanced(
         }
         
         # Run comprehensive valuation
-        result = comprehensive_valuation_engine.calculate_valuation(crane_specs)
+        result = get_valuation_engine().calculate_valuation(crane_specs)
         
         # Check if user can access enhanced features (Pro+ subscription)
         if not subscription_service.can_access_feature(user_tier, "deal_score"):
@@ -190,7 +193,7 @@ async def value_crane(
         )
         
         # Run valuation
-        result = valuation_engine.value_crane(specs)
+        result = get_valuation_engine().value_crane(specs)
         
         # Check if user can access deal score (Pro+ subscription)
         if not subscription_service.can_access_feature(user_tier, "deal_score"):
@@ -274,6 +277,7 @@ async def analyze_market(
         )
         
         # Run valuation for market analysis
+        valuation_engine = get_valuation_engine()
         result = valuation_engine.value_crane(specs)
         
         # Extract market-specific data
@@ -282,14 +286,8 @@ async def analyze_market(
             "market_value": result.fair_market_value,
             "market_position": result.market_position,
             "comparable_analysis": result.comparable_analysis,
-            "regional_adjustment": valuation_engine.regional_adjustments.get(
-                request.region, 
-                valuation_engine.regional_adjustments['default']
-            ),
-            "manufacturer_premium": valuation_engine.manufacturer_premiums.get(
-                request.manufacturer,
-                valuation_engine.manufacturer_premiums['default']
-            )
+            "regional_adjustment": valuation_engine.region_factor(request.region),
+            "manufacturer_premium": valuation_engine.manufacturer_factor(request.manufacturer)
         }
         
         return CraneValuationResponse(
@@ -306,6 +304,19 @@ async def analyze_market(
         )
 
 
+def _fleet_specs(crane_request: CraneValuationRequest) -> CraneSpecs:
+    return CraneSpecs(
+        manufacturer=crane_request.manufacturer,
+        model=crane_request.model,
+        year=crane_request.year,
+        capacity_tons=crane_request.capacity_tons,
+        hours=crane_request.hours,
+        condition_score=crane_request.condition_score,
+        region=crane_request.region,
+        price=crane_request.price
+    )
+
+
 @router.post("/fleet-optimization", response_model=CraneValuationResponse)
 async def optimize_fleet(
     request: FleetOptimizationRequest,
@@ -334,83 +345,22 @@ async def optimize_fleet(
                 error="Portfolio analysis requires Fleet Valuation subscription"
             )
         
-        fleet_analysis = []
-        total_investment = 0
-        weighted_roi = 0
-        
-        for crane_request in request.cranes:
-            # Convert to specs
-            specs = CraneSpecs(
-                manufacturer=crane_request.manufacturer,
-                model=crane_request.model,
-                year=crane_request.year,
-                capacity_tons=crane_request.capacity_tons,
-                hours=crane_request.hours,
-                condition_score=crane_request.condition_score,
-                region=crane_request.region,
-                price=crane_request.price
-            )
-            
-            # Run valuation
-            result = valuation_engine.value_crane(specs)
-            
-            # Calculate ROI (using medium scenario)
-            roi = 0.12  # Default 12% ROI
-            if result.financial_metrics and 'roi_scenarios' in result.financial_metrics:
-                roi = result.financial_metrics['roi_scenarios']['medium']['annual_return'] / specs.price
-            
-            crane_analysis = {
-                "crane_id": len(fleet_analysis) + 1,
-                "specs": {
-                    "manufacturer": specs.manufacturer,
-                    "model": specs.model,
-                    "year": specs.year,
-                    "capacity_tons": specs.capacity_tons
-                },
-                "valuation": {
-                    "fair_market_value": result.fair_market_value,
-                    "deal_score": result.deal_score,
-                    "market_position": result.market_position
-                },
-                "financial": {
-                    "price": specs.price or result.fair_market_value,
-                    "roi": roi,
-                    "annual_return": (specs.price or result.fair_market_value) * roi
-                }
-            }
-            
-            fleet_analysis.append(crane_analysis)
-            
-            if specs.price:
-                total_investment += specs.price
-                weighted_roi += specs.price * roi
-        
-        # Calculate portfolio metrics
-        portfolio_roi = weighted_roi / total_investment if total_investment > 0 else 0
-        
-        # Generate optimization recommendations
-        recommendations = []
-        if portfolio_roi < request.target_roi:
-            recommendations.append("Consider higher-ROI equipment to meet target returns")
-        
-        if request.budget and total_investment > request.budget:
-            recommendations.append("Fleet exceeds budget - prioritize highest-ROI equipment")
-        
-        # Sort by deal score for prioritization
-        fleet_analysis.sort(key=lambda x: x['valuation']['deal_score'], reverse=True)
-        
-        portfolio_data = {
-            "fleet_analysis": fleet_analysis,
-            "portfolio_metrics": {
-                "total_cranes": len(fleet_analysis),
-                "total_investment": total_investment,
-                "portfolio_roi": portfolio_roi,
-                "target_roi": request.target_roi,
-                "budget_utilization": (total_investment / request.budget * 100) if request.budget else None
-            },
-            "recommendations": recommendations,
-            "top_picks": fleet_analysis[:3]  # Top 3 by deal score
-        }
+        specs_list = [_fleet_specs(crane_request) for crane_request in request.cranes]
+        
+        # Valued on the fleet worker pool; identical units are valued once
+        valuations = await fleet_valuation_executor.value_fleet(get_valuation_engine(), specs_list)
+        
+        units, asking_prices, errors = [], [], []
+        for index, (specs, (result, error)) in enumerate(zip(specs_list, valuations)):
+            if error is not None:
+                errors.append({"crane_id": index + 1, "error": str(error)})
+                continue
+            units.append(unit_analysis(index + 1, specs, result))
+            asking_prices.append(specs.price)
+        
+        portfolio_data = portfolio_summary(units, asking_prices, request.target_roi, request.budget)
+        if errors:
+            portfolio_data["errors"] = errors
         
         return CraneValuationResponse(
             success=True,
@@ -426,6 +376,45 @@ async def optimize_fleet(
         )
 
 
+@router.post("/fleet-optimization/stream")
+async def optimize_fleet_stream(
+    request: FleetOptimizationRequest,
+    current_user: dict = Depends(require_portfolio_analysis)
+):
+    """
+    Fleet optimization streamed as NDJSON
+    
+    One ``{"event": "unit", ...}`` line per crane as soon as it is valued (units with
+    identical specs arrive together), ``{"event": "error", ...}`` for units that could
+    not be valued, and a final ``{"event": "portfolio", ...}`` line with the same
+    portfolio metrics, recommendations and top picks as /fleet-optimization.
+    """
+    user_tier = current_user.get("subscription_tier", "basic")
+    if not subscription_service.can_access_feature(user_tier, "portfolio_analysis"):
+        raise HTTPException(status_code=403, detail="Portfolio analysis requires Fleet Valuation subscription")
+    
+    specs_list = [_fleet_specs(crane_request) for crane_request in request.cranes]
+    engine = get_valuation_engine()
+    
+    async def events():
+        units, asking_prices = [], []
+        async for indexes, result, error in fleet_valuation_executor.iter_valuations(engine, specs_list):
+            for index in indexes:
+                if error is not None:
+                    yield json.dumps({"event": "error", "crane_id": index + 1, "error": str(error)}) + "\n"
+                    continue
+                unit = unit_analysis(index + 1, specs_list[index], result)
+                units.append(unit)
+                asking_prices.append(specs_list[index].price)
+                yield json.dumps({"event": "unit", **unit}, default=str) + "\n"
+        
+        summary = portfolio_summary(units, asking_prices, request.target_roi, request.budget)
+        summary.pop("fleet_analysis")
+        yield json.dumps({"event": "portfolio", **summary}, default=str) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.get("/manufacturers", response_model=CraneValuationResponse)
 async def get_manufacturers():
     """Get list of supported manufacturers with premium factors"""
@@ -435,7 +424,7 @@ async def get_manufacturers():
                 "premium_factor": premium,
                 "description": f"{manufacturer} crane premium"
             }
-            for manufacturer, premium in valuation_engine.manufacturer_premiums.items()
+            for manufacturer, premium in get_valuation_engine().manufacturer_premiums.items()
             if manufacturer != 'default'
         }
         
@@ -462,7 +451,7 @@ async def get_regions():
                 "adjustment_factor": factor,
                 "description": f"{region} regional adjustment"
             }
-            for region, factor in valuation_engine.regional_adjustments.items()
+            for region, factor in get_valuation_engine().regional_adjustments.items()
             if region != 'default'
         }
         
@@ -545,7 +534,7 @@ async def value_crane_test(request: CraneValuationRequest):
         }
         
         # Run comprehensive valuation
-        result = comprehensive_valuation_engine.calculate_valuation(crane_specs)
+        result = get_valuation_engine().calculate_valuation(crane_specs)
         
         return CraneValuationResponse(
             success=True,
@@ -576,7 +565,7 @@ async def valuation_health_check():
             region="TX"
         )
         
-        result = valuation_engine.value_crane(test_specs)
+        result = get_valuation_engine().value_crane(test_specs)
         
         return CraneValuationResponse(
             success=True,
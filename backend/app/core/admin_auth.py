@@ -10,6 +10,9 @@ from jose import jwt, JWTError
 import logging
 
 from .database import get_db
+from .token_verifier import token_verifier
+from .admin_principal_cache import admin_principal_cache, admin_last_seen, apply_last_seen
+from .principal_versions import principal_versions
 from ..models.admin import AdminUser
 from ..core.config import settings
 
@@ -53,7 +56,7 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
 def verify_token(token: str) -> dict:
     """Verify JWT token and return payload"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_verifier.decode(token, SECRET_KEY, ALGORITHM)
         return payload
     except JWTError:
         raise HTTPException(
@@ -94,7 +97,21 @@ def get_current_admin_user(
                 detail="Invalid token payload"
             )
         
+        # Verified principal from the short-lived cache (no SELECT, no write)
+        cached_user = admin_principal_cache.get(str(user_id), db)
+        if cached_user is not None:
+            if not cached_user.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User account is deactivated"
+                )
+            admin_last_seen.touch(cached_user.id)
+            apply_last_seen(cached_user)
+            return cached_user
+        
         # Get user from database - handle missing columns gracefully
+        # (the principal version is read first, so a change committed meanwhile is never cached)
+        version = principal_versions.current("admin", str(user_id))
         user = None
         try:
             user = db.query(AdminUser).filter(AdminUser.id == user_id).first()
@@ -149,14 +166,11 @@ def get_current_admin_user(
                 detail="User account is deactivated"
             )
         
-        # Update last login (skip if SimpleAdminUser or if it fails)
-        try:
-            if hasattr(user, 'last_login'):
-                user.last_login = datetime.utcnow()
-                db.commit()
-        except Exception as e:
-            logger.warning(f"Could not update last_login: {e}")
-            db.rollback()
+        # Record last-seen in memory; it is written by the batched flush, not per request
+        if isinstance(user, AdminUser):
+            admin_principal_cache.put(str(user_id), user, version)
+            admin_last_seen.touch(user.id)
+            apply_last_seen(user)
         
         return user
     except HTTPException:
@@ -382,7 +396,7 @@ async def admin_login(
             )
         
         # Verify password
-        if not auth_service.verify_password(login_data.password, admin_user.hashed_password):
+        if not await auth_service.verify_password_async(login_data.password, admin_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
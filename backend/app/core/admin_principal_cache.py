@@ -0,0 +1,206 @@
+"""
+Admin principal cache and last-seen tracking
+Keeps admin API reads from turning into a SELECT + UPDATE/COMMIT on admin_users per request
+"""
+import copy
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from .config import settings
+from .database import engine
+from .principal_versions import principal_versions
+from ..models.admin import AdminUser
+
+logger = logging.getLogger(__name__)
+
+
+class AdminPrincipalCache:
+    """
+    Short-lived cache of verified admin principals keyed by token subject.
+
+    Entries hold a column snapshot of the AdminUser row. On a hit the snapshot is
+    merged into the request session without a SELECT, so handlers still get a
+    session-bound AdminUser they can modify and commit. Each entry carries the
+    admin's principal version read before the row was loaded; it is served only
+    while that version is current, and versions are bumped after any committed
+    change to the row (deactivation, role or permission changes, 2FA changes).
+    Entries also expire after ``ttl_seconds``, which bounds how long another worker
+    can serve a revoked admin when versions are not shared through Redis.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str, db: Session) -> Optional[AdminUser]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            expires_at, snapshot, version = entry
+        if principal_versions.current("admin", subject) != version:
+            with self._lock:
+                if self._entries.get(subject) is entry:
+                    del self._entries[subject]
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+
+        user = AdminUser(**copy.deepcopy(snapshot))
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def put(self, subject: str, user: AdminUser, version: Optional[int]) -> None:
+        """Cache a principal loaded after ``version`` was read for ``subject``"""
+        if not isinstance(user, AdminUser) or self.ttl_seconds <= 0 or version is None:
+            return
+        snapshot = {
+            attr.key: copy.deepcopy(getattr(user, attr.key))
+            for attr in inspect(AdminUser).column_attrs
+        }
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, snapshot, version)
+
+    def invalidate(self, user_id: Any = None) -> None:
+        """Drop one admin's principal on every worker, or every principal on this worker when no id is given"""
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None:
+                self._entries.clear()
+                return
+            self._entries.pop(str(user_id), None)
+        principal_versions.bump("admin", str(user_id))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+class LastSeenTracker:
+    """
+    Collects admin last-seen timestamps in memory and writes them in one batched
+    UPDATE every ``flush_interval`` seconds from a background thread.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.flushes = 0
+        self.rows_written = 0
+
+    def touch(self, user_id: int, seen_at: Optional[datetime] = None) -> datetime:
+        seen_at = seen_at or datetime.utcnow()
+        with self._lock:
+            self._pending[int(user_id)] = seen_at
+        self._ensure_flusher()
+        return seen_at
+
+    def pending_for(self, user_id: int) -> Optional[datetime]:
+        with self._lock:
+            return self._pending.get(int(user_id))
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="admin-last-seen-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending timestamps with a single UPDATE ... CASE statement"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        ids = list(pending)
+        cases = " ".join(f"WHEN :id_{i} THEN :seen_{i}" for i in range(len(ids)))
+        params: Dict[str, Any] = {"ids": ids}
+        for i, user_id in enumerate(ids):
+            params[f"id_{i}"] = user_id
+            params[f"seen_{i}"] = pending[user_id]
+        statement = text(
+            f"UPDATE admin_users SET last_login = CASE id {cases} END WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(statement, params)
+        except Exception as e:
+            logger.warning(f"Could not flush admin last-seen timestamps: {e}")
+            with self._lock:
+                # Keep the newest timestamp per admin for the next attempt
+                for user_id, seen_at in pending.items():
+                    if user_id not in self._pending or self._pending[user_id] < seen_at:
+                        self._pending[user_id] = seen_at
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(ids)
+        return len(ids)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flush_interval_seconds": self.flush_interval,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+            }
+
+
+# Global instances
+admin_principal_cache = AdminPrincipalCache(ttl_seconds=settings.admin_principal_cache_ttl_seconds)
+admin_last_seen = LastSeenTracker(flush_interval=settings.admin_last_seen_flush_seconds)
+
+
+def apply_last_seen(user: AdminUser) -> None:
+    """Show the unflushed last-seen time on the principal without marking it dirty"""
+    seen_at = admin_last_seen.pending_for(user.id)
+    if seen_at is not None:
+        set_committed_value(user, "last_login", seen_at)
+
+
+# Admin tokens use the admin id as subject
+principal_versions.track(AdminUser, "admin", lambda user: (str(user.id),))
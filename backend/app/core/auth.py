@@ -8,10 +8,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
 import os
 
 from .database import get_db
+from .principal_versions import principal_versions
+from .token_verifier import token_verifier
 from ..models.user import User, UserRole
 
 # Password hashing
@@ -47,7 +51,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_verifier.decode(token, SECRET_KEY, ALGORITHM)
         return payload
     except JWTError:
         return None
@@ -61,18 +65,38 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     )
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_verifier.decode(token, SECRET_KEY, ALGORITHM)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
+    # Recently loaded user for this token: merge the snapshot instead of re-querying
+    snapshot = token_verifier.get_snapshot(token, SECRET_KEY, ALGORITHM)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    # Read the version before the row: a change committed in between makes this snapshot stale
+    version = principal_versions.current("user", email)
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
+    token_verifier.set_snapshot(
+        token,
+        {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs},
+        SECRET_KEY,
+        ALGORITHM,
+        version=version,
+    )
     return user
 
+
+# Tokens use the email (core auth) or the id (auth service) as subject
+principal_versions.track(User, "user", lambda user: (user.id, user.email))
+
 async def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current authenticated admin user"""
     if current_user.user_role != UserRole.ADMIN:
@@ -2,7 +2,7 @@
 Core configuration for Crane Intelligence Platform
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, Dict
 import os
 from pathlib import Path
 
@@ -28,6 +28,72 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # bcrypt runs on a bounded worker pool; requests beyond workers + queue get 429
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+    # Cached admin principals and user snapshots are checked against shared principal versions in Redis.
+    # Without it versions are per worker: a change committed on another worker (or by raw SQL)
+    # is seen only after the TTL, so both TTLs default to 0 (caching off).
+    principal_versions_redis: bool = False
+    # Verified admin principals are cached briefly; last-seen times are flushed in batches
+    admin_principal_cache_ttl_seconds: int = 0
+    admin_last_seen_flush_seconds: int = 60
+    # Verified JWTs are cached until exp; user snapshots attached to them live much shorter
+    token_cache_max_entries: int = 4096
+    token_snapshot_ttl_seconds: int = 0
+    
+    # Audit / security event pipeline (batched background writes)
+    audit_queue_max: int = 10000
+    audit_batch_size: int = 200
+    audit_flush_interval_ms: int = 500
+    audit_spill_path: str = str(BASE_DIR / "logs" / "audit_spill.jsonl")
+    # Per event class durability overrides, e.g. {"bot_detected": "best_effort", "severity:high": "immediate"}
+    audit_event_durability: Dict[str, str] = {}
+    
+    # Background system metrics sampler read by the health endpoints
+    system_metrics_interval_seconds: int = 5
+    system_metrics_history_seconds: int = 900
+    
+    # Admin database browser: table stats cache and approximate mode for large tables
+    table_stats_cache_seconds: int = 300
+    table_stats_approximate_rows: int = 1000000
+    table_stats_sample_rows: int = 100000
+    # Cached schema metadata is re-validated against schema_migrations at this interval
+    schema_cache_check_seconds: int = 30
+    
+    # Valuation result cache (keyed by canonical specs + pricing input versions)
+    valuation_cache_max_entries: int = 2048
+    valuation_cache_ttl_seconds: int = 900
+    valuation_cache_settings_check_seconds: int = 30
+    valuation_cache_redis: bool = False
+    # Valuation stage timings (histograms + slow log); cProfile runs on this fraction of valuations
+    valuation_profiling_enabled: bool = True
+    valuation_slow_ms: float = 250
+    valuation_profile_sample_rate: float = 0.0
+    # Memoized valuation adjustment runs (pure per spec + pricing tables), shared by every engine
+    valuation_pipeline_cache_entries: int = 4096
+    # Terminal market stats snapshot: rebuilt on crane writes or after this many seconds
+    market_stats_refresh_seconds: int = 60
+    # Analytics chart artifacts (Plotly JSON specs) and the pool that renders them
+    analytics_chart_cache_entries: int = 256
+    analytics_chart_workers: int = 2
+    # Analytics report sections: per-section timeout and how long computed sections are reused
+    analytics_section_timeout_seconds: float = 10
+    analytics_section_cache_seconds: int = 300
+    # Startup: defer rarely used routers until first request, log per-router import times, cold-start budget
+    lazy_router_loading: bool = True
+    startup_profile: bool = False
+    startup_budget_seconds: float = 4.0
+    # Load valuation datasets in a background thread at startup instead of on first use
+    data_loader_preload: bool = True
+    # Valuation datasets published once in shared memory and attached read-only by every worker
+    shared_datasets_enabled: bool = False
+    shared_datasets_prefix: str = "crane-datasets"
+    shared_datasets_check_seconds: float = 1.0
+    # Worker threads for /valuation/fleet-optimization (identical units are valued once)
+    fleet_valuation_workers: int = 4
+    # Distinct specs of one fleet being valued at a time (market fetch + CPU stages in flight)
+    fleet_valuation_max_in_flight: int = 8
     
     # CORS
     allowed_origins: list = ["http://localhost:3000", "http://localhost:8080"]
@@ -2,30 +2,105 @@
 Database configuration and session management
 """
 import re
+import time
 import logging
-from sqlalchemy import create_engine, event
+import threading
+from typing import Dict, Any, Optional
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
-# Create database engine
-# Use PostgreSQL for production, SQLite fallback for development
-if settings.database_url.startswith("sqlite"):
-    # SQLite configuration (development only)
-    engine = create_engine(
-        settings.database_url,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.database_echo
-    )
-else:
+
+class PoolMetrics:
+    """Checkout counters and wait times for one connection pool"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_seconds = 0.0
+        self.wait_max_seconds = 0.0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_seconds += seconds
+            self.wait_max_seconds = max(self.wait_max_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+    
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            checkouts = self.checkouts
+            avg_wait_ms = (self.wait_total_seconds / checkouts * 1000) if checkouts else 0.0
+            max_wait_ms = self.wait_max_seconds * 1000
+            timeouts = self.timeouts
+        return {
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkouts_total": checkouts,
+            "checkout_timeouts": timeouts,
+            "avg_wait_ms": round(avg_wait_ms, 3),
+            "max_wait_ms": round(max_wait_ms, 3),
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return conn
+    
+    def recreate(self):
+        # Keep counters across engine.dispose()
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+
+# Process-wide engine registry: one pooled engine per database URL
+_engine_registry: Dict[str, Engine] = {}
+_engine_registry_lock = threading.Lock()
+
+
+def _build_engine(database_url: str) -> Engine:
+    """Create an engine with the platform's pool settings for the given URL"""
+    if database_url.startswith("sqlite"):
+        # SQLite configuration (development only)
+        # An in-memory database exists only inside its one connection, so it needs
+        # StaticPool; file databases get a normal pool so threads do not share a connection
+        url = make_url(database_url)
+        in_memory = url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool if in_memory else InstrumentedQueuePool,
+            echo=settings.database_echo
+        )
     # PostgreSQL configuration (production)
     # Add connection retry and timeout settings
-    engine = create_engine(
-        settings.database_url,
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
         pool_pre_ping=True,  # Verify connections before using
         pool_recycle=300,    # Recycle connections after 5 minutes
         pool_size=5,         # Number of connections to maintain
@@ -37,6 +112,55 @@ else:
         echo=settings.database_echo
     )
 
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Get the shared engine for a database URL (the app database by default).
+    Services must use this instead of calling create_engine() themselves so
+    every caller draws from one connection pool per database.
+    """
+    database_url = database_url or settings.database_url
+    registered = _engine_registry.get(database_url)
+    if registered is not None:
+        return registered
+    with _engine_registry_lock:
+        if database_url not in _engine_registry:
+            _engine_registry[database_url] = _build_engine(database_url)
+            logger.info(f"Registered database engine for {_engine_registry[database_url].url!r}")
+        return _engine_registry[database_url]
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Pool status and checkout wait metrics for every registered engine"""
+    metrics = {}
+    for database_url, registered in list(_engine_registry.items()):
+        pool = registered.pool
+        pool_metrics = getattr(pool, "metrics", None) or PoolMetrics()
+        name = "primary" if database_url == settings.database_url else registered.url.render_as_string(hide_password=True)
+        metrics[name] = pool_metrics.snapshot(pool)
+    return metrics
+
+
+# Create database engine
+# Use PostgreSQL for production, SQLite fallback for development
+engine = get_engine(settings.database_url)
+
+# Schema engines: twins of a registered engine that share its connection pool but
+# not its event listeners, so they run without the SQL injection guard. Only
+# startup/maintenance code that issues fixed reflection and DDL statements uses
+# them (the SQLite dialect reflects with PRAGMAs and a UNION ALL over
+# sqlite_master, which the guard rejects); request handlers use `engine`
+_schema_engines: Dict[int, Engine] = {}
+
+
+def get_schema_engine(bind: Optional[Engine] = None) -> Engine:
+    """Unguarded engine over ``bind``'s pool for schema reflection and catalog DDL"""
+    bind = bind or engine
+    with _engine_registry_lock:
+        if id(bind) not in _schema_engines:
+            _schema_engines[id(bind)] = create_engine(bind.url, pool=bind.pool, echo=settings.database_echo)
+        return _schema_engines[id(bind)]
+
 # SQL Injection Prevention - Register event listener
 @event.listens_for(engine, "before_cursor_execute")
 def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
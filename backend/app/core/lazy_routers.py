@@ -0,0 +1,173 @@
+"""
+Router Registry
+Includes API routers into the app, deferring rarely used ones until their first request, and times each import
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+logger = logging.getLogger(__name__)
+
+
+class _RouterEntry:
+    __slots__ = ("module", "attr", "prefix", "tags", "paths", "state", "import_ms", "new_modules", "new_packages",
+                 "loaded_at", "route_count")
+
+    def __init__(self, module: str, attr: str, prefix: str, tags: Optional[List[str]], paths: Sequence[str]):
+        self.module = module
+        self.attr = attr
+        self.prefix = prefix
+        self.tags = tags
+        self.paths = tuple(paths)
+        self.state = "pending"
+        self.import_ms: Optional[float] = None
+        self.new_modules = 0
+        self.new_packages: List[str] = []
+        self.loaded_at: Optional[float] = None
+        self.route_count = 0
+
+
+class _DeferredRouter(BaseRoute):
+    """
+    Placeholder in the app's route table for a router that has not been imported.
+    It matches every request under the router's paths; the first one imports the
+    router, swaps the placeholder for the real routes (same position, so route
+    precedence is unchanged) and dispatches the request again.
+    """
+
+    def __init__(self, registry: "RouterRegistry", entry: _RouterEntry):
+        self.registry = registry
+        self.entry = entry
+        self._lock = asyncio.Lock()
+
+    def matches(self, scope: Dict[str, Any]):
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            for prefix in self.entry.paths:
+                if path == prefix or path.startswith(prefix + "/"):
+                    return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send) -> None:
+        async with self._lock:
+            if self in self.registry.app.router.routes:
+                await self.registry._load_deferred(self)
+        await self.registry.app.router(scope, receive, send)
+
+
+class RouterRegistry:
+    """
+    Registers the application's routers.
+
+    ``include`` imports a router immediately. ``include`` with ``defer_paths``
+    (and lazy loading enabled) only reserves its place in the route table; the
+    module, and whatever heavy dependencies it pulls in, is imported on the first
+    request under one of those paths. Every import is timed with the number of
+    modules and top-level packages it loaded, which ``report`` logs when the
+    startup profile is enabled.
+    """
+
+    def __init__(self, app: FastAPI, lazy: bool = True):
+        self.app = app
+        self.lazy = lazy
+        self.entries: List[_RouterEntry] = []
+        self.created_at = time.perf_counter()
+
+    def include(self, module: str, prefix: str = "/api/v1", tags: Optional[List[str]] = None,
+                attr: str = "router", defer_paths: Optional[Sequence[str]] = None) -> bool:
+        """Include ``module.attr``; returns False when the router could not be loaded"""
+        entry = _RouterEntry(module, attr, prefix, tags, defer_paths or ())
+        self.entries.append(entry)
+        if self.lazy and entry.paths:
+            self.app.router.routes.append(_DeferredRouter(self, entry))
+            entry.state = "deferred"
+            return True
+        try:
+            router = self._import(entry)
+        except Exception as e:
+            logger.warning(f"Could not load router {module}: {e}")
+            return False
+        self._add_routes(entry, router)
+        logger.info(f"✓ {module} router registered")
+        return True
+
+    def _import(self, entry: _RouterEntry):
+        modules_before = set(sys.modules)
+        started = time.perf_counter()
+        try:
+            router = getattr(importlib.import_module(entry.module), entry.attr)
+        except Exception:
+            entry.state = "failed"
+            raise
+        finally:
+            entry.import_ms = round((time.perf_counter() - started) * 1000, 2)
+            new_modules = set(sys.modules) - modules_before
+            entry.new_modules = len(new_modules)
+            entry.new_packages = sorted({
+                name.split(".")[0] for name in new_modules if not name.startswith(("app.", "_")) and name != "app"
+            })
+        return router
+
+    def _add_routes(self, entry: _RouterEntry, router) -> None:
+        before = len(self.app.router.routes)
+        if entry.tags:
+            self.app.include_router(router, prefix=entry.prefix, tags=entry.tags)
+        else:
+            self.app.include_router(router, prefix=entry.prefix)
+        entry.route_count = len(self.app.router.routes) - before
+        entry.state = "loaded"
+        entry.loaded_at = time.perf_counter()
+
+    async def _load_deferred(self, placeholder: _DeferredRouter) -> None:
+        entry = placeholder.entry
+        routes = self.app.router.routes
+        try:
+            router = await run_in_threadpool(self._import, entry)
+        except Exception as e:
+            logger.warning(f"Could not load deferred router {entry.module}: {e}")
+            routes.remove(placeholder)
+            return
+        # include_router appends; move the new routes to where the placeholder was
+        before = len(routes)
+        self._add_routes(entry, router)
+        new_routes = routes[before:]
+        del routes[before:]
+        index = routes.index(placeholder)
+        routes[index:index + 1] = new_routes
+        self.app.openapi_schema = None
+        logger.info(f"✓ Deferred router {entry.module} loaded on first use in {entry.import_ms} ms "
+                    f"({entry.new_modules} modules)")
+
+    def report(self) -> None:
+        """Log router import times, slowest first"""
+        elapsed_ms = round((time.perf_counter() - self.created_at) * 1000, 1)
+        lines = [f"Startup profile: routers registered in {elapsed_ms} ms"]
+        for entry in sorted(self.entries, key=lambda e: e.import_ms or 0, reverse=True):
+            packages = ", ".join(entry.new_packages[:8])
+            if entry.import_ms is None:
+                lines.append(f"  {'-':>8} ms  {entry.state:<8}  {entry.module}")
+                continue
+            lines.append(f"  {entry.import_ms:>8.1f} ms  {entry.state:<8}  {entry.module}  "
+                         f"+{entry.new_modules} modules{(' [' + packages + ']') if packages else ''}")
+        logger.info("\n".join(lines))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "lazy": self.lazy,
+            "routers": len(self.entries),
+            "loaded": sum(1 for e in self.entries if e.state == "loaded"),
+            "deferred": [e.module for e in self.entries if e.state == "deferred"],
+            "failed": [e.module for e in self.entries if e.state == "failed"],
+            "import_ms": {e.module: e.import_ms for e in self.entries if e.import_ms is not None},
+        }
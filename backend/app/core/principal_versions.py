@@ -0,0 +1,163 @@
+"""
+Shared principal versions for the cached user and admin principals
+A cached principal is only served while its version is unchanged; versions are bumped after commit
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "principal:version:"
+SESSION_INFO_KEY = "changed_principals"
+
+
+class PrincipalVersions:
+    """
+    Per-principal version counters, keyed by kind ("user", "admin") and subject.
+
+    Caches read the version *before* loading a row and store it with the snapshot;
+    a snapshot is served only while ``current`` still returns that version. Versions
+    are bumped from a Session ``after_commit`` hook (identities are collected during
+    flush and dropped on rollback), so an uncommitted or rolled-back change never
+    evicts and a request that loaded the old row cannot re-cache it.
+
+    With ``use_redis`` the counters live in Redis and a bump reaches every worker;
+    if Redis is unreachable ``current`` returns None and callers must not serve
+    cached principals. Without Redis the counters are per process: other workers,
+    and changes made outside the ORM (raw SQL, another service), are only seen once
+    the cache TTL runs out. Code that changes principals with Core/raw SQL must call
+    ``bump`` itself after committing.
+    """
+
+    def __init__(self, use_redis: bool = False):
+        self.use_redis = use_redis
+        self._local: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._tracked: Dict[type, Tuple[str, Callable[[Any], Iterable[Any]]]] = {}
+        self.bumps = 0
+
+    @staticmethod
+    def _key(kind: str, subject: Any) -> str:
+        return f"{kind}:{subject}"
+
+    def track(self, model: type, kind: str, subjects: Callable[[Any], Iterable[Any]]) -> None:
+        """Bump ``kind`` versions for ``subjects(row)`` whenever a ``model`` row is committed changed or deleted"""
+        self._tracked[model] = (kind, subjects)
+
+    def current(self, kind: str, subject: Any) -> Optional[int]:
+        """Version of one principal, or None when the shared store cannot be read"""
+        key = self._key(kind, subject)
+        if not self.use_redis:
+            with self._lock:
+                return self._local.get(key, 0)
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            value = client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        return int(value) if value else 0
+
+    def bump(self, kind: str, *subjects: Any) -> None:
+        """Invalidate every cached copy of these principals"""
+        keys = [self._key(kind, s) for s in subjects if s is not None]
+        if not keys:
+            return
+        with self._lock:
+            self.bumps += len(keys)
+            for key in keys:
+                self._local[key] = self._local.get(key, 0) + 1
+        if not self.use_redis:
+            return
+        client = self._client()
+        if client is None:
+            # Nothing is served from cache while Redis is down, see ``current``
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(REDIS_KEY_PREFIX + key)
+            pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    # ------------------------------------------------------------------ redis (optional)
+
+    def _client(self):
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                client = redis.Redis.from_url(settings.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                logger.warning(f"Redis not available for principal versions, cached principals disabled: {e}")
+                self._redis_retry_at = time.monotonic() + 60
+                return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"Principal version Redis error: {e}")
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + 60
+
+    # ------------------------------------------------------------------ session hooks
+
+    def _collect(self, session: Session) -> None:
+        changed = session.info.setdefault(SESSION_INFO_KEY, set())
+        for obj in list(session.dirty) + list(session.deleted):
+            tracked = self._tracked.get(type(obj))
+            if tracked is None:
+                continue
+            kind, subjects = tracked
+            changed.update((kind, s) for s in subjects(obj) if s is not None)
+
+    def _publish(self, session: Session) -> None:
+        changed = session.info.pop(SESSION_INFO_KEY, None)
+        if not changed:
+            return
+        by_kind: Dict[str, list] = {}
+        for kind, subject in changed:
+            by_kind.setdefault(kind, []).append(subject)
+        for kind, subjects in by_kind.items():
+            self.bump(kind, *subjects)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "shared": self.use_redis,
+                "redis_connected": self._redis is not None,
+                "bumps": self.bumps,
+            }
+
+
+# Global instance
+principal_versions = PrincipalVersions(use_redis=settings.principal_versions_redis)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    principal_versions._collect(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_principals(session):
+    principal_versions._publish(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_principals(session):
+    session.info.pop(SESSION_INFO_KEY, None)
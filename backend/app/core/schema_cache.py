@@ -0,0 +1,173 @@
+"""
+Schema metadata cache for the admin database browser
+Table names, columns, primary and foreign keys are read from the catalog once and reused until the schema changes
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .database import engine, get_schema_engine
+
+logger = logging.getLogger(__name__)
+
+DDL_PREFIXES = ("CREATE", "ALTER", "DROP")
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+class SchemaCache:
+    """
+    In-process copy of the database schema.
+
+    Loaded with the inspector's multi-table calls (one catalog query per kind of
+    metadata), then served from memory. It is marked dirty by DDL executed through
+    this process's engine. Migrations run from the migration manager's CLI, in a
+    separate process, so they are picked up by polling instead: every
+    ``check_interval_seconds`` the ``schema_migrations`` fingerprint is compared
+    with the version the cache was loaded with.
+    """
+
+    def __init__(self, bind: Engine, check_interval_seconds: float = 30):
+        self.bind = bind
+        self.check_interval_seconds = check_interval_seconds
+        self._tables: Optional[Dict[str, Dict[str, Any]]] = None
+        self._version: Any = None
+        self._dirty = True
+        self._loaded_at: Optional[datetime] = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+
+    # ------------------------------------------------------------------ loading
+
+    def refresh(self) -> None:
+        started = time.perf_counter()
+        with get_schema_engine(self.bind).connect() as conn:
+            inspector = inspect(conn)
+            names = inspector.get_table_names()
+            columns = inspector.get_multi_columns()
+            primary_keys = inspector.get_multi_pk_constraint()
+            foreign_keys = inspector.get_multi_foreign_keys()
+
+        tables = {}
+        for name in names:
+            key = (None, name)
+            tables[name] = {
+                "columns": columns.get(key, []),
+                "primary_key": (primary_keys.get(key) or {}).get("constrained_columns") or [],
+                "foreign_keys": foreign_keys.get(key, []),
+            }
+
+        with self._lock:
+            self._tables = tables
+            self._version = self._migrations_version()
+            self._dirty = False
+            self._loaded_at = datetime.utcnow()
+            self._last_check = time.monotonic()
+            self.refreshes += 1
+            self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Schema cache loaded {len(tables)} tables in {self.last_refresh_ms} ms")
+
+    def _migrations_version(self) -> Any:
+        """Fingerprint of the migrations table (None if there is none)"""
+        try:
+            with self.bind.connect() as conn:
+                row = conn.execute(text(
+                    f"SELECT COUNT(*), MAX(applied_at), MAX(rolled_back_at) FROM {MIGRATIONS_TABLE}"
+                )).one()
+            return tuple(str(value) for value in row)
+        except Exception:
+            return None
+
+    def _ensure_loaded(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if not self._dirty and self._tables is not None:
+                if time.monotonic() - self._last_check < self.check_interval_seconds:
+                    return self._tables
+                self._last_check = time.monotonic()
+                if self._migrations_version() == self._version:
+                    return self._tables
+                logger.info("Schema migrations changed, reloading schema cache")
+            self.refresh()
+            return self._tables
+
+    def invalidate(self) -> None:
+        """Reload on next use"""
+        with self._lock:
+            self._dirty = True
+
+    # ------------------------------------------------------------------ lookups
+
+    def table_names(self) -> List[str]:
+        return list(self._ensure_loaded())
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self._ensure_loaded()
+
+    def get_columns(self, table_name: str) -> List[Dict[str, Any]]:
+        return self._ensure_loaded()[table_name]["columns"]
+
+    def get_primary_key(self, table_name: str) -> List[str]:
+        return self._ensure_loaded()[table_name]["primary_key"]
+
+    def get_foreign_keys(self, table_name: str) -> List[Dict[str, Any]]:
+        return self._ensure_loaded()[table_name]["foreign_keys"]
+
+    def row_estimates(self, conn) -> Dict[str, Dict[str, Any]]:
+        """
+        Row counts (and sizes where available) for every table.
+
+        PostgreSQL reads planner estimates from the catalog in one query; other databases
+        get exact counts, one COUNT(*) per table on the same connection (a UNION ALL of
+        them would be rejected by the SQL injection guard on the primary engine).
+        """
+        names = self.table_names()
+        if not names:
+            return {}
+        if self.bind.dialect.name == "postgresql":
+            rows = conn.execute(text("""
+                SELECT c.relname,
+                       CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint ELSE COALESCE(s.n_live_tup, 0) END,
+                       pg_total_relation_size(c.oid)
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+                WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+            """))
+            estimates = {name: {"rows": int(count or 0), "size_bytes": int(size or 0), "estimated": True}
+                         for name, count, size in rows}
+            return {name: estimates.get(name, {"rows": 0, "size_bytes": 0, "estimated": True}) for name in names}
+
+        quote = self.bind.dialect.identifier_preparer.quote
+        return {
+            name: {"rows": conn.execute(text(f"SELECT COUNT(*) FROM {quote(name)}")).scalar() or 0,
+                   "size_bytes": None, "estimated": False}
+            for name in names
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tables": len(self._tables or {}),
+                "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None,
+                "dirty": self._dirty,
+                "refreshes": self.refreshes,
+                "last_refresh_ms": self.last_refresh_ms,
+                "migrations_version": self._version,
+            }
+
+
+# Global instance
+schema_cache = SchemaCache(engine, check_interval_seconds=settings.schema_cache_check_seconds)
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _invalidate_on_ddl(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:6].upper().startswith(DDL_PREFIXES):
+        schema_cache.invalidate()
@@ -0,0 +1,168 @@
+"""
+Shared JWT verification for HTTP and WebSocket authentication
+Verified tokens are cached (token -> claims) until they expire, so repeat requests skip signature checks
+"""
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwt
+
+from .config import settings
+from .principal_versions import principal_versions
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("claims", "expires_at", "snapshot", "snapshot_expires_at", "snapshot_version")
+
+    def __init__(self, claims: Dict[str, Any], expires_at: float):
+        self.claims = claims
+        self.expires_at = expires_at
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_expires_at = 0.0
+        self.snapshot_version: Optional[int] = None
+
+
+class TokenVerifier:
+    """
+    Bounded LRU of verified JWTs.
+
+    ``decode`` returns the claims of a valid token and raises ``JWTError`` otherwise,
+    exactly like ``jwt.decode``, so each auth module keeps its own error responses.
+    A cached entry lives until the token's ``exp`` (or ``max_ttl_seconds`` for tokens
+    without one). Callers may attach a user snapshot to a token, together with the
+    subject's principal version read before the row was loaded. A snapshot is served
+    only while that version is current and for at most ``snapshot_ttl_seconds``;
+    without shared (Redis) versions that TTL is how long another worker can keep
+    serving a deactivated or re-roled user.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_ttl_seconds: float = 3600,
+                 snapshot_ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.snapshot_ttl_seconds = snapshot_ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.evictions = 0
+        self.snapshot_hits = 0
+        self.verify_seconds_total = 0.0
+        self.cached_seconds_total = 0.0
+
+    @staticmethod
+    def _cache_key(token: str, secret_key: str, algorithm: str) -> str:
+        # Modules sign with different secrets; a token is only cached per secret it verified under
+        return hashlib.sha256(f"{algorithm}|{secret_key}|{token}".encode()).hexdigest()
+
+    def _live_entry(self, key: str, now: float) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def decode(self, token: str, secret_key: str, algorithm: str = "HS256") -> Dict[str, Any]:
+        """Verified claims for a token (a copy; callers may modify it)"""
+        started = time.perf_counter()
+        key = self._cache_key(token, secret_key, algorithm)
+        wall_now = time.time()
+        with self._lock:
+            entry = self._live_entry(key, wall_now)
+            if entry is not None:
+                self.hits += 1
+                self.cached_seconds_total += time.perf_counter() - started
+                return dict(entry.claims)
+
+        try:
+            claims = jwt.decode(token, secret_key, algorithms=[algorithm])
+        except JWTError:
+            with self._lock:
+                self.failures += 1
+                self.verify_seconds_total += time.perf_counter() - started
+            raise
+
+        exp = claims.get("exp")
+        expires_at = wall_now + self.max_ttl_seconds
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        with self._lock:
+            self.misses += 1
+            self.verify_seconds_total += time.perf_counter() - started
+            self._entries[key] = _Entry(claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return dict(claims)
+
+    def get_snapshot(self, token: str, secret_key: str, algorithm: str = "HS256") -> Optional[Dict[str, Any]]:
+        """User snapshot attached to a verified token, if still fresh"""
+        key = self._cache_key(token, secret_key, algorithm)
+        now = time.time()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is None or entry.snapshot is None or entry.snapshot_expires_at <= now:
+                return None
+            subject, version = entry.claims.get("sub"), entry.snapshot_version
+        if principal_versions.current("user", subject) != version:
+            return None
+        with self._lock:
+            if entry.snapshot is None or entry.snapshot_version != version:
+                return None
+            self.snapshot_hits += 1
+            return copy.deepcopy(entry.snapshot)
+
+    def set_snapshot(self, token: str, snapshot: Dict[str, Any], secret_key: str,
+                     algorithm: str = "HS256", version: Optional[int] = None) -> None:
+        """Attach a snapshot loaded after ``version`` was read for the token's subject"""
+        if self.snapshot_ttl_seconds <= 0 or version is None:
+            return
+        key = self._cache_key(token, secret_key, algorithm)
+        now = time.time()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                entry.snapshot = copy.deepcopy(snapshot)
+                entry.snapshot_version = version
+                entry.snapshot_expires_at = min(entry.expires_at, now + self.snapshot_ttl_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+                "evictions": self.evictions,
+                "snapshot_hits": self.snapshot_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "avg_verify_us": round(self.verify_seconds_total / (self.misses + self.failures) * 1e6, 1)
+                if (self.misses + self.failures) else 0,
+                "avg_cached_us": round(self.cached_seconds_total / self.hits * 1e6, 1) if self.hits else 0,
+            }
+
+
+# Single instance shared by HTTP dependencies and WebSocket handlers
+token_verifier = TokenVerifier(
+    max_entries=settings.token_cache_max_entries,
+    snapshot_ttl_seconds=settings.token_snapshot_ttl_seconds,
+)
@@ -43,6 +43,7 @@ logger = logging.getLogger(__name__)
 
 # Import settings for environment check
 from .core.config import settings
+from .core.lazy_routers import RouterRegistry
 
 # Disable docs in production for security
 docs_url = "/docs" if settings.environment == "development" else None
@@ -195,6 +196,29 @@ def create_access_token(data: dict):
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and create default users on startup"""
+    # Health endpoints read resource usage from this sampler instead of measuring per request
+    try:
+        import asyncio
+        from .services.system_metrics import system_metrics
+        system_metrics.start(asyncio.get_running_loop())
+    except Exception as e:
+        logger.warning(f"Could not start system metrics sampler: {e}")
+    
+    # Valuation engines and market data services are built once here and shared by all requests
+    try:
+        from .services.service_container import services
+        await services.startup()
+    except Exception as e:
+        logger.warning(f"Could not warm application services: {e}")
+    
+    # Valuation datasets (CSV via pandas) load in the background; the first valuation waits only if it is still running
+    if settings.data_loader_preload:
+        try:
+            from .services.data_loader import data_loader
+            data_loader.load_in_background()
+        except Exception as e:
+            logger.warning(f"Could not start dataset preload: {e}")
+    
     if not DATABASE_AVAILABLE:
         logger.warning("Database not available, skipping initialization")
         return
@@ -204,6 +228,20 @@ async def startup_event():
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
         
+        # Spec catalog table and search index: DDL runs once here, not per service instance
+        try:
+            from .services.specs_catalog_service import init_specs_catalog_schema
+            init_specs_catalog_schema()
+        except Exception as e:
+            logger.warning(f"Could not initialize spec catalog schema: {e}")
+        
+        # Schema metadata for the admin database browser, loaded after the DDL above so it is current
+        try:
+            from .core.schema_cache import schema_cache
+            schema_cache.refresh()
+        except Exception as e:
+            logger.warning(f"Could not warm schema cache: {e}")
+        
         # Create default admin user if it doesn't exist
         # Temporarily disabled to avoid is_admin errors - users can sign up via API
         # db = next(get_db())
@@ -256,6 +294,37 @@ async def startup_event():
         # Don't raise - allow app to start even if database init fails
         logger.warning("Continuing without database initialization")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close shared services and write buffered admin last-seen timestamps and audit events before the process exits"""
+    try:
+        from .services.system_metrics import system_metrics
+        system_metrics.shutdown()
+    except Exception as e:
+        logger.warning(f"Could not stop system metrics sampler: {e}")
+    try:
+        from .services.service_container import services
+        from .services.fleet_valuation import fleet_valuation_executor
+        from .services.chart_cache import chart_artifact_cache
+        fleet_valuation_executor.shutdown()
+        chart_artifact_cache.shutdown()
+        await services.shutdown()
+    except Exception as e:
+        logger.warning(f"Could not close application services: {e}")
+    if not DATABASE_AVAILABLE:
+        return
+    try:
+        from .core.admin_principal_cache import admin_last_seen
+        admin_last_seen.shutdown()
+    except Exception as e:
+        logger.warning(f"Could not flush admin last-seen timestamps: {e}")
+    try:
+        from .services.audit_pipeline import audit_event_writer
+        audit_event_writer.shutdown()
+    except Exception as e:
+        logger.warning(f"Could not flush queued audit events: {e}")
+
 # ==================== API ROUTERS ====================
 
 # Include authentication router (if available)
@@ -275,137 +344,62 @@ if AUTH_SIMPLE_AVAILABLE and auth_simple_router:
     except Exception as e:
         logger.warning(f"Could not load simple auth router: {e}")
 
+# Routers registered with defer_paths are imported on their first request (see core/lazy_routers.py):
+# they are rarely used and pull in heavy dependencies (scrapers/pandas, PDF, Plotly) every worker would
+# otherwise load at boot. Their position in the route table is reserved, so route precedence is unchanged.
+routers = RouterRegistry(app, lazy=settings.lazy_router_loading)
+app.state.routers = routers
+
 # Include full auth router (with email verification, password reset, etc.)
-try:
-    from app.api.v1.auth import router as full_auth_router
-    app.include_router(full_auth_router, prefix="/api/v1", tags=["authentication"])
-    logger.info("✓ Full authentication router registered")
-except Exception as e:
-    logger.warning(f"Could not load full auth router: {e}")
+routers.include("app.api.v1.auth", tags=["authentication"])
 
 # Include notifications router
-try:
-    from app.api.v1.notifications import router as notifications_router
-    app.include_router(notifications_router, prefix="/api/v1", tags=["Notifications"])
-    logger.info("✓ Notifications router registered")
-except Exception as e:
-    logger.warning(f"Could not load notifications router: {e}")
+routers.include("app.api.v1.notifications", tags=["Notifications"])
 
 # Include draft reminders router
-try:
-    from app.api.v1.draft_reminders import router as draft_reminders_router
-    app.include_router(draft_reminders_router, prefix="/api/v1", tags=["Draft Reminders"])
-    logger.info("✓ Draft reminders router registered")
-except Exception as e:
-    logger.warning(f"Could not load draft reminders router: {e}")
+routers.include("app.api.v1.draft_reminders", tags=["Draft Reminders"])
 
-# Include enhanced data router
-try:
-    from app.api.v1.enhanced_data import router as enhanced_data_router
-    app.include_router(enhanced_data_router, prefix="/api/v1")
-    logger.info("✓ Enhanced data router registered")
-except Exception as e:
-    logger.warning(f"Could not load enhanced_data router: {e}")
-    import traceback
-    traceback.print_exc()
+# Include enhanced data router (spec scrapers and data migration)
+routers.include("app.api.v1.enhanced_data", defer_paths=["/api/v1/enhanced-data"])
 
 # Include valuation router (if available)
-try:
-    from app.api.v1.valuation import router as valuation_router
-    app.include_router(valuation_router, prefix="/api/v1", tags=["valuation"])
-    logger.info("✓ Valuation router registered")
-except Exception as e:
-    logger.warning(f"Could not load valuation router: {e}")
+routers.include("app.api.v1.valuation", tags=["valuation"])
 
 # Include enhanced valuation router (if available)
-try:
-    from app.api.v1.enhanced_valuation import router as enhanced_valuation_router
-    app.include_router(enhanced_valuation_router, prefix="/api/v1", tags=["enhanced-valuation"])
-    logger.info("✓ Enhanced valuation router registered")
-except Exception as e:
-    logger.warning(f"Could not load enhanced_valuation router: {e}")
+routers.include("app.api.v1.enhanced_valuation", tags=["enhanced-valuation"])
 
 # Public configuration endpoint (always register, not dependent on enhanced_valuation)
-try:
-    from app.api.v1.config import router as config_router
-    app.include_router(config_router, prefix="/api/v1/config", tags=["configuration"])
-    logger.info("✓ Configuration router registered")
-except Exception as e:
-    logger.error(f"Could not load config router: {e}")
+routers.include("app.api.v1.config", prefix="/api/v1/config", tags=["configuration"])
 
 # Include email router
-try:
-    from app.api.v1.email import router as email_router
-    app.include_router(email_router, prefix="/api/v1/email", tags=["email"])
-    logger.info("✓ Email router registered")
-except Exception as e:
-    logger.warning(f"Could not load email router: {e}")
+routers.include("app.api.v1.email", prefix="/api/v1/email", tags=["email"])
 
 # Include comprehensive email router
-try:
-    from app.api.v1.comprehensive_email import router as comprehensive_email_router
-    app.include_router(comprehensive_email_router, prefix="/api/v1/email", tags=["email"])
-    logger.info("✓ Comprehensive email router registered")
-except Exception as e:
-    logger.warning(f"Could not load comprehensive email router: {e}")
+routers.include("app.api.v1.comprehensive_email", prefix="/api/v1/email", tags=["email"])
 
 # Subscription router removed - subscription logic removed from platform
 
-# Include reports router
-try:
-    from app.api.v1.reports import router as reports_router
-    app.include_router(reports_router, prefix="/api/v1", tags=["reports"])
-    logger.info("✓ Reports router registered")
-except Exception as e:
-    logger.warning(f"Could not load reports router: {e}")
+# Include reports router (PDF export)
+routers.include("app.api.v1.reports", tags=["reports"], defer_paths=["/api/v1/reports"])
 
 # Include FMV reports router
-try:
-    from app.api.v1.fmv_reports import router as fmv_reports_router
-    app.include_router(fmv_reports_router, prefix="/api/v1", tags=["fmv-reports"])
-    logger.info("✓ FMV Reports router registered")
-except Exception as e:
-    logger.warning(f"Could not load FMV reports router: {e}")
+routers.include("app.api.v1.fmv_reports", tags=["fmv-reports"])
 
 # Include Admin FMV reports router (matches frontend expectations)
-try:
-    from app.api.v1.admin_fmv_reports import router as admin_fmv_reports_router
-    app.include_router(admin_fmv_reports_router, prefix="/api/v1", tags=["admin-fmv-reports"])
-    logger.info("✓ Admin FMV Reports router registered")
-except Exception as e:
-    logger.warning(f"Could not load Admin FMV reports router: {e}")
+routers.include("app.api.v1.admin_fmv_reports", tags=["admin-fmv-reports"],
+                defer_paths=["/api/v1/admin/fmv-reports"])
 
 # Include Admin Fallback Requests router
-try:
-    from app.api.v1.admin_fallback_requests import router as admin_fallback_requests_router
-    app.include_router(admin_fallback_requests_router, prefix="/api/v1", tags=["admin-fallback-requests"])
-    logger.info("✓ Admin Fallback Requests router registered")
-except Exception as e:
-    logger.warning(f"Could not load Admin Fallback Requests router: {e}")
+routers.include("app.api.v1.admin_fallback_requests", tags=["admin-fallback-requests"])
 
-# Include analytics router
-try:
-    from app.api.v1.analytics import router as analytics_router
-    app.include_router(analytics_router, prefix="/api/v1", tags=["analytics"])
-    logger.info("✓ Analytics router registered")
-except Exception as e:
-    logger.warning(f"Could not load analytics router: {e}")
+# Include analytics router (Plotly charts)
+routers.include("app.api.v1.analytics", tags=["analytics"], defer_paths=["/api/v1/analytics"])
 
 # Include visitor tracking router
-try:
-    from app.api.v1.visitor_tracking import router as visitor_tracking_router
-    app.include_router(visitor_tracking_router, prefix="/api/v1", tags=["visitor-tracking"])
-    logger.info("✓ Visitor tracking router registered")
-except Exception as e:
-    logger.warning(f"Could not load visitor tracking router: {e}")
+routers.include("app.api.v1.visitor_tracking", tags=["visitor-tracking"])
 
 # Include market data router
-try:
-    from app.api.v1.market_data import router as market_data_router
-    app.include_router(market_data_router, prefix="/api/v1", tags=["market-data"])
-    logger.info("✓ Market data router registered")
-except Exception as e:
-    logger.warning(f"Could not load market data router: {e}")
+routers.include("app.api.v1.market_data", tags=["market-data"])
 
 # Equipment live endpoint - registered BEFORE equipment router to take precedence
 # This endpoint is public and doesn't require authentication
@@ -424,215 +418,89 @@ async def get_equipment_live_public():
     }
 
 # Include equipment router
-try:
-    from app.api.v1.equipment import router as equipment_router
-    app.include_router(equipment_router, prefix="/api/v1/equipment", tags=["equipment"])
-    logger.info("✓ Equipment router registered")
-except Exception as e:
-    logger.warning(f"Could not load equipment router: {e}")
+routers.include("app.api.v1.equipment", prefix="/api/v1/equipment", tags=["equipment"])
 
 # Include realtime feeds router (WebSocket support)
-try:
-    from app.api.v1.realtime_feeds import router as realtime_feeds_router, ws_router
-    app.include_router(realtime_feeds_router, prefix="/api/v1", tags=["realtime-feeds"])
-    app.include_router(ws_router, tags=["WebSocket"])  # Register /ws endpoint at root
-    logger.info("✓ Realtime feeds router registered")
-except Exception as e:
-    logger.warning(f"Could not load realtime feeds router: {e}")
+if routers.include("app.api.v1.realtime_feeds", tags=["realtime-feeds"]):
+    routers.include("app.api.v1.realtime_feeds", attr="ws_router", prefix="", tags=["WebSocket"])  # Register /ws endpoint at root
 
 # Include admin authentication router
-try:
-    from app.api.v1.admin_auth import router as admin_auth_router
-    app.include_router(admin_auth_router, prefix="/api/v1", tags=["admin-auth"])
-    logger.info("✓ Admin authentication router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin auth router: {e}")
+routers.include("app.api.v1.admin_auth", tags=["admin-auth"])
 
 # Include admin router (existing admin endpoints) - register BEFORE admin_users to avoid route conflicts
-try:
-    from app.api.v1.admin import router as admin_router
-    app.include_router(admin_router, prefix="/api/v1", tags=["admin"])
-    logger.info("✓ Admin router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin router: {e}")
+routers.include("app.api.v1.admin", tags=["admin"])
 
 # Include admin users management router - register AFTER admin router to avoid route conflicts
-try:
-    from app.api.v1.admin_users import router as admin_users_router
-    app.include_router(admin_users_router, prefix="/api/v1", tags=["admin-users"])
-    logger.info("✓ Admin users router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin users router: {e}")
+routers.include("app.api.v1.admin_users", tags=["admin-users"])
 
 # Include server monitoring router
-try:
-    from app.api.v1.server_monitoring import router as server_monitoring_router
-    app.include_router(server_monitoring_router, prefix="/api/v1", tags=["server-monitoring"])
-    logger.info("✓ Server monitoring router registered")
-except Exception as e:
-    logger.warning(f"Could not load server monitoring router: {e}")
+routers.include("app.api.v1.server_monitoring", tags=["server-monitoring"])
 
 # Include admin impersonation router
-try:
-    from app.api.v1.admin_impersonation import router as admin_impersonation_router
-    app.include_router(admin_impersonation_router, prefix="/api/v1", tags=["admin-impersonation"])
-    logger.info("✓ Admin impersonation router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin impersonation router: {e}")
+routers.include("app.api.v1.admin_impersonation", tags=["admin-impersonation"])
 
 # Include notification preferences router
-try:
-    from app.api.v1.notification_preferences import router as notification_preferences_router
-    app.include_router(notification_preferences_router, prefix="/api/v1", tags=["notifications"])
-    logger.info("✓ Notification preferences router registered")
-except Exception as e:
-    logger.warning(f"Could not load notification preferences router: {e}")
+routers.include("app.api.v1.notification_preferences", tags=["notifications"])
 
 # Include payment webhooks router
-try:
-    from app.api.v1.payment_webhooks import router as payment_webhooks_router
-    app.include_router(payment_webhooks_router, prefix="/api/v1", tags=["webhooks"])
-    logger.info("✓ Payment webhooks router registered")
-except Exception as e:
-    logger.warning(f"Could not load payment webhooks router: {e}")
+routers.include("app.api.v1.payment_webhooks", tags=["webhooks"])
 
 # Include user-facing payments router
-try:
-    from app.api.v1.payments import router as payments_router
-    app.include_router(payments_router, prefix="/api/v1", tags=["payments"])
-    logger.info("✓ Payments router registered")
-except Exception as e:
-    logger.warning(f"Could not load payments router: {e}")
+routers.include("app.api.v1.payments", tags=["payments"])
 
 # Include admin cranes router
-try:
-    from app.api.v1.admin_cranes import router as admin_cranes_router
-    app.include_router(admin_cranes_router, prefix="/api/v1", tags=["admin-cranes"])
-    logger.info("✓ Admin cranes router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin cranes router: {e}")
+routers.include("app.api.v1.admin_cranes", tags=["admin-cranes"])
 
 # Include admin valuations router
-try:
-    from app.api.v1.admin_valuations import router as admin_valuations_router
-    app.include_router(admin_valuations_router, prefix="/api/v1", tags=["admin-valuations"])
-    logger.info("✓ Admin valuations router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin valuations router: {e}")
+routers.include("app.api.v1.admin_valuations", tags=["admin-valuations"])
 
 # Include admin payments router
-try:
-    from app.api.v1.admin_payments import router as admin_payments_router
-    app.include_router(admin_payments_router, prefix="/api/v1", tags=["admin-payments"])
-    logger.info("✓ Admin payments router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin payments router: {e}")
+routers.include("app.api.v1.admin_payments", tags=["admin-payments"])
 
 # Admin subscriptions router removed - subscription logic removed from platform
 
 # Include admin roles router
-try:
-    from app.api.v1.admin_roles import router as admin_roles_router
-    app.include_router(admin_roles_router, prefix="/api/v1", tags=["admin-roles"])
-    logger.info("✓ Admin roles router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin roles router: {e}")
+routers.include("app.api.v1.admin_roles", tags=["admin-roles"])
 
 # Include admin algorithm router
-try:
-    from app.api.v1.admin_algorithm import router as admin_algorithm_router
-    app.include_router(admin_algorithm_router, prefix="/api/v1", tags=["admin-algorithm"])
-    logger.info("✓ Admin algorithm router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin algorithm router: {e}")
+routers.include("app.api.v1.admin_algorithm", tags=["admin-algorithm"], defer_paths=["/api/v1/admin/algorithm"])
 
 # Include admin 2FA router
-try:
-    from app.api.v1.admin_2fa import router as admin_2fa_router
-    app.include_router(admin_2fa_router, prefix="/api/v1", tags=["admin-2fa"])
-    logger.info("✓ Admin 2FA router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin 2FA router: {e}")
+routers.include("app.api.v1.admin_2fa", tags=["admin-2fa"])
 
 # Include admin audit router
-try:
-    from app.api.v1.admin_audit import router as admin_audit_router
-    app.include_router(admin_audit_router, prefix="/api/v1", tags=["admin-audit"])
-    logger.info("✓ Admin audit router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin audit router: {e}")
+routers.include("app.api.v1.admin_audit", tags=["admin-audit"], defer_paths=["/api/v1/admin/audit"])
 
 # Include admin sessions router
-try:
-    from app.api.v1.admin_sessions import router as admin_sessions_router
-    app.include_router(admin_sessions_router, prefix="/api/v1", tags=["admin-sessions"])
-    logger.info("✓ Admin sessions router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin sessions router: {e}")
+routers.include("app.api.v1.admin_sessions", tags=["admin-sessions"])
 
 # Include admin payment reconciliation router
-try:
-    from app.api.v1.admin_payment_reconciliation import router as admin_payment_reconciliation_router
-    app.include_router(admin_payment_reconciliation_router, prefix="/api/v1", tags=["admin-payment-reconciliation"])
-    logger.info("✓ Admin payment reconciliation router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin payment reconciliation router: {e}")
+routers.include("app.api.v1.admin_payment_reconciliation", tags=["admin-payment-reconciliation"])
 
 # Include admin system health router
-try:
-    from app.api.v1.admin_system_health import router as admin_system_health_router
-    app.include_router(admin_system_health_router, prefix="/api/v1", tags=["admin-system-health"])
-    logger.info("✓ Admin system health router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin system health router: {e}")
+routers.include("app.api.v1.admin_system_health", tags=["admin-system-health"])
 
 # Include admin email management router
-try:
-    from app.api.v1.admin_email_management import router as admin_email_management_router
-    app.include_router(admin_email_management_router, prefix="/api/v1", tags=["admin-email-management"])
-    logger.info("✓ Admin email management router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin email management router: {e}")
+routers.include("app.api.v1.admin_email_management", tags=["admin-email-management"],
+                defer_paths=["/api/v1/admin/emails"])
 
 # Include admin bulk operations router
-try:
-    from app.api.v1.admin_bulk_operations import router as admin_bulk_operations_router
-    app.include_router(admin_bulk_operations_router, prefix="/api/v1", tags=["admin-bulk-operations"])
-    logger.info("✓ Admin bulk operations router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin bulk operations router: {e}")
+routers.include("app.api.v1.admin_bulk_operations", tags=["admin-bulk-operations"],
+                defer_paths=["/api/v1/admin/bulk"])
 
 # Include admin GDPR router
-try:
-    from app.api.v1.admin_gdpr import router as admin_gdpr_router
-    app.include_router(admin_gdpr_router, prefix="/api/v1", tags=["admin-gdpr"])
-    logger.info("✓ Admin GDPR router registered")
-except Exception as e:
-    logger.warning(f"Could not load admin GDPR router: {e}")
+routers.include("app.api.v1.admin_gdpr", tags=["admin-gdpr"], defer_paths=["/api/v1/admin/gdpr"])
 
 # Include consultation router
-try:
-    from app.api.v1.consultation import router as consultation_router
-    app.include_router(consultation_router, prefix="/api/v1", tags=["consultation"])
-    logger.info(f"✓ Consultation router registered at prefix: /api/v1, router prefix: {consultation_router.prefix}")
-    logger.info(f"✓ Consultation routes: {[r.path for r in consultation_router.routes]}")
-except Exception as e:
-    logger.error(f"Could not load consultation router: {e}", exc_info=True)
+routers.include("app.api.v1.consultation", tags=["consultation"])
 
 # Include newsletter router
-try:
-    from app.api.v1.newsletter import router as newsletter_router
-    app.include_router(newsletter_router, prefix="/api/v1", tags=["newsletter"])
-    
+if routers.include("app.api.v1.newsletter", tags=["newsletter"]):
     # Health check endpoints
-    try:
-        from .api.v1.health import router as health_router
-        app.include_router(health_router, prefix="/api/v1", tags=["Health"])
-    except ImportError as e:
-        logger.warning(f"Health router not available: {e}")
-    logger.info("✓ Newsletter router registered")
-except Exception as e:
-    logger.warning(f"Could not load newsletter router: {e}")
+    routers.include("app.api.v1.health", tags=["Health"])
+
+if settings.startup_profile:
+    routers.report()
 
 # ==================== HEALTH CHECK ENDPOINTS ====================
 
@@ -8,7 +8,8 @@ from typing import Dict, Any, Optional
 import json
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+
+from ..services.audit_pipeline import audit_event_writer, SECURITY_EVENT
 
 logger = logging.getLogger(__name__)
 
@@ -34,40 +35,40 @@ class SecurityAuditLogger:
             ip_address: IP address of the request
             details: Additional event details
             severity: Event severity (low, medium, high, critical)
-            db: Database session (optional)
+            db: Unused; events are written by the audit pipeline
         """
-        event = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "event_type": event_type,
-            "user_id": user_id,
-            "ip_address": ip_address,
-            "details": details,
-            "severity": severity
-        }
-        
-        # Log to database if available
-        if db:
-            try:
-                # Try to insert into security_events table if it exists
-                db.execute(
-                    text("""
-                        INSERT INTO security_events (event_data, created_at)
-                        VALUES (:data, NOW())
-                        ON CONFLICT DO NOTHING
-                    """),
-                    {"data": json.dumps(event)}
-                )
-                db.commit()
-            except Exception as e:
-                # Table might not exist, just log to application logs
-                logger.debug(f"Could not log to security_events table: {e}")
-        
         # Always log to application logs
         log_message = f"SECURITY EVENT [{severity.upper()}]: {event_type}"
         if user_id:
             log_message += f" | User: {user_id}"
         log_message += f" | IP: {ip_address} | Details: {json.dumps(details)}"
         
+        # Queue for the security_events table; the audit pipeline writes it in a batch
+        # (the request's session is not used, so ``db`` is only kept for compatibility)
+        try:
+            audit_event_writer.submit(
+                SECURITY_EVENT,
+                {
+                    "event_type": event_type,
+                    "severity": severity,
+                    "description": log_message[:2000],
+                    "ip_address": ip_address,
+                    "user_agent": details.get("user_agent"),
+                    # user_id references admin_users; platform user ids go into extra_data
+                    "user_id": None,
+                    "is_resolved": False,
+                    "resolved_at": None,
+                    "resolved_by": None,
+                    "resolution_notes": None,
+                    "extra_data": {"user_id": user_id, "details": details},
+                    "timestamp": datetime.utcnow(),
+                },
+                event_class=event_type,
+                severity=severity,
+            )
+        except Exception as e:
+            logger.debug(f"Could not queue security event: {e}")
+        
         if severity == "critical":
             logger.critical(log_message)
         elif severity == "high":
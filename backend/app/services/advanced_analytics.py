@@ -39,8 +39,27 @@ import base64
 from jinja2 import Template
 from pathlib import Path
 
+from ..core.config import settings
+from .chart_cache import chart_artifact_cache, data_fingerprint, spec_to_html
+from .section_graph import Section, SectionGraph
+
 logger = logging.getLogger(__name__)
 
+# Chart name -> (title, description) used for placeholders when a chart cannot be rendered
+ANALYTICS_CHARTS = {
+    'revenue_trend': ("Revenue Trend", "Revenue data visualization"),
+    'market_analysis': ("Market Analysis", "Market trends, demand analysis, supply analysis, and regional distribution"),
+    'user_engagement': ("User Engagement", "Feature usage analysis and user satisfaction metrics"),
+    'performance_metrics': ("Performance Metrics", "System uptime, response time, resource utilization, and security metrics"),
+    'valuation_distribution': ("Valuation Distribution", "Distribution analysis of crane valuations"),
+    'regional_analysis': ("Regional Analysis", "Regional price analysis and market distribution"),
+}
+
+# Sections making up the comprehensive analytics payload
+COMPREHENSIVE_SECTIONS = (
+    "metrics", "market_analytics", "user_analytics", "performance_kpis", "charts", "insights", "recommendations"
+)
+
 @dataclass
 class AnalyticsMetrics:
     """Comprehensive analytics metrics"""
@@ -93,7 +112,8 @@ class AdvancedAnalyticsService:
     """Advanced analytics and reporting service"""
     
     def __init__(self):
-        self.analytics_cache = {}
+        self.analytics_cache = chart_artifact_cache
+        self.section_graph = self._build_section_graph()
         self.report_templates = {}
         self.chart_configs = {}
         self._initialize_templates()
@@ -130,36 +150,77 @@ class AdvancedAnalyticsService:
         </div>
         """
     
+    def _build_section_graph(self) -> SectionGraph:
+        """Report sections and their dependencies; the four data sections are independent"""
+        timeout = settings.analytics_section_timeout_seconds
+        ttl = settings.analytics_section_cache_seconds
+        data_sections = ("metrics", "market_analytics", "user_analytics", "performance_kpis")
+        return SectionGraph([
+            Section("metrics", lambda ctx: self._calculate_analytics_metrics(ctx["start_date"], ctx["end_date"]),
+                    timeout_seconds=timeout, ttl_seconds=ttl),
+            Section("market_analytics", lambda ctx: self._analyze_market_trends(ctx["start_date"], ctx["end_date"]),
+                    timeout_seconds=timeout, ttl_seconds=ttl),
+            Section("user_analytics", lambda ctx: self._analyze_user_behavior(ctx["start_date"], ctx["end_date"]),
+                    timeout_seconds=timeout, ttl_seconds=ttl),
+            Section("performance_kpis", lambda ctx: self._calculate_performance_kpis(ctx["start_date"], ctx["end_date"]),
+                    timeout_seconds=timeout, ttl_seconds=ttl),
+            # Charts have their own artifact cache keyed by data fingerprint
+            Section("charts", lambda ctx, *data: self._generate_analytics_charts(
+                        *data, window=ctx["chart_window"], chart_format=ctx["chart_format"],
+                        chart_types=ctx["chart_types"]),
+                    deps=data_sections, timeout_seconds=timeout * 3, ttl_seconds=0, fallback={}),
+            Section("insights", lambda ctx, *data: self._generate_insights(*data),
+                    deps=data_sections, timeout_seconds=timeout, ttl_seconds=ttl, fallback=[]),
+            Section("recommendations", lambda ctx, *data: self._generate_recommendations(*data),
+                    deps=data_sections, timeout_seconds=timeout, ttl_seconds=ttl, fallback=[]),
+        ])
+    
+    async def _run_sections(self, start_date: datetime, end_date: datetime, targets: List[str],
+                            chart_format: str = "html", chart_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Compute the requested report sections (and their dependencies) for the period"""
+        window = f"{start_date:%Y-%m-%dT%H:%M}:{end_date:%Y-%m-%dT%H:%M}"
+        context = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "chart_window": f"{start_date.date().isoformat()}:{end_date.date().isoformat()}",
+            "chart_format": chart_format,
+            "chart_types": chart_types,
+        }
+        return await self.section_graph.run(targets, window, context)
+    
+    @staticmethod
+    def _period(start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'duration_days': (end_date - start_date).days
+        }
+    
     async def generate_comprehensive_analytics(self, 
                                              start_date: datetime, 
-                                             end_date: datetime) -> Dict[str, Any]:
+                                             end_date: datetime,
+                                             chart_format: str = "html",
+                                             chart_types: Optional[List[str]] = None) -> Dict[str, Any]:
         """Generate comprehensive analytics for the specified period"""
         try:
             logger.info(f"Generating comprehensive analytics from {start_date} to {end_date}")
             
-            # Generate all analytics components
-            metrics = await self._calculate_analytics_metrics(start_date, end_date)
-            market_analytics = await self._analyze_market_trends(start_date, end_date)
-            user_analytics = await self._analyze_user_behavior(start_date, end_date)
-            performance_kpis = await self._calculate_performance_kpis(start_date, end_date)
-            
-            # Generate visualizations
-            charts = await self._generate_analytics_charts(metrics, market_analytics, user_analytics, performance_kpis)
+            # Data sections run concurrently; charts, insights and recommendations start once they are ready
+            sections = await self._run_sections(
+                start_date, end_date, list(COMPREHENSIVE_SECTIONS),
+                chart_format=chart_format, chart_types=chart_types
+            )
             
             # Compile comprehensive report
             comprehensive_analytics = {
-                'period': {
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'duration_days': (end_date - start_date).days
-                },
-                'metrics': asdict(metrics),
-                'market_analytics': asdict(market_analytics),
-                'user_analytics': asdict(user_analytics),
-                'performance_kpis': asdict(performance_kpis),
-                'charts': charts,
-                'insights': await self._generate_insights(metrics, market_analytics, user_analytics, performance_kpis),
-                'recommendations': await self._generate_recommendations(metrics, market_analytics, user_analytics, performance_kpis),
+                'period': self._period(start_date, end_date),
+                'metrics': asdict(sections['metrics']),
+                'market_analytics': asdict(sections['market_analytics']),
+                'user_analytics': asdict(sections['user_analytics']),
+                'performance_kpis': asdict(sections['performance_kpis']),
+                'charts': sections['charts'],
+                'insights': sections['insights'],
+                'recommendations': sections['recommendations'],
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -308,311 +369,277 @@ class AdvancedAnalyticsService:
                                       metrics: AnalyticsMetrics,
                                       market_analytics: MarketAnalytics,
                                       user_analytics: UserBehaviorAnalytics,
-                                      performance_kpis: PerformanceKPIs) -> Dict[str, str]:
-        """Generate analytics charts and visualizations"""
+                                      performance_kpis: PerformanceKPIs,
+                                      window: str = "",
+                                      chart_format: str = "html",
+                                      chart_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Generate analytics charts and visualizations.
+        
+        Figures come from the chart artifact cache (keyed by chart type and data window,
+        re-rendered off the event loop when their input data changes). ``chart_format``
+        "html" returns embeddable HTML as before, "json" the Plotly figure specs.
+        """
         try:
-            charts = {}
-            
-            # Revenue trend chart
-            charts['revenue_trend'] = await self._create_revenue_trend_chart()
-            
-            # Market analysis chart
-            charts['market_analysis'] = await self._create_market_analysis_chart(market_analytics)
-            
-            # User engagement chart
-            charts['user_engagement'] = await self._create_user_engagement_chart(user_analytics)
-            
-            # Performance metrics chart
-            charts['performance_metrics'] = await self._create_performance_metrics_chart(performance_kpis)
-            
-            # Valuation distribution chart
-            charts['valuation_distribution'] = await self._create_valuation_distribution_chart()
-            
-            # Regional analysis chart
-            charts['regional_analysis'] = await self._create_regional_analysis_chart(market_analytics)
-            
-            return charts
+            chart_inputs = {
+                'revenue_trend': (),
+                'market_analysis': (market_analytics,),
+                'user_engagement': (user_analytics,),
+                'performance_metrics': (performance_kpis,),
+                'valuation_distribution': (),
+                'regional_analysis': (market_analytics,),
+            }
+            names = [name for name in chart_inputs if chart_types is None or name in chart_types]
+            
+            async def chart(name: str) -> Any:
+                title, description = ANALYTICS_CHARTS[name]
+                if not PLOTLY_AVAILABLE:
+                    return self._create_simple_chart(title, description) if chart_format == "html" else None
+                inputs = chart_inputs[name]
+                builder = getattr(self, f"_build_{name}_figure")
+                artifact = await chart_artifact_cache.get(
+                    name, window, data_fingerprint(*(asdict(i) for i in inputs)),
+                    lambda: builder(*inputs).to_json()
+                )
+                if artifact is None:
+                    return self._create_simple_chart(title, description) if chart_format == "html" else None
+                return spec_to_html(artifact.spec, name) if chart_format == "html" else artifact.figure
+            
+            rendered = await asyncio.gather(*(chart(name) for name in names))
+            return dict(zip(names, rendered))
             
         except Exception as e:
             logger.error(f"Error generating analytics charts: {e}")
             return {}
     
-    async def _create_revenue_trend_chart(self) -> str:
-        """Create revenue trend chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("Revenue Trend", "Revenue data visualization")
-            
-            # Simulate revenue data
-            dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='ME')
-            revenue = [1000000 + i * 50000 + np.random.normal(0, 20000) for i in range(len(dates))]
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=revenue,
-                mode='lines+markers',
-                name='Revenue',
-                line=dict(color='#1f77b4', width=3)
-            ))
-            
-            fig.update_layout(
-                title='Revenue Trend Analysis',
-                xaxis_title='Month',
-                yaxis_title='Revenue ($)',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12)
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="revenue_trend")
-            
-        except Exception as e:
-            logger.error(f"Error creating revenue trend chart: {e}")
-            return self._create_simple_chart("Revenue Trend", "Revenue data visualization")
+    def _build_revenue_trend_figure(self):
+        """Build revenue trend figure"""
+        # Simulate revenue data
+        dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='ME')
+        revenue = [1000000 + i * 50000 + np.random.normal(0, 20000) for i in range(len(dates))]
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=revenue,
+            mode='lines+markers',
+            name='Revenue',
+            line=dict(color='#1f77b4', width=3)
+        ))
+        
+        fig.update_layout(
+            title='Revenue Trend Analysis',
+            xaxis_title='Month',
+            yaxis_title='Revenue ($)',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        
+        return fig
     
-    async def _create_market_analysis_chart(self, market_analytics: MarketAnalytics) -> str:
-        """Create market analysis chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("Market Analysis", "Market trends, demand analysis, supply analysis, and regional distribution")
-            
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=('Price Trends', 'Demand Analysis', 'Supply Analysis', 'Regional Analysis'),
-                specs=[[{"type": "scatter"}, {"type": "bar"}],
-                       [{"type": "bar"}, {"type": "pie"}]]
-            )
-            
-            # Price trends
-            fig.add_trace(
-                go.Scatter(x=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-                          y=[100, 105, 110, 108, 115, 120],
-                          mode='lines+markers',
-                          name='Price Index'),
-                row=1, col=1
-            )
-            
-            # Demand analysis
-            fig.add_trace(
-                go.Bar(x=['North', 'South', 'East', 'West'],
-                      y=[0.8, 1.2, 0.9, 1.1],
-                      name='Demand Level'),
-                row=1, col=2
-            )
-            
-            # Supply analysis
-            fig.add_trace(
-                go.Bar(x=['New Listings', 'Sold Listings', 'Active Listings'],
-                      y=[45, 38, 67],
-                      name='Supply Metrics'),
-                row=2, col=1
-            )
-            
-            # Regional analysis
-            fig.add_trace(
-                go.Pie(labels=['Texas', 'California', 'Florida', 'Others'],
-                      values=[35, 25, 20, 20],
-                      name='Regional Distribution'),
-                row=2, col=2
-            )
-            
-            fig.update_layout(
-                title='Market Analysis Dashboard',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12),
-                height=600
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="market_analysis")
-            
-        except Exception as e:
-            logger.error(f"Error creating market analysis chart: {e}")
-            return self._create_simple_chart("Market Analysis", "Market trends, demand analysis, supply analysis, and regional distribution")
+    def _build_market_analysis_figure(self, market_analytics: MarketAnalytics):
+        """Build market analysis figure"""
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Price Trends', 'Demand Analysis', 'Supply Analysis', 'Regional Analysis'),
+            specs=[[{"type": "scatter"}, {"type": "bar"}],
+                   [{"type": "bar"}, {"type": "pie"}]]
+        )
+        
+        # Price trends
+        fig.add_trace(
+            go.Scatter(x=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
+                      y=[100, 105, 110, 108, 115, 120],
+                      mode='lines+markers',
+                      name='Price Index'),
+            row=1, col=1
+        )
+        
+        # Demand analysis
+        fig.add_trace(
+            go.Bar(x=['North', 'South', 'East', 'West'],
+                  y=[0.8, 1.2, 0.9, 1.1],
+                  name='Demand Level'),
+            row=1, col=2
+        )
+        
+        # Supply analysis
+        fig.add_trace(
+            go.Bar(x=['New Listings', 'Sold Listings', 'Active Listings'],
+                  y=[45, 38, 67],
+                  name='Supply Metrics'),
+            row=2, col=1
+        )
+        
+        # Regional analysis
+        fig.add_trace(
+            go.Pie(labels=['Texas', 'California', 'Florida', 'Others'],
+                  values=[35, 25, 20, 20],
+                  name='Regional Distribution'),
+            row=2, col=2
+        )
+        
+        fig.update_layout(
+            title='Market Analysis Dashboard',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12),
+            height=600
+        )
+        
+        return fig
     
-    async def _create_user_engagement_chart(self, user_analytics: UserBehaviorAnalytics) -> str:
-        """Create user engagement chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("User Engagement", "Feature usage analysis and user satisfaction metrics")
-            
-            fig = make_subplots(
-                rows=1, cols=2,
-                subplot_titles=('Feature Usage', 'User Metrics'),
-                specs=[[{"type": "bar"}, {"type": "indicator"}]]
-            )
-            
-            # Feature usage
-            features = list(user_analytics.feature_usage.keys())
-            usage = list(user_analytics.feature_usage.values())
-            
-            fig.add_trace(
-                go.Bar(x=features, y=usage, name='Feature Usage'),
-                row=1, col=1
-            )
-            
-            # User metrics gauge
-            fig.add_trace(
-                go.Indicator(
-                    mode="gauge+number",
-                    value=user_analytics.user_satisfaction,
-                    title={'text': "User Satisfaction"},
-                    gauge={'axis': {'range': [None, 5]},
-                          'bar': {'color': "darkblue"},
-                          'steps': [{'range': [0, 2], 'color': "lightgray"},
-                                   {'range': [2, 4], 'color': "gray"}],
-                          'threshold': {'line': {'color': "red", 'width': 4},
-                                      'thickness': 0.75, 'value': 4.5}}),
-                row=1, col=2
-            )
-            
-            fig.update_layout(
-                title='User Engagement Analytics',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12),
-                height=400
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="user_engagement")
-            
-        except Exception as e:
-            logger.error(f"Error creating user engagement chart: {e}")
-            return self._create_simple_chart("User Engagement", "Feature usage analysis and user satisfaction metrics")
+    def _build_user_engagement_figure(self, user_analytics: UserBehaviorAnalytics):
+        """Build user engagement figure"""
+        fig = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=('Feature Usage', 'User Metrics'),
+            specs=[[{"type": "bar"}, {"type": "indicator"}]]
+        )
+        
+        # Feature usage
+        features = list(user_analytics.feature_usage.keys())
+        usage = list(user_analytics.feature_usage.values())
+        
+        fig.add_trace(
+            go.Bar(x=features, y=usage, name='Feature Usage'),
+            row=1, col=1
+        )
+        
+        # User metrics gauge
+        fig.add_trace(
+            go.Indicator(
+                mode="gauge+number",
+                value=user_analytics.user_satisfaction,
+                title={'text': "User Satisfaction"},
+                gauge={'axis': {'range': [None, 5]},
+                      'bar': {'color': "darkblue"},
+                      'steps': [{'range': [0, 2], 'color': "lightgray"},
+                               {'range': [2, 4], 'color': "gray"}],
+                      'threshold': {'line': {'color': "red", 'width': 4},
+                                  'thickness': 0.75, 'value': 4.5}}),
+            row=1, col=2
+        )
+        
+        fig.update_layout(
+            title='User Engagement Analytics',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12),
+            height=400
+        )
+        
+        return fig
     
-    async def _create_performance_metrics_chart(self, performance_kpis: PerformanceKPIs) -> str:
-        """Create performance metrics chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("Performance Metrics", "System uptime, response time, resource utilization, and security metrics")
-            
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=('System Uptime', 'Response Time', 'Resource Utilization', 'Security Score'),
-                specs=[[{"type": "indicator"}, {"type": "scatter"}],
-                       [{"type": "bar"}, {"type": "indicator"}]]
-            )
-            
-            # System uptime
-            fig.add_trace(
-                go.Indicator(
-                    mode="gauge+number",
-                    value=performance_kpis.system_uptime,
-                    title={'text': "System Uptime (%)"},
-                    gauge={'axis': {'range': [None, 100]},
-                          'bar': {'color': "darkgreen"},
-                          'steps': [{'range': [0, 95], 'color': "lightgray"},
-                                   {'range': [95, 100], 'color': "lightgreen"}],
-                          'threshold': {'line': {'color': "red", 'width': 4},
-                                      'thickness': 0.75, 'value': 99}}),
-                row=1, col=1
-            )
-            
-            # Response time
-            fig.add_trace(
-                go.Scatter(x=['Mon', 'Tue', 'Wed', 'Thu', 'Fri'],
-                          y=[1.1, 1.2, 1.0, 1.3, 1.1],
-                          mode='lines+markers',
-                          name='Response Time (s)'),
-                row=1, col=2
-            )
-            
-            # Resource utilization
-            resources = list(performance_kpis.resource_utilization.keys())
-            utilization = list(performance_kpis.resource_utilization.values())
-            
-            fig.add_trace(
-                go.Bar(x=resources, y=utilization, name='Resource Utilization'),
-                row=2, col=1
-            )
-            
-            # Security score
-            fig.add_trace(
-                go.Indicator(
-                    mode="gauge+number",
-                    value=performance_kpis.security_metrics['security_score'] * 100,
-                    title={'text': "Security Score (%)"},
-                    gauge={'axis': {'range': [None, 100]},
-                          'bar': {'color': "darkblue"},
-                          'steps': [{'range': [0, 80], 'color': "lightgray"},
-                                   {'range': [80, 100], 'color': "lightblue"}],
-                          'threshold': {'line': {'color': "red", 'width': 4},
-                                      'thickness': 0.75, 'value': 90}}),
-                row=2, col=2
-            )
-            
-            fig.update_layout(
-                title='Performance Metrics Dashboard',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12),
-                height=600
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="performance_metrics")
-            
-        except Exception as e:
-            logger.error(f"Error creating performance metrics chart: {e}")
-            return self._create_simple_chart("Performance Metrics", "System uptime, response time, resource utilization, and security metrics")
+    def _build_performance_metrics_figure(self, performance_kpis: PerformanceKPIs):
+        """Build performance metrics figure"""
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('System Uptime', 'Response Time', 'Resource Utilization', 'Security Score'),
+            specs=[[{"type": "indicator"}, {"type": "scatter"}],
+                   [{"type": "bar"}, {"type": "indicator"}]]
+        )
+        
+        # System uptime
+        fig.add_trace(
+            go.Indicator(
+                mode="gauge+number",
+                value=performance_kpis.system_uptime,
+                title={'text': "System Uptime (%)"},
+                gauge={'axis': {'range': [None, 100]},
+                      'bar': {'color': "darkgreen"},
+                      'steps': [{'range': [0, 95], 'color': "lightgray"},
+                               {'range': [95, 100], 'color': "lightgreen"}],
+                      'threshold': {'line': {'color': "red", 'width': 4},
+                                  'thickness': 0.75, 'value': 99}}),
+            row=1, col=1
+        )
+        
+        # Response time
+        fig.add_trace(
+            go.Scatter(x=['Mon', 'Tue', 'Wed', 'Thu', 'Fri'],
+                      y=[1.1, 1.2, 1.0, 1.3, 1.1],
+                      mode='lines+markers',
+                      name='Response Time (s)'),
+            row=1, col=2
+        )
+        
+        # Resource utilization
+        resources = list(performance_kpis.resource_utilization.keys())
+        utilization = list(performance_kpis.resource_utilization.values())
+        
+        fig.add_trace(
+            go.Bar(x=resources, y=utilization, name='Resource Utilization'),
+            row=2, col=1
+        )
+        
+        # Security score
+        fig.add_trace(
+            go.Indicator(
+                mode="gauge+number",
+                value=performance_kpis.security_metrics['security_score'] * 100,
+                title={'text': "Security Score (%)"},
+                gauge={'axis': {'range': [None, 100]},
+                      'bar': {'color': "darkblue"},
+                      'steps': [{'range': [0, 80], 'color': "lightgray"},
+                               {'range': [80, 100], 'color': "lightblue"}],
+                      'threshold': {'line': {'color': "red", 'width': 4},
+                                  'thickness': 0.75, 'value': 90}}),
+            row=2, col=2
+        )
+        
+        fig.update_layout(
+            title='Performance Metrics Dashboard',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12),
+            height=600
+        )
+        
+        return fig
     
-    async def _create_valuation_distribution_chart(self) -> str:
-        """Create valuation distribution chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("Valuation Distribution", "Distribution analysis of crane valuations")
-            
-            # Simulate valuation data
-            valuations = np.random.normal(1250000, 300000, 1000)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Histogram(
-                x=valuations,
-                nbinsx=30,
-                name='Valuation Distribution',
-                marker_color='#1f77b4'
-            ))
-            
-            fig.update_layout(
-                title='Valuation Distribution Analysis',
-                xaxis_title='Valuation Amount ($)',
-                yaxis_title='Frequency',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12)
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="valuation_distribution")
-            
-        except Exception as e:
-            logger.error(f"Error creating valuation distribution chart: {e}")
-            return self._create_simple_chart("Valuation Distribution", "Distribution analysis of crane valuations")
+    def _build_valuation_distribution_figure(self):
+        """Build valuation distribution figure"""
+        # Simulate valuation data
+        valuations = np.random.normal(1250000, 300000, 1000)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Histogram(
+            x=valuations,
+            nbinsx=30,
+            name='Valuation Distribution',
+            marker_color='#1f77b4'
+        ))
+        
+        fig.update_layout(
+            title='Valuation Distribution Analysis',
+            xaxis_title='Valuation Amount ($)',
+            yaxis_title='Frequency',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        
+        return fig
     
-    async def _create_regional_analysis_chart(self, market_analytics: MarketAnalytics) -> str:
-        """Create regional analysis chart"""
-        try:
-            if not PLOTLY_AVAILABLE:
-                return self._create_simple_chart("Regional Analysis", "Regional price analysis and market distribution")
-            
-            regions = list(market_analytics.regional_analysis['regional_prices'].keys())
-            prices = list(market_analytics.regional_analysis['regional_prices'].values())
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=regions,
-                y=prices,
-                name='Average Regional Prices',
-                marker_color='#ff7f0e'
-            ))
-            
-            fig.update_layout(
-                title='Regional Price Analysis',
-                xaxis_title='Region',
-                yaxis_title='Average Price ($)',
-                template='plotly_white',
-                font=dict(family="Arial, sans-serif", size=12)
-            )
-            
-            return fig.to_html(include_plotlyjs='cdn', div_id="regional_analysis")
-            
-        except Exception as e:
-            logger.error(f"Error creating regional analysis chart: {e}")
-            return self._create_simple_chart("Regional Analysis", "Regional price analysis and market distribution")
+    def _build_regional_analysis_figure(self, market_analytics: MarketAnalytics):
+        """Build regional analysis figure"""
+        regions = list(market_analytics.regional_analysis['regional_prices'].keys())
+        prices = list(market_analytics.regional_analysis['regional_prices'].values())
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=regions,
+            y=prices,
+            name='Average Regional Prices',
+            marker_color='#ff7f0e'
+        ))
+        
+        fig.update_layout(
+            title='Regional Price Analysis',
+            xaxis_title='Region',
+            yaxis_title='Average Price ($)',
+            template='plotly_white',
+            font=dict(family="Arial, sans-serif", size=12)
+        )
+        
+        return fig
     
     async def _generate_insights(self, 
                                metrics: AnalyticsMetrics,
@@ -704,19 +731,22 @@ class AdvancedAnalyticsService:
                                       end_date: datetime) -> str:
         """Generate executive summary report"""
         try:
-            analytics = await self.generate_comprehensive_analytics(start_date, end_date)
+            sections = await self._run_sections(
+                start_date, end_date, ["metrics", "performance_kpis", "insights", "recommendations"]
+            )
+            metrics = sections['metrics']
             
             # Generate executive summary
             executive_summary = {
-                'period': analytics['period'],
+                'period': self._period(start_date, end_date),
                 'key_metrics': {
-                    'total_valuations': analytics['metrics']['total_valuations'],
-                    'total_revenue': analytics['metrics']['total_revenue'],
-                    'user_engagement': analytics['metrics']['user_engagement'],
-                    'system_uptime': analytics['performance_kpis']['system_uptime']
+                    'total_valuations': metrics.total_valuations,
+                    'total_revenue': metrics.total_revenue,
+                    'user_engagement': metrics.user_engagement,
+                    'system_uptime': sections['performance_kpis'].system_uptime
                 },
-                'top_insights': analytics['insights'][:3],
-                'key_recommendations': analytics['recommendations'][:3],
+                'top_insights': sections['insights'][:3],
+                'key_recommendations': sections['recommendations'][:3],
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -731,16 +761,19 @@ class AdvancedAnalyticsService:
                                    end_date: datetime) -> str:
         """Generate market analysis report"""
         try:
-            analytics = await self.generate_comprehensive_analytics(start_date, end_date)
+            sections = await self._run_sections(
+                start_date, end_date, ["market_analytics", "charts", "insights"],
+                chart_types=["market_analysis", "regional_analysis"]
+            )
             
             market_report = {
-                'period': analytics['period'],
-                'market_analytics': analytics['market_analytics'],
+                'period': self._period(start_date, end_date),
+                'market_analytics': asdict(sections['market_analytics']),
                 'charts': {
-                    'market_analysis': analytics['charts'].get('market_analysis', ''),
-                    'regional_analysis': analytics['charts'].get('regional_analysis', '')
+                    'market_analysis': sections['charts'].get('market_analysis', ''),
+                    'regional_analysis': sections['charts'].get('regional_analysis', '')
                 },
-                'market_insights': [insight for insight in analytics['insights'] if 'market' in insight.lower()],
+                'market_insights': [insight for insight in sections['insights'] if 'market' in insight.lower()],
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -755,15 +788,18 @@ class AdvancedAnalyticsService:
                                            end_date: datetime) -> str:
         """Generate user analytics report"""
         try:
-            analytics = await self.generate_comprehensive_analytics(start_date, end_date)
+            sections = await self._run_sections(
+                start_date, end_date, ["user_analytics", "charts", "insights"],
+                chart_types=["user_engagement"]
+            )
             
             user_report = {
-                'period': analytics['period'],
-                'user_analytics': analytics['user_analytics'],
+                'period': self._period(start_date, end_date),
+                'user_analytics': asdict(sections['user_analytics']),
                 'charts': {
-                    'user_engagement': analytics['charts'].get('user_engagement', '')
+                    'user_engagement': sections['charts'].get('user_engagement', '')
                 },
-                'user_insights': [insight for insight in analytics['insights'] if 'user' in insight.lower()],
+                'user_insights': [insight for insight in sections['insights'] if 'user' in insight.lower()],
                 'generated_at': datetime.now().isoformat()
             }
             
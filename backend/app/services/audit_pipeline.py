@@ -0,0 +1,300 @@
+"""
+Audit Event Pipeline
+Buffers admin audit logs and security events in memory and writes them in batches off the request path
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..core.config import settings
+from ..models.admin import AuditLog, SecurityEvent
+
+logger = logging.getLogger(__name__)
+
+# Event kinds -> target tables
+AUDIT_LOG = "audit_log"
+SECURITY_EVENT = "security_event"
+TABLES = {
+    AUDIT_LOG: AuditLog.__table__,
+    SECURITY_EVENT: SecurityEvent.__table__,
+}
+
+# Durability classes
+BEST_EFFORT = "best_effort"  # dropped (and counted) when the queue is full
+BUFFERED = "buffered"        # spilled to the local file when the queue is full
+IMMEDIATE = "immediate"      # like buffered, but wakes the flusher instead of waiting for a full batch
+
+DURABILITY_LEVELS = (BEST_EFFORT, BUFFERED, IMMEDIATE)
+
+# Default durability per event class; security events fall back to their severity
+DEFAULT_DURABILITY = {
+    "admin_action": BUFFERED,
+    "bot_detected": BEST_EFFORT,
+    "severity:critical": IMMEDIATE,
+    "severity:high": IMMEDIATE,
+    "severity:medium": BUFFERED,
+    "severity:low": BEST_EFFORT,
+}
+
+DATETIME_FIELDS = ("timestamp", "resolved_at")
+
+
+class AuditEventWriter:
+    """
+    Bounded in-process queue drained by a background thread.
+
+    Events are written with one multi-row INSERT per table every ``batch_size``
+    events or ``flush_interval_ms``, whichever comes first. When the database write
+    fails the batch is appended to a JSONL spill file, which is replayed after the
+    next successful write.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval_ms: int,
+                 spill_path: Path, durability_overrides: Optional[Dict[str, str]] = None):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(flush_interval_ms, 1) / 1000.0
+        self.spill_path = spill_path
+        self.durability = dict(DEFAULT_DURABILITY)
+        for event_class, level in (durability_overrides or {}).items():
+            if level in DURABILITY_LEVELS:
+                self.durability[event_class] = level
+            else:
+                logger.warning(f"Ignoring unknown audit durability '{level}' for {event_class}")
+
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "batches": 0,
+            "write_failures": 0,
+            "last_batch_size": 0,
+            "last_write_ms": 0.0,
+            "last_error": None,
+        }
+
+    # ------------------------------------------------------------------ submit
+
+    def durability_for(self, event_class: str, severity: Optional[str] = None) -> str:
+        if event_class in self.durability:
+            return self.durability[event_class]
+        if severity and f"severity:{severity}" in self.durability:
+            return self.durability[f"severity:{severity}"]
+        return BUFFERED
+
+    def submit(self, kind: str, row: Dict[str, Any], event_class: str,
+               severity: Optional[str] = None) -> bool:
+        """Queue one row for ``kind``'s table; returns False if it was dropped"""
+        durability = self.durability_for(event_class, severity)
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((kind, row))
+        except queue.Full:
+            if durability == BEST_EFFORT:
+                self._count("dropped")
+                return False
+            self._spill([(kind, row)])
+            return True
+        self._count("enqueued")
+        if durability == IMMEDIATE or self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        return True
+
+    # ------------------------------------------------------------------ flusher
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-event-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        with self._drain_lock:
+            self._drain_locked()
+
+    def _drain_locked(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                self._replay_spill()
+                return
+            if self._write(batch):
+                self._replay_spill()
+            else:
+                self._spill(batch)
+            if len(batch) < self.batch_size:
+                return
+
+    def _take_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """One multi-row INSERT per table, in a single transaction"""
+        from ..core.database import engine
+
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, row in batch:
+            by_kind.setdefault(kind, []).append(row)
+
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                for kind, rows in by_kind.items():
+                    conn.execute(insert(TABLES[kind]).values(rows))
+        except (IntegrityError, DataError) as e:
+            # The database is up but some row is invalid: write row by row and drop the bad ones
+            logger.warning(f"Audit batch rejected ({e.__class__.__name__}), retrying row by row")
+            return self._write_rows(batch)
+        except Exception as e:
+            with self._stats_lock:
+                self.stats["write_failures"] += 1
+                self.stats["last_error"] = str(e)[:300]
+            logger.warning(f"Audit batch of {len(batch)} events could not be written, spilling to file: {e}")
+            return False
+
+        with self._stats_lock:
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["last_batch_size"] = len(batch)
+            self.stats["last_write_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+    def _write_rows(self, batch: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Row-by-row fallback; every row ends up written, dropped as invalid, or spilled"""
+        from ..core.database import engine
+
+        for index, (kind, row) in enumerate(batch):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(TABLES[kind]).values(row))
+                self._count("written")
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Dropping invalid {kind} event {row}: {e}")
+                self._count("dropped")
+            except Exception as e:
+                # Lost the database midway: keep the unwritten rows
+                logger.warning(f"Audit row write failed, spilling the remaining events: {e}")
+                self._spill(batch[index:])
+                break
+        self._count("batches")
+        return True
+
+    # ------------------------------------------------------------------ spill file
+
+    def _spill(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        try:
+            with self._spill_lock:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    for kind, row in batch:
+                        f.write(json.dumps({"kind": kind, "row": row}, default=str) + "\n")
+            self._count("spilled", len(batch))
+        except Exception as e:
+            # Last resort: the events are at least in the application log
+            logger.error(f"Could not spill {len(batch)} audit events: {e}; events: {batch}")
+            self._count("dropped", len(batch))
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path.exists():
+            return
+        replay_path = self.spill_path.with_suffix(self.spill_path.suffix + ".replay")
+        with self._spill_lock:
+            if not self.spill_path.exists():
+                return
+            os.replace(self.spill_path, replay_path)
+
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                row = record["row"]
+                for name in DATETIME_FIELDS:
+                    if isinstance(row.get(name), str):
+                        row[name] = datetime.fromisoformat(row[name])
+                pending.append((record["kind"], row))
+
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            if not self._write(chunk):
+                # Database still unavailable: keep the rest for the next attempt
+                self._spill(pending[start:])
+                break
+            self._count("replayed", len(chunk))
+        os.remove(replay_path)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def flush(self) -> None:
+        """Write everything queued so far (used on shutdown and by scripts)"""
+        self._drain()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._drain()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update({
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "spill_file_bytes": self.spill_path.stat().st_size if self.spill_path.exists() else 0,
+            "durability": self.durability,
+        })
+        return stats
+
+
+# Global instance
+audit_event_writer = AuditEventWriter(
+    max_queue=settings.audit_queue_max,
+    batch_size=settings.audit_batch_size,
+    flush_interval_ms=settings.audit_flush_interval_ms,
+    spill_path=Path(settings.audit_spill_path),
+    durability_overrides=settings.audit_event_durability,
+)
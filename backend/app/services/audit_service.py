@@ -1,10 +1,12 @@
 """
 Audit Logging Service for Admin Actions
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from ..models.admin import AuditLog, AdminUser
+from .audit_pipeline import audit_event_writer, AUDIT_LOG
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,30 +28,30 @@ class AuditService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
         session_id: Optional[str] = None
-    ) -> AuditLog:
-        """Log an admin action"""
-        try:
-            audit_log = AuditLog(
-                admin_user_id=admin_user_id,
-                action=action,
-                resource_type=resource_type,
-                resource_id=str(resource_id),
-                old_values=old_values,
-                new_values=new_values,
-                description=description,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                session_id=session_id,
-                timestamp=datetime.utcnow()
-            )
-            db.add(audit_log)
-            db.commit()
-            db.refresh(audit_log)
-            return audit_log
-        except Exception as e:
-            logger.error(f"Error logging audit action: {e}")
-            db.rollback()
-            raise
+    ) -> None:
+        """
+        Log an admin action
+        
+        The row is queued on the audit pipeline and written in a batch by its background
+        flusher, so the caller's session is neither flushed nor committed here.
+        """
+        audit_event_writer.submit(
+            AUDIT_LOG,
+            {
+                "admin_user_id": admin_user_id,
+                "action": action,
+                "resource_type": resource_type,
+                "resource_id": str(resource_id),
+                "old_values": old_values,
+                "new_values": new_values,
+                "description": description,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "session_id": session_id,
+                "timestamp": datetime.utcnow(),
+            },
+            event_class="admin_action",
+        )
     
     @staticmethod
     def log_create(
@@ -61,7 +63,7 @@ class AuditService:
         description: Optional[str] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log a create action"""
         return AuditService.log_action(
             db=db,
@@ -86,7 +88,7 @@ class AuditService:
         description: Optional[str] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log an update action"""
         return AuditService.log_action(
             db=db,
@@ -111,7 +113,7 @@ class AuditService:
         description: Optional[str] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log a delete action"""
         return AuditService.log_action(
             db=db,
@@ -134,7 +136,7 @@ class AuditService:
         description: Optional[str] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log a view action (for sensitive data)"""
         return AuditService.log_action(
             db=db,
@@ -154,7 +156,7 @@ class AuditService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
         session_id: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log a login action"""
         return AuditService.log_action(
             db=db,
@@ -175,7 +177,7 @@ class AuditService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
         session_id: Optional[str] = None
-    ) -> AuditLog:
+    ) -> None:
         """Log a logout action"""
         return AuditService.log_action(
             db=db,
@@ -199,10 +201,13 @@ class AuditService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        with_admin: bool = False
     ) -> List[AuditLog]:
-        """Get audit logs with filters"""
+        """Get audit logs with filters (with_admin loads admin_user in the same query)"""
         query = db.query(AuditLog)
+        if with_admin:
+            query = query.options(joinedload(AuditLog.admin_user))
         
         if admin_user_id:
             query = query.filter(AuditLog.admin_user_id == admin_user_id)
@@ -247,6 +252,92 @@ class AuditService:
         
         return query.count()
     
+    @staticmethod
+    def get_audit_stats(db: Session, start_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """Exact audit counts per action, resource type and admin, aggregated in SQL"""
+        def in_period(query):
+            if start_date:
+                query = query.filter(AuditLog.timestamp >= start_date)
+            return query
+        
+        total_logs = in_period(db.query(func.count(AuditLog.id))).scalar() or 0
+        
+        logs_by_action = dict(
+            in_period(db.query(AuditLog.action, func.count(AuditLog.id)))
+            .group_by(AuditLog.action)
+            .all()
+        )
+        logs_by_resource_type = dict(
+            in_period(db.query(AuditLog.resource_type, func.count(AuditLog.id)))
+            .group_by(AuditLog.resource_type)
+            .all()
+        )
+        
+        # Admin names are joined in the same grouped query (no per-log relationship loads)
+        admin_rows = (
+            in_period(
+                db.query(AuditLog.admin_user_id, AdminUser.full_name, func.count(AuditLog.id))
+                .outerjoin(AdminUser, AdminUser.id == AuditLog.admin_user_id)
+            )
+            .group_by(AuditLog.admin_user_id, AdminUser.full_name)
+            .all()
+        )
+        logs_by_admin: Dict[str, int] = {}
+        for admin_user_id, full_name, count in admin_rows:
+            admin_name = full_name if full_name else f"User {admin_user_id}"
+            logs_by_admin[admin_name] = logs_by_admin.get(admin_name, 0) + count
+        
+        return {
+            "total_logs": total_logs,
+            "logs_by_action": logs_by_action,
+            "logs_by_resource_type": logs_by_resource_type,
+            "logs_by_admin": logs_by_admin,
+        }
+    
+    @staticmethod
+    def export_query(
+        db: Session,
+        admin_user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ):
+        """Unbounded (AuditLog, admin email) query for streaming exports"""
+        query = db.query(AuditLog, AdminUser.email).outerjoin(AdminUser, AdminUser.id == AuditLog.admin_user_id)
+        
+        if admin_user_id:
+            query = query.filter(AuditLog.admin_user_id == admin_user_id)
+        if action:
+            query = query.filter(AuditLog.action == action)
+        if resource_type:
+            query = query.filter(AuditLog.resource_type == resource_type)
+        if start_date:
+            query = query.filter(AuditLog.timestamp >= start_date)
+        if end_date:
+            query = query.filter(AuditLog.timestamp <= end_date)
+        
+        return query.order_by(AuditLog.timestamp.desc())
+    
+    @staticmethod
+    def export_record(row) -> Dict[str, Any]:
+        """Export dictionary for a row of export_query"""
+        log, admin_email = row
+        return {
+            "id": log.id,
+            "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+            "admin_user_id": log.admin_user_id,
+            "admin_email": admin_email,
+            "action": log.action,
+            "resource_type": log.resource_type,
+            "resource_id": log.resource_id,
+            "description": log.description,
+            "ip_address": log.ip_address,
+            "user_agent": log.user_agent,
+            "old_values": log.old_values,
+            "new_values": log.new_values
+        }
+    
     @staticmethod
     def export_audit_logs(
         db: Session,
@@ -256,32 +347,14 @@ class AuditService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
-        """Export audit logs as list of dictionaries"""
-        logs = AuditService.get_audit_logs(
+        """Export audit logs as list of dictionaries (in memory; endpoints stream via export_query)"""
+        query = AuditService.export_query(
             db=db,
             admin_user_id=admin_user_id,
             action=action,
             resource_type=resource_type,
             start_date=start_date,
-            end_date=end_date,
-            limit=10000  # Large limit for export
+            end_date=end_date
         )
-        
-        return [
-            {
-                "id": log.id,
-                "timestamp": log.timestamp.isoformat(),
-                "admin_user_id": log.admin_user_id,
-                "admin_email": log.admin_user.email if log.admin_user else None,
-                "action": log.action,
-                "resource_type": log.resource_type,
-                "resource_id": log.resource_id,
-                "description": log.description,
-                "ip_address": log.ip_address,
-                "user_agent": log.user_agent,
-                "old_values": log.old_values,
-                "new_values": log.new_values
-            }
-            for log in logs
-        ]
+        return [AuditService.export_record(row) for row in query.limit(10000).all()]
 
@@ -12,6 +12,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import secrets
 import json
 
+from ..core.token_verifier import token_verifier
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -101,6 +103,16 @@ class AuthService:
                 print(f"Password hashing error (both bcrypt and passlib failed): {str(e)}, fallback: {str(fallback_error)}")
                 raise ValueError(f"Password is too long. Maximum length is 72 bytes. Please use a shorter password.")
     
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the hashing pool (raises 429 when the pool is saturated)"""
+        from .password_hasher import password_hashing_pool
+        return await password_hashing_pool.run(self.verify_password, plain_password, hashed_password)
+    
+    async def get_password_hash_async(self, password: str) -> str:
+        """Hash a password on the hashing pool (raises 429 when the pool is saturated)"""
+        from .password_hasher import password_hashing_pool
+        return await password_hashing_pool.run(self.get_password_hash, password)
+    
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
         to_encode = data.copy()
@@ -124,7 +136,7 @@ class AuthService:
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode a JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = token_verifier.decode(token, self.secret_key, self.algorithm)
             return payload
         except JWTError:
             raise HTTPException(
@@ -151,7 +163,7 @@ class AuthService:
     def refresh_access_token(self, refresh_token: str) -> Dict[str, str]:
         """Create a new access token using a refresh token"""
         try:
-            payload = jwt.decode(refresh_token, self.secret_key, algorithms=[self.algorithm])
+            payload = token_verifier.decode(refresh_token, self.secret_key, self.algorithm)
             
             if payload.get("type") != "refresh":
                 raise HTTPException(
@@ -275,7 +287,6 @@ class SubscriptionService:
 # Dependency functions for FastAPI
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current user from JWT token"""
-    auth_service = AuthService()
     token = credentials.credentials
     payload = auth_service.verify_token(token)
     
@@ -19,8 +19,14 @@ from bs4 import BeautifulSoup
 import pdfplumber
 import requests
 
+from .crawl_checkpoint import CrawlCheckpoint, CrawlMetrics
+
 logger = logging.getLogger(__name__)
 
+
+class CrawlFetchError(Exception):
+    """Raised when a page could not be fetched (retryable)"""
+
 class BiggeSpecsScraper:
     """
     Scraper for Bigge Equipment's specification catalog
@@ -38,10 +44,20 @@ class BiggeSpecsScraper:
         self.categories_url = "https://www.bigge.com/equipment/cranes"
         self.specs_url = "https://www.bigge.com/equipment/cranes/specifications"
         
-        # Rate limiting
+        # Rate limiting (per host: one request every rate_limit_delay seconds to each host)
         self.rate_limit_delay = 3.0  # seconds between requests
         self.max_requests_per_minute = 20
         
+        # Crawl frontier: retries with backoff, resumable checkpoint. Requests to one host are
+        # still one per rate_limit_delay; max_concurrency lets slow responses and page parsing
+        # overlap the next request instead of pushing it back
+        self.max_concurrency = 4
+        self.max_attempts = 3
+        self.retry_backoff_base = 5.0  # seconds; doubled on every attempt
+        self.checkpoint = CrawlCheckpoint(self.cache_dir / "crawl_checkpoint.db")
+        self._rate_limit_lock: Optional[asyncio.Lock] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        
         # User agents
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -95,50 +111,132 @@ class BiggeSpecsScraper:
         
         # Request tracking
         self.request_count = 0
-        self.last_request_time = 0
+        self._host_slots: Dict[str, float] = {}
         self.scraped_specs = []
     
-    async def scrape_all_specifications(self) -> Dict[str, Any]:
+    async def scrape_all_specifications(self, resume: bool = True) -> Dict[str, Any]:
         """
         Scrape all crane specifications from Bigge's catalog
+        Categories and model pages are crawled concurrently (bounded by max_concurrency and
+        the per-host rate limit); progress is checkpointed so an interrupted crawl resumes
+        where it stopped. A crawl with failed URLs is left open: the next run resumes it
+        and retries only those URLs
         """
         try:
             logger.info("Starting Bigge specifications scraping...")
             start_time = datetime.utcnow()
+            crawl_id = await asyncio.to_thread(self.checkpoint.start, resume)
+            metrics = CrawlMetrics()
             
             results = {
+                'crawl_id': crawl_id,
                 'total_specs': 0,
                 'categories_scraped': [],
                 'errors': [],
                 'start_time': start_time.isoformat()
             }
             
-            # Scrape each category
-            for category in self.crane_categories:
+            category_urls = {f"{self.categories_url}/{category}": category for category in self.crane_categories}
+            for url, category in category_urls.items():
+                await asyncio.to_thread(self.checkpoint.add_urls, crawl_id, [url], 'category', category)
+            
+            self._rate_limit_lock = asyncio.Lock()
+            self._host_slots = {}
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            async with aiohttp.ClientSession() as session:
+                self._session = session
                 try:
-                    category_result = await self._scrape_category(category)
-                    results['categories_scraped'].append(category_result)
-                    results['total_specs'] += category_result.get('specs_found', 0)
-                except Exception as e:
-                    error_msg = f"Error scraping category {category}: {e}"
-                    logger.error(error_msg)
-                    results['errors'].append(error_msg)
+                    # Phase 1: category pages -> model links
+                    category_work = await asyncio.to_thread(self.checkpoint.get_work, crawl_id, 'category')
+                    metrics.urls_skipped += await asyncio.to_thread(self.checkpoint.count_done, crawl_id, 'category')
+                    await asyncio.gather(*(
+                        self._crawl_url(crawl_id, item, 'category', semaphore, metrics) for item in category_work
+                    ))
+                    
+                    # Phase 2: model pages -> spec records
+                    model_work = await asyncio.to_thread(self.checkpoint.get_work, crawl_id, 'model')
+                    metrics.urls_skipped += await asyncio.to_thread(self.checkpoint.count_done, crawl_id, 'model')
+                    logger.info(f"Crawling {len(model_work)} model pages ({metrics.urls_skipped} already done)")
+                    await asyncio.gather(*(
+                        self._crawl_url(crawl_id, item, 'model', semaphore, metrics) for item in model_work
+                    ))
+                finally:
+                    self._session = None
+            
+            # Specs from this run and from any earlier interrupted run of the same crawl
+            self.scraped_specs = await asyncio.to_thread(self.checkpoint.load_results, crawl_id, 'model')
+            results['categories_scraped'] = await asyncio.to_thread(self.checkpoint.category_summary, crawl_id)
+            results['total_specs'] = len(self.scraped_specs)
+            failures = await asyncio.to_thread(self.checkpoint.get_failures, crawl_id)
+            for failure in failures:
+                results['errors'].append(
+                    f"Error scraping {failure['kind']} {failure['url']} after {failure['attempts']} attempts: {failure['error']}"
+                )
             
             # Save all specifications
             output_file = self.output_dir / f"bigge_specs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.jsonl"
             self._save_specifications(output_file)
+            results['complete'] = not failures
+            if failures:
+                logger.warning(f"Crawl {crawl_id} left open: {len(failures)} URLs failed and are retried on the next run")
+            else:
+                await asyncio.to_thread(self.checkpoint.complete, crawl_id)
             
             results['end_time'] = datetime.utcnow().isoformat()
             results['duration_seconds'] = (datetime.fromisoformat(results['end_time']) - start_time).total_seconds()
             results['output_file'] = str(output_file)
+            results['crawl_metrics'] = metrics.summary()
             
-            logger.info(f"Bigge specifications scraping completed: {results['total_specs']} specs found")
+            logger.info(f"Bigge specifications scraping completed: {results['total_specs']} specs found "
+                        f"({results['crawl_metrics']['pages_per_second']} pages/s)")
             return results
             
         except Exception as e:
             logger.error(f"Error in Bigge specifications scraping: {e}")
             raise
     
+    async def _crawl_url(self, crawl_id: str, item: Dict[str, Any], kind: str,
+                         semaphore: asyncio.Semaphore, metrics: CrawlMetrics) -> None:
+        """Fetch and process one frontier URL, retrying with exponential backoff"""
+        url, category = item['url'], item['category']
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                # Wait for the host's request slot before taking a worker, so waiting
+                # URLs do not hold permits that fetches from other hosts could use
+                html = self._read_cached_page(url)
+                if html is None:
+                    await self._rate_limit(url)
+                async with semaphore:
+                    fetch_start = time.monotonic()
+                    if html is None:
+                        html = await self._download_page(url)
+                    metrics.record_fetch(time.monotonic() - fetch_start, len(html))
+                    
+                    if kind == 'category':
+                        model_links = self._extract_model_links(html, category)
+                        await asyncio.to_thread(self.checkpoint.add_urls, crawl_id, model_links, 'model', category)
+                        logger.info(f"Found {len(model_links)} models in {category}")
+                        await asyncio.to_thread(self.checkpoint.mark_done, crawl_id, url)
+                    else:
+                        model_specs = await self._build_model_specifications(html, url, category)
+                        await asyncio.to_thread(self.checkpoint.mark_done, crawl_id, url, model_specs)
+                        if model_specs:
+                            metrics.specs_found += 1
+                            logger.info(f"Scraped specs for {model_specs.get('model', 'Unknown')}")
+                return
+                
+            except Exception as e:
+                final = attempt >= self.max_attempts
+                await asyncio.to_thread(self.checkpoint.mark_attempt_failed, crawl_id, url, str(e), final)
+                if final:
+                    metrics.pages_failed += 1
+                    logger.warning(f"Giving up on {url} after {attempt} attempts: {e}")
+                    return
+                metrics.retries += 1
+                backoff = self.retry_backoff_base * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+                logger.info(f"Retrying {url} in {backoff:.1f}s (attempt {attempt} failed: {e})")
+                await asyncio.sleep(backoff)
+    
     async def _scrape_category(self, category: str) -> Dict[str, Any]:
         """Scrape specifications for a specific crane category"""
         try:
@@ -158,7 +256,7 @@ class BiggeSpecsScraper:
             for model_link in model_links:
                 try:
                     # Rate limiting
-                    await self._rate_limit()
+                    await self._rate_limit(model_link)
                     
                     # Scrape model specifications
                     model_specs = await self._scrape_model_specifications(model_link, category)
@@ -246,22 +344,26 @@ class BiggeSpecsScraper:
             if not model_page:
                 return None
             
-            # Parse specifications
-            specs = self._parse_specifications(model_page, model_url, category)
-            if not specs:
-                return None
-            
-            # Try to get PDF specifications if available
-            pdf_specs = await self._extract_pdf_specifications(model_page, model_url)
-            if pdf_specs:
-                specs['pdf_specifications'] = pdf_specs
-            
-            return specs
+            return await self._build_model_specifications(model_page, model_url, category)
             
         except Exception as e:
             logger.warning(f"Error scraping model specifications from {model_url}: {e}")
             return None
     
+    async def _build_model_specifications(self, model_page: str, model_url: str, category: str) -> Optional[Dict[str, Any]]:
+        """Build the specification record for a fetched model page"""
+        # Parse specifications
+        specs = self._parse_specifications(model_page, model_url, category)
+        if not specs:
+            return None
+        
+        # Try to get PDF specifications if available
+        pdf_specs = await self._extract_pdf_specifications(model_page, model_url)
+        if pdf_specs:
+            specs['pdf_specifications'] = pdf_specs
+        
+        return specs
+    
     def _parse_specifications(self, html: str, url: str, category: str) -> Optional[Dict[str, Any]]:
         """Parse specifications from HTML"""
         try:
@@ -730,55 +832,83 @@ class BiggeSpecsScraper:
     async def _get_page(self, url: str) -> Optional[str]:
         """Get page content with caching"""
         try:
-            # Check cache first
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            cache_file = self.cache_dir / f"{url_hash}.html"
-            
-            if cache_file.exists():
-                # Check if cache is less than 24 hours old
-                cache_age = time.time() - cache_file.stat().st_mtime
-                if cache_age < 86400:  # 24 hours
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        return f.read()
-            
-            # Make request
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-                
-                async with session.get(url, headers=headers, timeout=30) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        
-                        # Cache the HTML
-                        with open(cache_file, 'w', encoding='utf-8') as f:
-                            f.write(html)
-                        
-                        return html
-                    else:
-                        logger.warning(f"HTTP {response.status} for {url}")
-                        return None
-        
+            return await self._fetch_page(url)
         except Exception as e:
             logger.error(f"Error getting page {url}: {e}")
             return None
     
-    async def _rate_limit(self):
-        """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+    def _page_cache_file(self, url: str) -> Path:
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        return self.cache_dir / f"{url_hash}.html"
+    
+    def _read_cached_page(self, url: str) -> Optional[str]:
+        """Cached HTML for a URL if it is less than 24 hours old"""
+        cache_file = self._page_cache_file(url)
+        if cache_file.exists():
+            cache_age = time.time() - cache_file.stat().st_mtime
+            if cache_age < 86400:  # 24 hours
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return f.read()
+        return None
+    
+    async def _fetch_page(self, url: str) -> str:
+        """Get page content with caching; raises CrawlFetchError when the page cannot be fetched"""
+        html = self._read_cached_page(url)
+        if html is not None:
+            return html
+        if self._session is not None:
+            # Reuse the crawl-wide rate limit when a crawl is running
+            await self._rate_limit(url)
+        return await self._download_page(url)
+    
+    async def _download_page(self, url: str) -> str:
+        """Fetch a page (the caller has already waited for its rate limit slot) and cache it"""
+        headers = {
+            'User-Agent': random.choice(self.user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        }
+        
+        # Reuse the crawl-wide session when a crawl is running
+        session = self._session
+        owns_session = session is None
+        if owns_session:
+            session = aiohttp.ClientSession()
+        try:
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status != 200:
+                    raise CrawlFetchError(f"HTTP {response.status} for {url}")
+                html = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise CrawlFetchError(f"{type(e).__name__} fetching {url}: {e}") from e
+        finally:
+            if owns_session:
+                await session.close()
+        
+        # Cache the HTML
+        with open(self._page_cache_file(url), 'w', encoding='utf-8') as f:
+            f.write(html)
+        
+        return html
+    
+    async def _rate_limit(self, url: Optional[str] = None):
+        """Implement rate limiting (requests to one host stay spaced by rate_limit_delay across concurrent workers)"""
+        if self._rate_limit_lock is None:
+            self._rate_limit_lock = asyncio.Lock()
+        host = urlparse(url or self.base_url).netloc
         
-        if time_since_last_request < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last_request)
+        # Reserve the host's next request slot under the lock, then wait for it outside the lock
+        async with self._rate_limit_lock:
+            current_time = time.time()
+            slot = max(current_time, self._host_slots.get(host, 0) + self.rate_limit_delay)
+            self._host_slots[host] = slot
+            self.request_count += 1
         
-        self.last_request_time = time.time()
-        self.request_count += 1
+        if slot > current_time:
+            await asyncio.sleep(slot - current_time)
     
     def _save_specifications(self, output_file: Path):
         """Save scraped specifications to JSONL file"""
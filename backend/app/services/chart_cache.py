@@ -0,0 +1,187 @@
+"""
+Chart Artifact Cache
+Rendered analytics charts stored as compact Plotly JSON specs, keyed by chart type and data window
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def data_fingerprint(*inputs: Any) -> str:
+    """Digest of the data a chart is drawn from"""
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def plotly_script_tag() -> str:
+    try:
+        from plotly.offline import get_plotlyjs_version
+        return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+    except Exception:
+        return '<script src="https://cdn.plot.ly/plotly-latest.min.js" charset="utf-8"></script>'
+
+
+def spec_to_html(spec: str, div_id: str) -> str:
+    """Embeddable HTML for a cached figure spec (what fig.to_html(include_plotlyjs='cdn') produced)"""
+    return (
+        f'<div>{plotly_script_tag()}'
+        f'<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>'
+        f'<script type="text/javascript">(function() {{ var figure = {spec}; '
+        f'Plotly.newPlot("{div_id}", figure.data, figure.layout, {{"responsive": true}}); }})();</script></div>'
+    )
+
+
+@dataclass
+class ChartArtifact:
+    data_key: str
+    spec: str  # Plotly figure JSON as produced by fig.to_json()
+    figure: Dict[str, Any]  # the same spec, parsed once for JSON responses
+    rendered_at: datetime = field(default_factory=datetime.utcnow)
+    render_ms: float = 0.0
+
+
+class ChartArtifactCache:
+    """
+    LRU of rendered charts keyed by ``(chart_type, window)``.
+
+    Each artifact remembers the fingerprint of the data it was drawn from. A lookup
+    with the same fingerprint is a hit; a different fingerprint returns the stored
+    artifact and re-renders it in the background (one render per key at a time).
+    Only a missing artifact makes the caller wait. Rendering runs on a dedicated
+    thread pool so building Plotly figures never blocks the event loop.
+    """
+
+    def __init__(self, max_entries: int = 256, max_workers: int = 2):
+        self.max_entries = max_entries
+        self.max_workers = max(1, max_workers)
+        self._entries: "OrderedDict[Tuple[str, str], ChartArtifact]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.render_errors = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chart-render")
+        return self._pool
+
+    async def get(self, chart_type: str, window: str, data_key: str,
+                  render: Callable[[], Optional[str]]) -> Optional[ChartArtifact]:
+        """
+        The artifact for ``chart_type`` over ``window``. ``render`` returns the figure
+        JSON (or None when the chart cannot be drawn) and runs on the render pool.
+        """
+        key = (chart_type, window)
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+        if artifact is not None:
+            if artifact.data_key == data_key:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background(key, data_key, render)
+            return artifact
+
+        self.misses += 1
+        return await self._render(key, data_key, render)
+
+    def _refresh_in_background(self, key: Tuple[str, str], data_key: str, render: Callable[[], Optional[str]]) -> None:
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._render(key, data_key, render))
+        task.add_done_callback(lambda t: t.exception() if not t.cancelled() else None)
+
+    async def _render(self, key: Tuple[str, str], data_key: str,
+                      render: Callable[[], Optional[str]]) -> Optional[ChartArtifact]:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            started = time.perf_counter()
+            spec = await loop.run_in_executor(self._executor(), render)
+            artifact = None
+            if spec is not None:
+                artifact = ChartArtifact(
+                    data_key=data_key,
+                    spec=spec,
+                    figure=json.loads(spec),
+                    render_ms=round((time.perf_counter() - started) * 1000, 2),
+                )
+                self._store(key, artifact)
+            self.renders += 1
+            future.set_result(artifact)
+            return artifact
+        except Exception as e:
+            self.render_errors += 1
+            logger.error(f"Error rendering chart {key[0]} for {key[1]}: {e}")
+            future.set_result(None)
+            return None
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Tuple[str, str], artifact: ChartArtifact) -> None:
+        with self._lock:
+            self._entries[key] = artifact
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, chart_type: Optional[str] = None) -> None:
+        with self._lock:
+            if chart_type is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == chart_type]:
+                    del self._entries[key]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            spec_bytes = sum(len(a.spec) for a in self._entries.values())
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "spec_bytes": spec_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0,
+            "renders": self.renders,
+            "render_errors": self.render_errors,
+            "rendering": len(self._inflight),
+        }
+
+
+# Global instance
+chart_artifact_cache = ChartArtifactCache(
+    max_entries=settings.analytics_chart_cache_entries,
+    max_workers=settings.analytics_chart_workers,
+)
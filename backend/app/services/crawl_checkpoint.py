@@ -0,0 +1,218 @@
+"""
+Crawl Checkpoint
+Persistent crawl frontier (visited URLs and their outcomes) so spec crawls can resume after a crash
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# URL states in the frontier
+PENDING = 'pending'
+DONE = 'done'        # fetched and parsed (result may be empty)
+FAILED = 'failed'    # gave up after max attempts in a run; retried on the next run/resume
+
+
+@dataclass
+class CrawlMetrics:
+    """Throughput counters for one crawl run"""
+    started_at: float = field(default_factory=time.monotonic)
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    retries: int = 0
+    urls_skipped: int = 0
+    specs_found: int = 0
+    bytes_downloaded: int = 0
+    fetch_seconds_total: float = 0.0
+
+    def record_fetch(self, seconds: float, size: int):
+        self.pages_fetched += 1
+        self.bytes_downloaded += size
+        self.fetch_seconds_total += seconds
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'pages_fetched': self.pages_fetched,
+            'pages_failed': self.pages_failed,
+            'retries': self.retries,
+            'urls_skipped_from_checkpoint': self.urls_skipped,
+            'specs_found': self.specs_found,
+            'bytes_downloaded': self.bytes_downloaded,
+            'pages_per_second': round(self.pages_fetched / elapsed, 3),
+            'specs_per_minute': round(self.specs_found / elapsed * 60, 2),
+            'avg_fetch_ms': round(self.fetch_seconds_total / self.pages_fetched * 1000, 1) if self.pages_fetched else 0,
+        }
+
+
+class CrawlCheckpoint:
+    """
+    SQLite-backed frontier of crawl URLs keyed by crawl id.
+    An unfinished crawl is resumed: done URLs are skipped and their results reused.
+    Completing a crawl prunes all but the newest ``retention_crawls`` completed crawls.
+    Methods are blocking; async callers run them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, checkpoint_path: Path, retention_crawls: int = 5):
+        self.checkpoint_path = checkpoint_path
+        self.retention_crawls = retention_crawls
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.checkpoint_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_runs (
+                    crawl_id TEXT PRIMARY KEY,
+                    started_at TEXT NOT NULL,
+                    completed_at TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_urls (
+                    crawl_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    category TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    result TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (crawl_id, url)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_urls_status ON crawl_urls(crawl_id, kind, status)")
+
+    def start(self, resume: bool = True) -> str:
+        """Return the unfinished crawl id to resume, or start a new crawl"""
+        with self._lock, self._connect() as conn:
+            if resume:
+                row = conn.execute(
+                    "SELECT crawl_id FROM crawl_runs WHERE completed_at IS NULL ORDER BY started_at DESC LIMIT 1"
+                ).fetchone()
+                if row:
+                    logger.info(f"Resuming crawl {row[0]} from checkpoint")
+                    return row[0]
+            crawl_id = f"crawl_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+            conn.execute(
+                "INSERT INTO crawl_runs (crawl_id, started_at) VALUES (?, ?)",
+                (crawl_id, datetime.utcnow().isoformat())
+            )
+            return crawl_id
+
+    def complete(self, crawl_id: str) -> int:
+        """Mark a crawl completed and prune older completed crawls; returns the number pruned"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE crawl_runs SET completed_at = ? WHERE crawl_id = ?",
+                (datetime.utcnow().isoformat(), crawl_id)
+            )
+            expired = [row[0] for row in conn.execute(
+                "SELECT crawl_id FROM crawl_runs WHERE completed_at IS NOT NULL "
+                "ORDER BY completed_at DESC LIMIT -1 OFFSET ?",
+                (self.retention_crawls,)
+            )]
+            conn.executemany("DELETE FROM crawl_urls WHERE crawl_id = ?", ((c,) for c in expired))
+            conn.executemany("DELETE FROM crawl_runs WHERE crawl_id = ?", ((c,) for c in expired))
+        if expired:
+            logger.info(f"Pruned {len(expired)} completed crawls from the checkpoint")
+        return len(expired)
+
+    def add_urls(self, crawl_id: str, urls: List[str], kind: str, category: Optional[str] = None) -> int:
+        """Add URLs to the frontier; URLs already known to this crawl are left as they are"""
+        now = datetime.utcnow().isoformat()
+        with self._lock, self._connect() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO crawl_urls (crawl_id, url, kind, category, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((crawl_id, url, kind, category, PENDING, now) for url in urls)
+            )
+            return cursor.rowcount
+
+    def get_work(self, crawl_id: str, kind: str) -> List[Dict[str, Any]]:
+        """URLs of a kind that still need fetching (pending, or failed in an earlier run)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, category, attempts FROM crawl_urls "
+                "WHERE crawl_id = ? AND kind = ? AND status != ? ORDER BY url",
+                (crawl_id, kind, DONE)
+            ).fetchall()
+        return [{'url': url, 'category': category, 'attempts': attempts} for url, category, attempts in rows]
+
+    def count_done(self, crawl_id: str, kind: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM crawl_urls WHERE crawl_id = ? AND kind = ? AND status = ?",
+                (crawl_id, kind, DONE)
+            ).fetchone()[0]
+
+    def mark_done(self, crawl_id: str, url: str, result: Any = None) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE crawl_urls SET status = ?, result = ?, last_error = NULL, updated_at = ? "
+                "WHERE crawl_id = ? AND url = ?",
+                (DONE, json.dumps(result, default=str) if result is not None else None,
+                 datetime.utcnow().isoformat(), crawl_id, url)
+            )
+
+    def mark_attempt_failed(self, crawl_id: str, url: str, error: str, final: bool) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE crawl_urls SET attempts = attempts + 1, last_error = ?, status = ?, updated_at = ? "
+                "WHERE crawl_id = ? AND url = ?",
+                (error[:500], FAILED if final else PENDING, datetime.utcnow().isoformat(), crawl_id, url)
+            )
+
+    def load_results(self, crawl_id: str, kind: str) -> List[Any]:
+        """Stored results of done URLs (e.g. the spec records of model pages)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result FROM crawl_urls WHERE crawl_id = ? AND kind = ? AND status = ? "
+                "AND result IS NOT NULL ORDER BY url",
+                (crawl_id, kind, DONE)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def category_summary(self, crawl_id: str) -> List[Dict[str, Any]]:
+        """Per-category model counts in the shape scrape_all_specifications reports"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT category,
+                       COUNT(*) AS models,
+                       SUM(CASE WHEN status = ? AND result IS NOT NULL THEN 1 ELSE 0 END) AS specs,
+                       SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) AS failed
+                FROM crawl_urls
+                WHERE crawl_id = ? AND kind = 'model'
+                GROUP BY category
+                ORDER BY category
+            """, (DONE, FAILED, crawl_id)).fetchall()
+        return [
+            {'category': category, 'specs_found': specs or 0, 'models_processed': models,
+             'models_failed': failed or 0, 'success': not failed}
+            for category, models, specs, failed in rows
+        ]
+
+    def get_failures(self, crawl_id: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, kind, attempts, last_error FROM crawl_urls WHERE crawl_id = ? AND status = ?",
+                (crawl_id, FAILED)
+            ).fetchall()
+        return [{'url': url, 'kind': kind, 'attempts': attempts, 'error': error} for url, kind, attempts, error in rows]
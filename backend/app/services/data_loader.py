@@ -3,28 +3,195 @@ Data Loader for Crane Intelligence Platform
 Loads and processes all data sources for the valuation engine
 """
 
-import pandas as pd
-import numpy as np
-from typing import Dict, Any, List, Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from pathlib import Path
 import json
 from datetime import datetime
 import logging
 import re
+import threading
+import time
+
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+CRANE_LISTINGS_CSV = Path("docs/requirements/crane_data_scoring_20250706_173618.csv")
+RENTAL_RATES_CSV = Path("docs/requirements/Crane_Rental_Rates_By_Region.csv")
+BUYING_TRENDS_CSV = Path("docs/requirements/Valuation_Engine_-_Buying_Trends.csv")
+
 class DataLoader:
-    """Loads and processes all data sources for the platform"""
+    """
+    Loads and processes all data sources for the platform.
+    
+    Nothing is read (and pandas is not imported) until the datasets are first
+    used or ``load_in_background`` is called at startup; concurrent first users
+    wait on a single load.
+    
+    With ``shared_datasets_enabled`` the frames come from the shared memory store
+    instead: the first process (the gunicorn master, or else the first worker)
+    parses the CSVs and publishes them, every other process attaches read-only,
+    and a published reload is picked up within ``shared_datasets_check_seconds``.
+    """
     
     def __init__(self):
-        self.crane_listings = None
-        self.rental_rates = None
-        self.buying_trends = None
-        self.load_all_data()
+        self._crane_listings = None
+        self._rental_rates = None
+        self._buying_trends = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        self.load_ms: Optional[float] = None
+        self._shared = None
+        self._shared_checked_at = 0.0
+        # File identity only (no parsing), so cache keys are available before the data is
+        self.dataset_version = self._compute_dataset_version()
+    
+    @property
+    def crane_listings(self) -> Optional[pd.DataFrame]:
+        self.ensure_loaded()
+        return self._crane_listings
+    
+    @property
+    def rental_rates(self) -> Optional[pd.DataFrame]:
+        self.ensure_loaded()
+        return self._rental_rates
+    
+    @property
+    def buying_trends(self) -> Optional[pd.DataFrame]:
+        self.ensure_loaded()
+        return self._buying_trends
+    
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+    
+    @property
+    def shared_generation(self) -> Optional[int]:
+        return self._shared.generation if self._shared is not None else None
+    
+    def ensure_loaded(self):
+        """Load the datasets if that has not happened yet (blocks while another thread is loading)"""
+        if self._loaded:
+            if self._shared is not None:
+                self._check_shared_generation()
+            return
+        with self._load_lock:
+            if not self._loaded:
+                if settings.shared_datasets_enabled and self._attach_shared():
+                    return
+                self.load_all_data()
+    
+    def _frames(self) -> Dict[str, pd.DataFrame]:
+        return {
+            "crane_listings": self._crane_listings,
+            "rental_rates": self._rental_rates,
+            "buying_trends": self._buying_trends,
+        }
+    
+    def _attach_shared(self) -> bool:
+        """Use the published datasets, publishing them first if this is the first process"""
+        from .shared_datasets import shared_dataset_store
+        try:
+            attached = shared_dataset_store.attach()
+            if attached is None or attached.dataset_version != self._compute_dataset_version():
+                with shared_dataset_store.publish_lock():
+                    # Another process may have published while this one waited for the lock
+                    if attached is not None:
+                        shared_dataset_store.retire(attached)
+                    attached = shared_dataset_store.attach()
+                    if attached is None or attached.dataset_version != self._compute_dataset_version():
+                        if attached is not None:
+                            # Published from older files (e.g. left over from a previous deployment)
+                            shared_dataset_store.retire(attached)
+                        self.load_all_data()
+                        shared_dataset_store.publish(self._frames(), self.dataset_version)
+                        attached = shared_dataset_store.attach()
+            if attached is None:
+                return False
+        except Exception as e:
+            logger.error(f"Shared datasets unavailable, loading privately: {e}")
+            return False
+        self._use_shared(attached)
+        return True
+    
+    def _use_shared(self, attached):
+        previous = self._shared
+        frames = attached.frames
+        self._crane_listings = frames["crane_listings"]
+        self._rental_rates = frames["rental_rates"]
+        self._buying_trends = frames["buying_trends"]
+        self.dataset_version = attached.dataset_version
+        self._shared = attached
+        self._shared_checked_at = time.monotonic()
+        self._loaded = True
+        if previous is not None:
+            from .shared_datasets import shared_dataset_store
+            shared_dataset_store.retire(previous)
+        logger.info(f"Attached shared datasets generation {attached.generation}")
+    
+    def _check_shared_generation(self):
+        """Swap to a newer published generation (checked at most every shared_datasets_check_seconds)"""
+        now = time.monotonic()
+        if now - self._shared_checked_at < settings.shared_datasets_check_seconds:
+            return
+        self._shared_checked_at = now
+        from .shared_datasets import shared_dataset_store
+        current = shared_dataset_store.current()
+        if current is None or current[0] == self._shared.generation:
+            return
+        # Readers keep using the frames they already hold; only one thread swaps
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            attached = shared_dataset_store.attach()
+            if attached is not None:
+                self._use_shared(attached)
+        except Exception as e:
+            logger.error(f"Could not attach shared datasets generation {current[0]}: {e}")
+        finally:
+            self._load_lock.release()
+    
+    def reload(self) -> Dict[str, Any]:
+        """Re-read the source files; in shared mode publish them so every worker swaps to the new generation"""
+        with self._load_lock:
+            self.load_all_data()
+            if settings.shared_datasets_enabled:
+                from .shared_datasets import shared_dataset_store
+                with shared_dataset_store.publish_lock():
+                    shared_dataset_store.publish(self._frames(), self.dataset_version)
+                attached = shared_dataset_store.attach()
+                if attached is not None:
+                    self._use_shared(attached)
+        return self.get_status()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "load_ms": self.load_ms,
+            "dataset_version": self.dataset_version,
+            "shared": settings.shared_datasets_enabled,
+            "shared_generation": self.shared_generation,
+            "rows": {
+                name: (len(frame) if frame is not None else 0) for name, frame in self._frames().items()
+            } if self._loaded else None,
+        }
+    
+    def load_in_background(self):
+        """Start loading the datasets on a daemon thread"""
+        if self._loaded or self._preload_thread is not None:
+            return
+        self._preload_thread = threading.Thread(target=self.ensure_loaded, name="data-loader-preload", daemon=True)
+        self._preload_thread.start()
     
     def load_all_data(self):
         """Load all data sources"""
+        started = time.perf_counter()
         try:
             self.load_crane_listings()
             self.load_rental_rates()
@@ -32,11 +199,27 @@ class DataLoader:
             logger.info("All data sources loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load data sources: {e}")
+        self.dataset_version = self._compute_dataset_version()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._loaded = True
+    
+    def _compute_dataset_version(self) -> str:
+        """Identifies the loaded files (path, size, mtime); cached valuations are keyed on it"""
+        import hashlib
+        parts = []
+        for path in (CRANE_LISTINGS_CSV, RENTAL_RATES_CSV, BUYING_TRENDS_CSV):
+            try:
+                stat = path.stat()
+                parts.append(f"{path}:{stat.st_size}:{int(stat.st_mtime)}")
+            except OSError:
+                parts.append(f"{path}:missing")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
     
     def load_crane_listings(self):
         """Load crane listings data"""
+        import pandas as pd
         try:
-            csv_path = Path("docs/requirements/crane_data_scoring_20250706_173618.csv")
+            csv_path = CRANE_LISTINGS_CSV
             if csv_path.exists():
                 df = pd.read_csv(csv_path)
                 # Clean and process the data
@@ -55,61 +238,67 @@ class DataLoader:
                 df.loc[df['capacity'].isna(), 'capacity'] = df.loc[df['capacity'].isna(), 'title'].str.extract(r'(\d{3,4})', flags=re.IGNORECASE)[0]
                 df['capacity'] = pd.to_numeric(df['capacity'], errors='coerce')
                 
-                self.crane_listings = df
+                self._crane_listings = df
                 logger.info(f"Loaded {len(df)} crane listings")
             else:
                 logger.warning("Crane listings CSV not found")
-                self.crane_listings = pd.DataFrame()
+                self._crane_listings = pd.DataFrame()
         except Exception as e:
             logger.error(f"Failed to load crane listings: {e}")
-            self.crane_listings = pd.DataFrame()
+            self._crane_listings = pd.DataFrame()
     
     def load_rental_rates(self):
         """Load rental rates by region"""
+        import pandas as pd
         try:
-            csv_path = Path("docs/requirements/Crane_Rental_Rates_By_Region.csv")
+            csv_path = RENTAL_RATES_CSV
             if csv_path.exists():
                 df = pd.read_csv(csv_path)
                 df['Monthly Rate (USD)'] = pd.to_numeric(df['Monthly Rate (USD)'], errors='coerce')
                 df['Tonnage'] = pd.to_numeric(df['Tonnage'], errors='coerce')
-                self.rental_rates = df
+                self._rental_rates = df
                 logger.info(f"Loaded {len(df)} rental rate records")
             else:
                 logger.warning("Rental rates CSV not found")
-                self.rental_rates = pd.DataFrame()
+                self._rental_rates = pd.DataFrame()
         except Exception as e:
             logger.error(f"Failed to load rental rates: {e}")
-            self.rental_rates = pd.DataFrame()
+            self._rental_rates = pd.DataFrame()
     
     def load_buying_trends(self):
         """Load buying trends data"""
+        import pandas as pd
         try:
-            csv_path = Path("docs/requirements/Valuation_Engine_-_Buying_Trends.csv")
+            csv_path = BUYING_TRENDS_CSV
             if csv_path.exists():
                 df = pd.read_csv(csv_path)
-                self.buying_trends = df
+                self._buying_trends = df
                 logger.info(f"Loaded {len(df)} buying trend records")
             else:
                 logger.warning("Buying trends CSV not found")
-                self.buying_trends = pd.DataFrame()
+                self._buying_trends = pd.DataFrame()
         except Exception as e:
             logger.error(f"Failed to load buying trends: {e}")
-            self.buying_trends = pd.DataFrame()
+            self._buying_trends = pd.DataFrame()
     
     def get_crane_listings(self) -> pd.DataFrame:
         """Get crane listings data"""
+        import pandas as pd
         return self.crane_listings if self.crane_listings is not None else pd.DataFrame()
     
     def get_rental_rates(self) -> pd.DataFrame:
         """Get rental rates data"""
+        import pandas as pd
         return self.rental_rates if self.rental_rates is not None else pd.DataFrame()
     
     def get_buying_trends(self) -> pd.DataFrame:
         """Get buying trends data"""
+        import pandas as pd
         return self.buying_trends if self.buying_trends is not None else pd.DataFrame()
     
     def find_comparables(self, manufacturer: str, model: str, capacity: float, year: int, limit: int = 10) -> List[Dict]:
         """Find comparable crane listings"""
+        import pandas as pd
         if self.crane_listings.empty:
             return []
         
@@ -238,5 +427,5 @@ class DataLoader:
         
         return scenarios
 
-# Global data loader instance
+# Global data loader instance (datasets load lazily, see DataLoader)
 data_loader = DataLoader()
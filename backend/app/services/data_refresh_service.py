@@ -12,13 +12,13 @@ from datetime import datetime, timedelta
 import json
 import sqlite3
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from .data_normalization import DataNormalizationService
 from .scraping_service import ScrapingService
-# from ..models.enhanced_crane import CraneListing  # Table doesn't exist yet
-from ..core.database import get_db
+from .record_hash_index import RecordHashIndex, RecordDiff
+from ..models.enhanced_crane import CraneListing
+from ..core.database import get_db, get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -37,13 +37,21 @@ class DataRefreshService:
         self.normalization_service = DataNormalizationService(data_path)
         self.scraping_service = ScrapingService()
         
-        # Database connection
+        # Persistent record-hash index: each refresh is diffed against the previous state
+        self.record_index = RecordHashIndex(self.output_path / "record_index.db")
+        self._last_scraping_result: Optional[Dict[str, Any]] = None
+        # Diff of the last merge, applied to the index once the database update commits
+        self._pending_diff: Optional[RecordDiff] = None
+        self.delta_retention = 20  # Number of delta files kept after compaction
+        self.tombstone_retention = timedelta(days=30)
+        # Compaction rewrites the whole snapshot, so it only runs once deltas or tombstones pile up
+        self.compact_delta_bytes = 50 * 1024 * 1024
+        self.compact_tombstones = 10000
+        
+        # Database connection (shared engine from the process-wide registry)
         # Use PostgreSQL from environment, fallback to SQLite for development
         database_url = os.getenv("DATABASE_URL", None)
-        if database_url:
-            self.engine = create_engine(database_url, pool_pre_ping=True)
-        else:
-            self.engine = create_engine("sqlite:///./crane_intelligence.db")
+        self.engine = get_engine(database_url or "sqlite:///./crane_intelligence.db")
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
     async def full_data_refresh(self) -> Dict[str, Any]:
@@ -85,8 +93,10 @@ class DataRefreshService:
             
             # Step 2: Scrape fresh data from marketplaces
             logger.info("Step 2: Scraping fresh data from marketplaces...")
+            self._last_scraping_result = None
             try:
                 scraping_result = await self.scraping_service.scrape_all_marketplaces()
+                self._last_scraping_result = scraping_result
                 results['steps_completed'].append({
                     'step': 'scraping',
                     'status': 'completed',
@@ -106,13 +116,17 @@ class DataRefreshService:
             
             # Step 3: Merge and deduplicate data
             logger.info("Step 3: Merging and deduplicating data...")
+            merge_result: Dict[str, Any] = {}
             try:
                 merge_result = await self._merge_and_deduplicate_data()
                 results['steps_completed'].append({
                     'step': 'merge_deduplicate',
                     'status': 'completed',
                     'records_merged': merge_result.get('records_merged', 0),
-                    'duplicates_removed': merge_result.get('duplicates_removed', 0)
+                    'duplicates_removed': merge_result.get('duplicates_removed', 0),
+                    'new_records': merge_result.get('new_records', 0),
+                    'changed_records': merge_result.get('changed_records', 0),
+                    'deleted_records': merge_result.get('deleted_records', 0)
                 })
             except Exception as e:
                 error_msg = f"Error in merge/deduplication: {e}"
@@ -127,12 +141,14 @@ class DataRefreshService:
             # Step 4: Update database
             logger.info("Step 4: Updating database...")
             try:
-                db_result = await self._update_database()
+                db_result = await self._update_database(merge_result.get('delta_file'))
                 results['steps_completed'].append({
                     'step': 'database_update',
                     'status': 'completed',
                     'records_inserted': db_result.get('records_inserted', 0),
-                    'records_updated': db_result.get('records_updated', 0)
+                    'records_updated': db_result.get('records_updated', 0),
+                    'records_deactivated': db_result.get('records_deactivated', 0),
+                    'records_failed': db_result.get('records_failed', 0)
                 })
             except Exception as e:
                 error_msg = f"Error updating database: {e}"
@@ -144,8 +160,31 @@ class DataRefreshService:
                     'error': error_msg
                 })
             
-            # Step 5: Generate summary report
-            logger.info("Step 5: Generating summary report...")
+            # Step 5: Compact accumulated merged/delta files once they cross a threshold
+            logger.info("Step 5: Compacting merged data files...")
+            try:
+                if self.compaction_due():
+                    compaction_result = self.compact_merged_files()
+                    results['steps_completed'].append({
+                        'step': 'compaction',
+                        'status': 'completed',
+                        'snapshot_records': compaction_result.get('snapshot_records', 0),
+                        'files_removed': compaction_result.get('files_removed', 0)
+                    })
+                else:
+                    results['steps_completed'].append({'step': 'compaction', 'status': 'skipped'})
+            except Exception as e:
+                error_msg = f"Error compacting merged data: {e}"
+                logger.error(error_msg)
+                results['errors'].append(error_msg)
+                results['steps_completed'].append({
+                    'step': 'compaction',
+                    'status': 'failed',
+                    'error': error_msg
+                })
+            
+            # Step 6: Generate summary report
+            logger.info("Step 6: Generating summary report...")
             try:
                 report_result = self._generate_summary_report(results)
                 results['steps_completed'].append({
@@ -192,8 +231,10 @@ class DataRefreshService:
             
             # Step 1: Scrape fresh data
             logger.info("Step 1: Scraping fresh data...")
+            self._last_scraping_result = None
             try:
                 scraping_result = await self.scraping_service.scrape_all_marketplaces()
+                self._last_scraping_result = scraping_result
                 results['steps_completed'].append({
                     'step': 'scraping',
                     'status': 'completed',
@@ -211,15 +252,40 @@ class DataRefreshService:
                     'error': error_msg
                 })
             
-            # Step 2: Update database with new data
-            logger.info("Step 2: Updating database...")
+            # Step 2: Diff scraped listings against the record-hash index
+            logger.info("Step 2: Detecting changed listings...")
+            merge_result: Dict[str, Any] = {}
+            try:
+                merge_result = await self._merge_and_deduplicate_data(include_normalized=False)
+                results['steps_completed'].append({
+                    'step': 'change_detection',
+                    'status': 'completed',
+                    'new_records': merge_result.get('new_records', 0),
+                    'changed_records': merge_result.get('changed_records', 0),
+                    'deleted_records': merge_result.get('deleted_records', 0),
+                    'unchanged_records': merge_result.get('unchanged_records', 0)
+                })
+            except Exception as e:
+                error_msg = f"Error in change detection: {e}"
+                logger.error(error_msg)
+                results['errors'].append(error_msg)
+                results['steps_completed'].append({
+                    'step': 'change_detection',
+                    'status': 'failed',
+                    'error': error_msg
+                })
+            
+            # Step 3: Update database with changed data only
+            logger.info("Step 3: Updating database...")
             try:
-                db_result = await self._update_database_incremental()
+                db_result = await self._update_database_incremental(merge_result.get('delta_file'))
                 results['steps_completed'].append({
                     'step': 'database_update',
                     'status': 'completed',
                     'records_inserted': db_result.get('records_inserted', 0),
-                    'records_updated': db_result.get('records_updated', 0)
+                    'records_updated': db_result.get('records_updated', 0),
+                    'records_deactivated': db_result.get('records_deactivated', 0),
+                    'records_failed': db_result.get('records_failed', 0)
                 })
             except Exception as e:
                 error_msg = f"Error updating database: {e}"
@@ -242,63 +308,137 @@ class DataRefreshService:
             logger.error(f"Error in incremental data refresh: {e}")
             raise
     
-    async def _merge_and_deduplicate_data(self) -> Dict[str, Any]:
-        """Merge normalized and scraped data, removing duplicates"""
+    async def _merge_and_deduplicate_data(self, include_normalized: bool = True) -> Dict[str, Any]:
+        """
+        Merge normalized and scraped data and diff it against the record-hash index.
+        Only new/changed listings and deletions are written, to a timestamped delta file.
+        The index is not advanced here: _update_database applies the diff after it commits,
+        so a failed update is detected again on the next refresh.
+        """
+        self._pending_diff = None
         try:
-            # Get normalized data
-            normalized_data = self.normalization_service.get_normalized_data()
+            all_data: List[Dict[str, Any]] = []
+            sources = set()
             
-            # Get scraped data
-            scraped_data = []
-            for marketplace_result in self.scraping_service.marketplaces:
-                # This would be populated from scraping results
-                pass
-            
-            # Merge data
-            all_data = normalized_data + scraped_data
+            # Get normalized data
+            if include_normalized:
+                normalized_data = self.normalization_service.get_normalized_data()
+                all_data.extend(normalized_data)
+                sources.update(record.get('source', '') for record in normalized_data)
             
-            # Deduplicate based on record hash
-            seen_hashes = set()
-            unique_data = []
-            duplicates_removed = 0
+            # Get scraped data (only marketplaces scraped to the end of their results take part
+            # in deletion tracking; a partial scrape would tombstone every listing it missed)
+            for marketplace_result in (self._last_scraping_result or {}).get('marketplaces_scraped', []):
+                listings = marketplace_result.get('listings', [])
+                all_data.extend(listings)
+                if marketplace_result.get('complete') and listings:
+                    sources.add(marketplace_result.get('marketplace', ''))
+            sources.discard('')
             
-            for record in all_data:
-                record_hash = record.get('record_hash', '')
-                if record_hash and record_hash not in seen_hashes:
-                    seen_hashes.add(record_hash)
-                    unique_data.append(record)
-                else:
-                    duplicates_removed += 1
+            diff = self.record_index.diff(all_data, sources=sources)
+            delta_file = self._write_delta_file(diff)
+            self._pending_diff = diff
             
-            # Save merged data
-            merged_file = self.output_path / f"merged_data_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.jsonl"
-            with open(merged_file, 'w', encoding='utf-8') as f:
-                for record in unique_data:
-                    f.write(json.dumps(record) + '\n')
+            logger.info(
+                f"Change detection: {len(diff.new)} new, {len(diff.changed)} changed, "
+                f"{len(diff.deleted)} deleted, {diff.unchanged} unchanged"
+            )
             
             return {
                 'records_merged': len(all_data),
-                'duplicates_removed': duplicates_removed,
-                'unique_records': len(unique_data),
-                'merged_file': str(merged_file)
+                'unique_records': len(all_data) - diff.duplicates,
+                'delta_file': str(delta_file) if delta_file else None,
+                **diff.summary()
             }
             
         except Exception as e:
             logger.error(f"Error merging data: {e}")
             raise
     
-    async def _update_database(self) -> Dict[str, Any]:
-        """Update database with processed data"""
+    def _write_delta_file(self, diff: RecordDiff) -> Optional[Path]:
+        """Write new/changed/deleted records to a delta file; nothing is written when there is no churn"""
+        if not diff.churn:
+            return None
+        
+        delta_file = self.output_path / f"merged_delta_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"
+        deleted_payloads = self.record_index.get_payloads(diff.deleted)
+        with open(delta_file, 'w', encoding='utf-8') as f:
+            for record in diff.new:
+                f.write(json.dumps({**record, 'change_type': 'new'}, default=str) + '\n')
+            for record in diff.changed:
+                f.write(json.dumps({**record, 'change_type': 'changed'}, default=str) + '\n')
+            for key in diff.deleted:
+                record = deleted_payloads.get(key, {'record_key': key})
+                f.write(json.dumps({**record, 'change_type': 'deleted'}, default=str) + '\n')
+        return delta_file
+    
+    def compaction_due(self) -> bool:
+        """True when delta files (count or size), legacy merges or tombstones warrant a new snapshot"""
+        snapshot_file = self.output_path / "merged_data_snapshot.jsonl"
+        if any(p != snapshot_file for p in self.output_path.glob("merged_data_*.jsonl")):
+            return True
+        deltas = list(self.output_path.glob("merged_delta_*.jsonl"))
+        if len(deltas) > self.delta_retention:
+            return True
+        if sum(p.stat().st_size for p in deltas) >= self.compact_delta_bytes:
+            return True
+        return self.record_index.get_stats()['deleted_records'] >= self.compact_tombstones
+    
+    def compact_merged_files(self) -> Dict[str, Any]:
+        """
+        Compact accumulated merged data into a single snapshot built from the index,
+        dropping legacy full merges and delta files beyond the retention window
+        """
+        snapshot_file = self.output_path / "merged_data_snapshot.jsonl"
+        tmp_file = snapshot_file.with_suffix('.jsonl.tmp')
+        snapshot_records = 0
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for record in self.record_index.iter_live_records():
+                f.write(json.dumps(record, default=str) + '\n')
+                snapshot_records += 1
+        tmp_file.replace(snapshot_file)
+        
+        files_removed = 0
+        legacy_merges = [p for p in self.output_path.glob("merged_data_*.jsonl") if p != snapshot_file]
+        deltas = sorted(self.output_path.glob("merged_delta_*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
+        for stale_file in legacy_merges + deltas[self.delta_retention:]:
+            try:
+                stale_file.unlink()
+                files_removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove {stale_file}: {e}")
+        
+        tombstones_purged = self.record_index.purge_deleted(datetime.utcnow() - self.tombstone_retention)
+        
+        return {
+            'snapshot_file': str(snapshot_file),
+            'snapshot_records': snapshot_records,
+            'files_removed': files_removed,
+            'tombstones_purged': tombstones_purged
+        }
+    
+    async def _update_database(self, delta_file: Optional[str] = None) -> Dict[str, Any]:
+        """Apply a delta file (new, changed and deleted listings) to the database"""
+        records_inserted = 0
+        records_updated = 0
+        records_deactivated = 0
+        records_failed = 0
+        
+        if not delta_file:
+            logger.info("No listing changes detected; database update skipped")
+            self._apply_pending_diff()
+            return {
+                'records_inserted': 0,
+                'records_updated': 0,
+                'records_deactivated': 0,
+                'records_failed': 0
+            }
+        
         try:
             db = self.SessionLocal()
-            records_inserted = 0
-            records_updated = 0
             
             try:
-                # Get merged data
-                merged_file = max(self.output_path.glob("merged_data_*.jsonl"), key=lambda x: x.stat().st_mtime)
-                
-                with open(merged_file, 'r', encoding='utf-8') as f:
+                with open(delta_file, 'r', encoding='utf-8') as f:
                     for line in f:
                         try:
                             record = json.loads(line.strip())
@@ -310,7 +450,12 @@ class DataRefreshService:
                                 CraneListing.year == record.get('year', 0)
                             ).first()
                             
-                            if existing:
+                            if record.get('change_type') == 'deleted':
+                                if existing and existing.is_active:
+                                    existing.is_active = False
+                                    existing.last_updated = datetime.utcnow()
+                                    records_deactivated += 1
+                            elif existing:
                                 # Update existing record
                                 existing.price = record.get('price', 0)
                                 existing.location = record.get('location', '')
@@ -321,6 +466,7 @@ class DataRefreshService:
                                 existing.wear_score = record.get('wear_score', 0)
                                 existing.value_score = record.get('value_score', 0)
                                 existing.source = record.get('source', '')
+                                existing.is_active = True
                                 existing.last_updated = datetime.utcnow()
                                 records_updated += 1
                             else:
@@ -345,6 +491,7 @@ class DataRefreshService:
                                 
                         except Exception as e:
                             logger.warning(f"Error processing record: {e}")
+                            records_failed += 1
                             continue
                 
                 db.commit()
@@ -352,19 +499,34 @@ class DataRefreshService:
             finally:
                 db.close()
             
+            if records_failed:
+                # Leave the index behind so the whole delta is retried; the upserts above are idempotent
+                logger.warning(f"{records_failed} records failed to apply; record index not advanced")
+                self._pending_diff = None
+            else:
+                self._apply_pending_diff()
+            
             return {
                 'records_inserted': records_inserted,
-                'records_updated': records_updated
+                'records_updated': records_updated,
+                'records_deactivated': records_deactivated,
+                'records_failed': records_failed
             }
             
         except Exception as e:
             logger.error(f"Error updating database: {e}")
             raise
     
-    async def _update_database_incremental(self) -> Dict[str, Any]:
+    def _apply_pending_diff(self) -> None:
+        """Advance the record index to the state the database now holds"""
+        if self._pending_diff is not None:
+            self.record_index.apply(self._pending_diff)
+            self._pending_diff = None
+    
+    async def _update_database_incremental(self, delta_file: Optional[str] = None) -> Dict[str, Any]:
         """Update database with incremental data"""
-        # Similar to _update_database but only processes new scraped data
-        return await self._update_database()
+        # Same as _update_database: the delta file only holds scraped listings that changed
+        return await self._update_database(delta_file)
     
     def _generate_summary_report(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a summary report of the data refresh"""
@@ -445,6 +607,7 @@ class DataRefreshService:
                         }
                         for row in capacity_ranges
                     ],
+                    'record_index': self.record_index.get_stats(),
                     'last_updated': datetime.utcnow().isoformat()
                 }
                 
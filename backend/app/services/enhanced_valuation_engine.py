@@ -9,6 +9,7 @@ from datetime import datetime
 from dataclasses import dataclass
 import numpy as np
 from .real_time_market_data import RealTimeMarketDataService
+from .valuation_pipeline import ENHANCED_PRICING, PricingTables, spec_key, valuation_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +39,8 @@ class ValuationResult:
 class MarketDataService:
     """Service for fetching and processing market data using real-time integration"""
     
-    def __init__(self):
-        self.real_time_service = RealTimeMarketDataService()
+    def __init__(self, real_time_service: Optional[RealTimeMarketDataService] = None):
+        self.real_time_service = real_time_service or RealTimeMarketDataService()
         self._initialized = False
     
     async def _ensure_initialized(self):
@@ -261,10 +262,14 @@ class BloombergReportGenerator:
 class EnhancedValuationEngine:
     """Main Bloomberg-style valuation engine"""
     
-    def __init__(self):
-        self.market_service = MarketDataService()
-        self.specs_service = SpecsCatalogService()
-        self.report_generator = BloombergReportGenerator()
+    def __init__(self, market_service: Optional[MarketDataService] = None,
+                 specs_service: Optional[SpecsCatalogService] = None,
+                 report_generator: Optional[BloombergReportGenerator] = None,
+                 pricing: Optional[PricingTables] = None):
+        self.market_service = market_service or MarketDataService()
+        self.specs_service = specs_service or SpecsCatalogService()
+        self.report_generator = report_generator or BloombergReportGenerator()
+        self.pricing = pricing or ENHANCED_PRICING
     
     async def value_crane(self, request_data: Dict[str, Any]) -> ValuationResult:
         """Perform comprehensive Bloomberg-style crane valuation"""
@@ -405,31 +410,13 @@ class EnhancedValuationEngine:
     async def _calculate_base_valuation(self, request_data: Dict[str, Any], 
                                       specs: Dict[str, Any], market_data: Dict[str, Any]) -> Dict[str, float]:
         """Calculate base valuation using multiple methodologies"""
-        year = request_data['year']
-        hours = request_data['hours']
-        condition_score = request_data['condition_score']
-        capacity_tons = request_data['capacity_tons']
-        
         # Get market average as starting point
         market_avg = market_data.get('average_price', 1000000)  # Default fallback
         
-        # Age-based depreciation
-        current_year = datetime.now().year
-        age = current_year - year
-        age_depreciation = 0.08 * age  # 8% per year
-        
-        # Hours-based depreciation
-        hours_depreciation = min(hours / 10000, 0.3)  # Max 30% for high hours
-        
-        # Condition adjustment
-        condition_adjustment = (1 - condition_score) * 0.2  # Up to 20% adjustment
-        
-        # Capacity adjustment (larger cranes typically have higher base values)
-        capacity_multiplier = 1 + (capacity_tons - 200) / 1000  # Adjust for capacity
-        
-        # Calculate adjusted base value
-        base_value = market_avg * capacity_multiplier
-        adjusted_value = base_value * (1 - age_depreciation - hours_depreciation - condition_adjustment)
+        # Capacity-scaled market average less age (8%/year), hours (up to 30%) and condition (up to 20%)
+        key = spec_key(request_data['manufacturer'], request_data['model'], request_data['year'],
+                       request_data['capacity_tons'], request_data['hours'], request_data['condition_score'])
+        adjusted_value = valuation_pipeline.run(self.pricing, key, anchor_price=market_avg).fair_market_value
         
         # Calculate wholesale and retail values
         wholesale_value = adjusted_value * 0.85  # 15% below FMV
@@ -0,0 +1,203 @@
+"""
+Fleet Valuation Executor
+Values a fleet of cranes off the event loop: identical specs are valued once, the CPU stages run in a worker pool
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .valuation_cache import spec_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# ROI used when a unit has no asking price (the engine's medium rental scenario)
+DEFAULT_ROI = 0.12
+
+
+class FleetValuationExecutor:
+    """
+    Runs ``engine.value_crane_offloaded`` for many specs: market data is fetched on
+    the event loop (the real-time service's HTTP session is bound to it) and the
+    CPU-bound stages run on a dedicated thread pool.
+
+    Specs are grouped by their canonical fingerprint (the valuation cache key), so
+    a fleet of 300 units with 40 distinct configurations costs 40 valuations.
+    ``iter_valuations`` yields each group as soon as it is valued, which lets the
+    API stream per-unit results while the rest of the fleet is still running. At
+    most ``max_in_flight`` groups are being valued at once; the next one starts
+    when one finishes.
+    """
+
+    def __init__(self, max_workers: int = 4, max_in_flight: int = 8):
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.fleets = 0
+        self.units = 0
+        self.valuations = 0
+        self.last_fleet_ms = 0.0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fleet-valuation")
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def iter_valuations(self, engine: Any, specs_list: List[Any]) -> AsyncIterator[Tuple[List[int], Any, Optional[Exception]]]:
+        """
+        Yield ``(unit_indexes, result, error)`` per distinct spec, in completion order.
+        ``unit_indexes`` are the positions in ``specs_list`` sharing that spec.
+        """
+        groups: "OrderedDict[str, List[int]]" = OrderedDict()
+        for index, specs in enumerate(specs_list):
+            groups.setdefault(spec_fingerprint(specs), []).append(index)
+
+        started = time.perf_counter()
+        self.fleets += 1
+        self.units += len(specs_list)
+        self.valuations += len(groups)
+
+        pool = self._executor()
+        queued = iter(groups.values())
+        pending: Dict[asyncio.Future, List[int]] = {}
+
+        def start_next() -> None:
+            indexes = next(queued, None)
+            if indexes is not None:
+                pending[asyncio.ensure_future(engine.value_crane_offloaded(specs_list[indexes[0]], pool))] = indexes
+
+        for _ in range(self.max_in_flight):
+            start_next()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    indexes = pending.pop(future)
+                    start_next()
+                    error = future.exception()
+                    yield indexes, (None if error else future.result()), error
+        finally:
+            # Client went away mid-stream: cancel the valuations still in flight
+            for future in pending:
+                future.cancel()
+            self.last_fleet_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def value_fleet(self, engine: Any, specs_list: List[Any]) -> List[Tuple[Any, Optional[Exception]]]:
+        """All valuations, in the order of ``specs_list``"""
+        results: List[Tuple[Any, Optional[Exception]]] = [(None, None)] * len(specs_list)
+        async for indexes, result, error in self.iter_valuations(engine, specs_list):
+            for index in indexes:
+                results[index] = (result, error)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_in_flight": self.max_in_flight,
+            "fleets": self.fleets,
+            "units": self.units,
+            "valuations": self.valuations,
+            "dedup_ratio": round(1 - self.valuations / self.units, 4) if self.units else 0,
+            "last_fleet_ms": self.last_fleet_ms,
+        }
+
+
+def unit_analysis(crane_id: int, specs: Any, result: Any) -> Dict[str, Any]:
+    """Per-unit fleet entry (valuation plus medium-scenario ROI)"""
+    price = specs.price or result.fair_market_value
+    roi = DEFAULT_ROI
+    if specs.price and result.financial_metrics and 'roi_scenarios' in result.financial_metrics:
+        roi = result.financial_metrics['roi_scenarios']['medium']['annual_return'] / specs.price
+    return {
+        "crane_id": crane_id,
+        "specs": {
+            "manufacturer": specs.manufacturer,
+            "model": specs.model,
+            "year": specs.year,
+            "capacity_tons": specs.capacity_tons
+        },
+        "valuation": {
+            "fair_market_value": result.fair_market_value,
+            "deal_score": result.deal_score,
+            "market_position": result.market_position
+        },
+        "financial": {
+            "price": price,
+            "roi": roi,
+            "annual_return": price * roi
+        }
+    }
+
+
+def _concentration(labels: List[str], weights: np.ndarray) -> Dict[str, Any]:
+    """Herfindahl index of ``weights`` grouped by ``labels`` and its complement as a diversification score"""
+    total = weights.sum()
+    if not labels or total <= 0:
+        return {"groups": 0, "herfindahl_index": 0.0, "diversification_score": 0.0}
+    _, group_ids = np.unique(np.array(labels), return_inverse=True)
+    shares = np.bincount(group_ids, weights=weights) / total
+    hhi = float(np.square(shares).sum())
+    return {"groups": int(shares.size), "herfindahl_index": round(hhi, 4), "diversification_score": round(1 - hhi, 4)}
+
+
+def portfolio_summary(units: List[Dict[str, Any]], asking_prices: List[Optional[float]],
+                      target_roi: float, budget: Optional[float]) -> Dict[str, Any]:
+    """
+    Portfolio metrics, recommendations and ranking for valued units in one vectorized pass.
+    ``asking_prices`` are the requested prices (None where not given), aligned with ``units``.
+    """
+    prices = np.array([p or 0.0 for p in asking_prices], dtype=float)
+    roi = np.array([u["financial"]["roi"] for u in units], dtype=float)
+    values = np.array([u["valuation"]["fair_market_value"] for u in units], dtype=float)
+    deal_scores = np.array([u["valuation"]["deal_score"] for u in units], dtype=float)
+
+    # Only units with an asking price count as investment (as before)
+    total_investment = float(prices.sum())
+    portfolio_roi = float((prices * roi).sum() / total_investment) if total_investment > 0 else 0
+
+    recommendations = []
+    if portfolio_roi < target_roi:
+        recommendations.append("Consider higher-ROI equipment to meet target returns")
+    if budget and total_investment > budget:
+        recommendations.append("Fleet exceeds budget - prioritize highest-ROI equipment")
+
+    # Stable descending sort by deal score for prioritization
+    order = np.argsort(-deal_scores, kind="stable") if units else []
+    ranked = [units[i] for i in order]
+
+    capacity_classes = [f"{int(u['specs']['capacity_tons'] // 100) * 100}t" for u in units]
+    return {
+        "fleet_analysis": ranked,
+        "portfolio_metrics": {
+            "total_cranes": len(units),
+            "total_investment": total_investment,
+            "total_fair_market_value": float(values.sum()),
+            "portfolio_roi": portfolio_roi,
+            "target_roi": target_roi,
+            "budget_utilization": (total_investment / budget * 100) if budget else None,
+            "diversification": {
+                "manufacturer": _concentration([u["specs"]["manufacturer"] for u in units], values),
+                "capacity_class": _concentration(capacity_classes, values),
+            }
+        },
+        "recommendations": recommendations,
+        "top_picks": ranked[:3]  # Top 3 by deal score
+    }
+
+
+# Global instance
+fleet_valuation_executor = FleetValuationExecutor(
+    max_workers=settings.fleet_valuation_workers,
+    max_in_flight=settings.fleet_valuation_max_in_flight,
+)
@@ -0,0 +1,225 @@
+"""
+Market Statistics Snapshot
+Aggregates behind the terminal market-data endpoints, computed in a few queries on one connection and served as a versioned snapshot
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Top groups kept per dimension (the endpoints show at most 10)
+TOP_GROUPS = 10
+
+CAPACITY_BUCKETS = ("<100T", "100-200T", "200-300T", "300-400T", "400-500T", ">500T")
+CAPACITY_BUCKET_SQL = """
+    CASE
+        WHEN capacity_tons < 100 THEN '<100T'
+        WHEN capacity_tons < 200 THEN '100-200T'
+        WHEN capacity_tons < 300 THEN '200-300T'
+        WHEN capacity_tons < 400 THEN '300-400T'
+        WHEN capacity_tons < 500 THEN '400-500T'
+        ELSE '>500T'
+    END
+"""
+
+# (dimension, grouped expression, column that must be present)
+GROUP_DIMENSIONS = (
+    ("manufacturer", "manufacturer", "manufacturer"),
+    ("location", "location", "location"),
+    ("capacity", CAPACITY_BUCKET_SQL, "capacity_tons"),
+)
+
+
+def _float(value: Any) -> float:
+    return float(value) if value is not None else 0.0
+
+
+class MarketStatsSnapshot:
+    """One immutable set of market aggregates"""
+
+    __slots__ = ("version", "etag", "computed_at", "data", "compute_ms")
+
+    def __init__(self, version: int, data: Dict[str, Any], compute_ms: float):
+        self.version = version
+        self.data = data
+        self.compute_ms = compute_ms
+        self.computed_at = datetime.utcnow()
+        self.etag = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+
+class MarketStatsService:
+    """
+    Materialized market statistics over the ``cranes`` table.
+
+    A refresh runs one multi-aggregate SELECT (totals, price range, variance,
+    24h activity, completeness) and the manufacturer, location and
+    capacity-bucket GROUP BYs, all on one connection. The snapshot is rebuilt after a commit that
+    wrote cranes through an ORM session in this process, or once it is older than
+    ``refresh_seconds`` (which also covers writes from other workers). Concurrent
+    requests for a stale snapshot wait on a single refresh.
+    """
+
+    def __init__(self, refresh_seconds: float = 60):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[MarketStatsSnapshot] = None
+        self._refreshed_at = 0.0
+        self._dirty = True
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.served = 0
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def current(self) -> Optional[MarketStatsSnapshot]:
+        """The snapshot if it is fresh (no database access), else None"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._dirty and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            self.served += 1
+            return snapshot
+        return None
+
+    def get_snapshot(self) -> MarketStatsSnapshot:
+        """The fresh snapshot, refreshing it first if needed (blocking)"""
+        snapshot = self.current()
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            # Another request may have refreshed while this one waited
+            snapshot = self.current()
+            if snapshot is not None:
+                return snapshot
+            self.served += 1
+            return self.refresh()
+
+    def refresh(self) -> MarketStatsSnapshot:
+        from ..core.database import engine
+
+        self._dirty = False
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            data = self._compute(conn)
+        compute_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        previous = self._snapshot
+        version = (previous.version + 1) if previous else 1
+        snapshot = MarketStatsSnapshot(version, data, compute_ms)
+        if previous is not None and previous.etag == snapshot.etag:
+            # Nothing changed: keep the version so clients keep their ETag
+            snapshot = previous
+        self._snapshot = snapshot
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+        return snapshot
+
+    def _compute(self, conn) -> Dict[str, Any]:
+        # Truncated to the minute so consecutive refreshes agree when nothing changed
+        recent_cutoff = (datetime.utcnow() - timedelta(hours=24)).replace(second=0, microsecond=0)
+        # The variance is taken of prices shifted by one listed price, which keeps
+        # AVG(d*d) - AVG(d)^2 from cancelling out when prices dwarf their spread
+        totals = conn.execute(text("""
+            SELECT COUNT(*) AS total,
+                   COUNT(price) AS priced,
+                   AVG(price) AS avg_price,
+                   SUM(price) AS total_value,
+                   MIN(price) AS min_price,
+                   MAX(price) AS max_price,
+                   AVG(price - shift.value) AS avg_delta,
+                   AVG((price - shift.value) * (price - shift.value)) AS avg_delta_sq,
+                   SUM(CASE WHEN created_at >= :cutoff THEN 1 ELSE 0 END) AS recent_count,
+                   SUM(CASE WHEN created_at >= :cutoff THEN price ELSE 0 END) AS recent_value,
+                   SUM(CASE WHEN price IS NOT NULL AND capacity_tons IS NOT NULL AND hours IS NOT NULL
+                            THEN 1 ELSE 0 END) AS complete
+            FROM cranes
+            LEFT JOIN (SELECT price AS value FROM cranes WHERE price IS NOT NULL LIMIT 1) AS shift
+                   ON shift.value IS NOT NULL
+        """), {"cutoff": recent_cutoff}).mappings().one()
+
+        # One GROUP BY per dimension: a single UNION ALL of them would be rejected by the
+        # SQL injection guard on the primary engine (it blocks any UNION ... SELECT)
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for dimension, expression, column in GROUP_DIMENSIONS:
+            rows = conn.execute(text(f"""
+                SELECT {expression} AS label, COUNT(*) AS count, AVG(price) AS avg_price
+                FROM cranes WHERE {column} IS NOT NULL GROUP BY {expression}
+            """))
+            groups[dimension] = [
+                {"label": label, "count": count, "avg_price": round(_float(avg_price), 2)}
+                for label, count, avg_price in rows
+            ]
+        for dimension in ("manufacturer", "location"):
+            groups[dimension] = sorted(groups[dimension], key=lambda g: (-g["count"], g["label"]))[:TOP_GROUPS]
+        groups["capacity"].sort(key=lambda g: CAPACITY_BUCKETS.index(g["label"]))
+
+        avg_price = _float(totals["avg_price"])
+        priced = totals["priced"] or 0
+        avg_delta = _float(totals["avg_delta"])
+        # Sample variance (n - 1), as PostgreSQL's stddev; clamped against rounding below zero
+        variance = 0.0
+        if priced > 1:
+            variance = max(0.0, (_float(totals["avg_delta_sq"]) - avg_delta * avg_delta) * priced / (priced - 1))
+        return {
+            "total_listings": totals["total"] or 0,
+            "priced_listings": priced,
+            "complete_listings": totals["complete"] or 0,
+            "average_price": round(avg_price, 2),
+            "total_market_value": round(_float(totals["total_value"]), 2),
+            "min_price": _float(totals["min_price"]),
+            "max_price": _float(totals["max_price"]),
+            "price_stddev": round(variance ** 0.5, 2),
+            "recent_listings_24h": totals["recent_count"] or 0,
+            "volume_24h": round(_float(totals["recent_value"]), 2),
+            "manufacturers": groups["manufacturer"],
+            "locations": groups["location"],
+            "capacity_ranges": groups["capacity"],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "etag": snapshot.etag if snapshot else None,
+            "computed_at": snapshot.computed_at.isoformat() if snapshot else None,
+            "compute_ms": snapshot.compute_ms if snapshot else None,
+            "refresh_seconds": self.refresh_seconds,
+            "refreshes": self.refreshes,
+            "served": self.served,
+        }
+
+
+# Global instance
+market_stats = MarketStatsService(refresh_seconds=settings.market_stats_refresh_seconds)
+
+
+def _register_ingest_hooks() -> None:
+    """Invalidate after a commit that wrote cranes (not at flush time, so a refresh never reads uncommitted state)"""
+    from sqlalchemy.orm import Session
+    from ..models.crane import Crane
+
+    def _after_flush(session, flush_context):
+        if any(isinstance(obj, Crane) for obj in (*session.new, *session.dirty, *session.deleted)):
+            session.info["market_stats_dirty"] = True
+
+    def _after_commit(session):
+        if session.info.pop("market_stats_dirty", False):
+            market_stats.invalidate()
+
+    def _after_rollback(session):
+        session.info.pop("market_stats_dirty", None)
+
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+_register_ingest_hooks()
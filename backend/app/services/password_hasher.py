@@ -0,0 +1,114 @@
+"""
+Password Hashing Pool
+Runs bcrypt off the event loop on a bounded worker pool and sheds load when it is saturated
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHashingOverloaded(HTTPException):
+    """Raised (as HTTP 429) when the hashing queue is full"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts are being processed. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class PasswordHashingPool:
+    """
+    Dedicated executor for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so a small thread pool gives real
+    parallelism without blocking the event loop. At most ``max_workers`` hashes
+    run at once and at most ``max_queue`` more wait; anything beyond that is
+    rejected immediately with PasswordHashingOverloaded (login-storm protection).
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Run a hashing function in the pool; raises PasswordHashingOverloaded when full"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHashingOverloaded()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def timed_call():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.total_wait_seconds += started - submitted
+                    self.total_run_seconds += finished - started
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), timed_call)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "completed": completed,
+                "rejected": self.rejected,
+                "avg_queue_wait_ms": round(self.total_wait_seconds / completed * 1000, 2) if completed else 0,
+                "avg_hash_ms": round(self.total_run_seconds / completed * 1000, 2) if completed else 0,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
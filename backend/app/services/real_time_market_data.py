@@ -55,6 +55,7 @@ class RealTimeMarketDataService:
     def __init__(self):
         self.session = None
         self.redis_client = None
+        self._initialized = False
         self.cache_duration = 3600  # 1 hour cache
         self.rate_limits = {
             'equipment_watch': {'requests': 0, 'last_reset': time.time()},
@@ -63,7 +64,9 @@ class RealTimeMarketDataService:
         }
         
     async def initialize(self):
-        """Initialize the service with connections"""
+        """Initialize the service with connections (idempotent: the session is reused)"""
+        if self.session is not None and not self.session.closed:
+            return
         try:
             # Initialize aiohttp session with API authentication
             self.session = aiohttp.ClientSession(
@@ -84,6 +87,7 @@ class RealTimeMarketDataService:
             except Exception as e:
                 logger.warning(f"Redis not available, using in-memory cache: {e}")
                 self.redis_client = None
+            self._initialized = True
                 
         except Exception as e:
             logger.error(f"Failed to initialize market data service: {e}")
@@ -93,8 +97,14 @@ class RealTimeMarketDataService:
         """Close the service and cleanup resources"""
         if self.session:
             await self.session.close()
+            self.session = None
         if self.redis_client:
-            await self.redis_client.close()
+            try:
+                self.redis_client.close()
+            except Exception as e:
+                logger.debug(f"Error closing market data Redis client: {e}")
+            self.redis_client = None
+        self._initialized = False
     
     async def get_equipment_watch_data(self, make: str, model: str) -> Dict[str, Any]:
         """Fetch real-time data from Equipment Watch API"""
@@ -0,0 +1,221 @@
+"""
+Record Hash Index
+Persistent record-hash index used by the data refresh pipeline for change detection
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Fields that identify a listing across refreshes (a listing keeps its key when its price changes)
+IDENTITY_FIELDS = ('source', 'title', 'manufacturer', 'year')
+
+# Fields whose changes count as a content change for an existing listing
+CONTENT_FIELDS = (
+    'title', 'manufacturer', 'model', 'year', 'price', 'location', 'hours',
+    'capacity_tons', 'crane_type', 'region', 'wear_score', 'value_score', 'source', 'url'
+)
+
+
+@dataclass
+class RecordDiff:
+    """Result of diffing a batch of records against the previous refresh state"""
+    new: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    duplicates: int = 0
+
+    @property
+    def churn(self) -> int:
+        return len(self.new) + len(self.changed) + len(self.deleted)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'new_records': len(self.new),
+            'changed_records': len(self.changed),
+            'deleted_records': len(self.deleted),
+            'unchanged_records': self.unchanged,
+            'duplicates_removed': self.duplicates,
+        }
+
+
+class RecordHashIndex:
+    """
+    On-disk (SQLite) index of listing key -> content hash
+    Each refresh is diffed against the stored state so only churn is written
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.index_path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS record_index (
+                    record_key TEXT PRIMARY KEY,
+                    record_hash TEXT NOT NULL,
+                    source TEXT,
+                    payload TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_changed TEXT NOT NULL,
+                    deleted_at TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_record_index_source_live "
+                "ON record_index(source, deleted_at)"
+            )
+
+    @staticmethod
+    def compute_key(record: Dict[str, Any]) -> str:
+        """Stable identity key for a listing (URL when available, else identity fields)"""
+        url = record.get('url')
+        if url:
+            key_string = f"url|{url}"
+        else:
+            key_string = "|".join(str(record.get(f, '')).strip().lower() for f in IDENTITY_FIELDS)
+        return hashlib.sha256(key_string.encode()).hexdigest()[:24]
+
+    @staticmethod
+    def compute_hash(record: Dict[str, Any]) -> str:
+        """Content hash over the fields that matter for the listing tables"""
+        content = {f: record.get(f) for f in CONTENT_FIELDS}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def diff(self, records: Iterable[Dict[str, Any]], sources: Optional[Iterable[str]] = None) -> RecordDiff:
+        """
+        Diff a batch of records against the stored state.
+
+        Deletions are only reported for ``sources`` (the sources that were fully
+        refreshed in this run); listings from sources that were not fetched are left alone.
+        The batch is staged in a temp table so the comparison runs as SQL joins.
+        """
+        result = RecordDiff()
+        batch: Dict[str, tuple] = {}
+        for record in records:
+            key = self.compute_key(record)
+            if key in batch:
+                result.duplicates += 1
+                continue
+            batch[key] = (self.compute_hash(record), record)
+
+        with self._lock, self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch (record_key TEXT PRIMARY KEY, record_hash TEXT)")
+            conn.execute("DELETE FROM batch")
+            conn.executemany(
+                "INSERT INTO batch (record_key, record_hash) VALUES (?, ?)",
+                ((key, value[0]) for key, value in batch.items())
+            )
+
+            # New or changed: missing from the index, content hash differs, or previously deleted
+            rows = conn.execute("""
+                SELECT b.record_key, r.record_key IS NULL OR r.deleted_at IS NOT NULL AS is_new
+                FROM batch b
+                LEFT JOIN record_index r ON r.record_key = b.record_key
+                WHERE r.record_key IS NULL OR r.record_hash != b.record_hash OR r.deleted_at IS NOT NULL
+            """).fetchall()
+            for key, is_new in rows:
+                record = dict(batch[key][1])
+                record['record_key'] = key
+                record['record_hash'] = batch[key][0]
+                (result.new if is_new else result.changed).append(record)
+            result.unchanged = len(batch) - len(rows)
+
+            source_list = sorted(set(sources or []))
+            if source_list:
+                placeholders = ",".join("?" for _ in source_list)
+                result.deleted = [row[0] for row in conn.execute(f"""
+                    SELECT r.record_key FROM record_index r
+                    WHERE r.deleted_at IS NULL AND r.source IN ({placeholders})
+                      AND NOT EXISTS (SELECT 1 FROM batch b WHERE b.record_key = r.record_key)
+                """, source_list)]
+
+            conn.execute("DELETE FROM batch")
+
+        return result
+
+    def apply(self, diff: RecordDiff) -> None:
+        """Persist a diff so the next refresh is compared against this state"""
+        now = datetime.utcnow().isoformat()
+        upserts = [
+            (r['record_key'], r['record_hash'], r.get('source'), json.dumps(r, default=str), now, now)
+            for r in diff.new + diff.changed
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany("""
+                INSERT INTO record_index (record_key, record_hash, source, payload, first_seen, last_changed, deleted_at)
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT(record_key) DO UPDATE SET
+                    record_hash = excluded.record_hash,
+                    source = excluded.source,
+                    payload = excluded.payload,
+                    last_changed = excluded.last_changed,
+                    deleted_at = NULL
+            """, upserts)
+            conn.executemany(
+                "UPDATE record_index SET deleted_at = ?, last_changed = ? WHERE record_key = ?",
+                ((now, now, key) for key in diff.deleted)
+            )
+
+    def get_payloads(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch stored payloads for the given keys (used to describe deletions)"""
+        key_list = list(keys)
+        payloads: Dict[str, Dict[str, Any]] = {}
+        with self._connect() as conn:
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                for key, payload in conn.execute(
+                    f"SELECT record_key, payload FROM record_index WHERE record_key IN ({placeholders})", chunk
+                ):
+                    payloads[key] = json.loads(payload)
+        return payloads
+
+    def iter_live_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream all non-deleted records from the index"""
+        with self._connect() as conn:
+            for (payload,) in conn.execute(
+                "SELECT payload FROM record_index WHERE deleted_at IS NULL ORDER BY record_key"
+            ):
+                yield json.loads(payload)
+
+    def purge_deleted(self, older_than: datetime) -> int:
+        """Drop tombstones older than the given timestamp"""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM record_index WHERE deleted_at IS NOT NULL AND deleted_at < ?",
+                (older_than.isoformat(),)
+            )
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            live, deleted = conn.execute("""
+                SELECT
+                    SUM(CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN deleted_at IS NOT NULL THEN 1 ELSE 0 END)
+                FROM record_index
+            """).fetchone()
+        return {
+            'index_path': str(self.index_path),
+            'live_records': live or 0,
+            'deleted_records': deleted or 0,
+        }
@@ -106,11 +106,17 @@ class ScrapingService:
             raise
     
     async def _scrape_marketplace(self, marketplace_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Scrape a specific marketplace"""
+        """
+        Scrape a specific marketplace
+        'complete' is only True when pagination reached the end of the results; a page
+        error or the max_pages cap leaves listings unseen, so the result must not be
+        used to detect removed listings
+        """
         try:
             listings = []
             page = 1
             max_pages = config.get('max_pages', 20)
+            complete = False
             
             while page <= max_pages:
                 try:
@@ -122,6 +128,7 @@ class ScrapingService:
                     
                     if not page_listings:
                         logger.info(f"No more listings found on page {page} for {marketplace_name}")
+                        complete = True
                         break
                     
                     listings.extend(page_listings)
@@ -133,12 +140,16 @@ class ScrapingService:
                     logger.warning(f"Error scraping page {page} of {marketplace_name}: {e}")
                     break
             
+            if not complete:
+                logger.warning(f"Scrape of {marketplace_name} stopped at page {page} before the end of the results")
+            
             return {
                 'marketplace': marketplace_name,
                 'listings_found': len(listings),
                 'pages_scraped': page - 1,
                 'listings': listings,
-                'success': True
+                'success': True,
+                'complete': complete
             }
             
         except Exception as e:
@@ -149,47 +160,43 @@ class ScrapingService:
                 'pages_scraped': 0,
                 'listings': [],
                 'success': False,
+                'complete': False,
                 'error': str(e)
             }
     
     async def _scrape_page(self, marketplace_name: str, config: Dict[str, Any], page: int) -> List[Dict[str, Any]]:
-        """Scrape a single page of listings"""
-        try:
-            # Build search URL with pagination
-            search_url = self._build_search_url(config, page)
-            
-            # Check cache first
-            cached_data = self._get_cached_data(search_url)
-            if cached_data:
-                return cached_data
+        """
+        Scrape a single page of listings
+        An empty list means the results ended; request and parse errors are raised
+        """
+        # Build search URL with pagination
+        search_url = self._build_search_url(config, page)
+        
+        # Check cache first
+        cached_data = self._get_cached_data(search_url)
+        if cached_data:
+            return cached_data
+        
+        # Make request
+        async with aiohttp.ClientSession() as session:
+            headers = {
+                'User-Agent': random.choice(self.user_agents),
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1'
+            }
             
-            # Make request
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'User-Agent': random.choice(self.user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
+            async with session.get(search_url, headers=headers, timeout=30) as response:
+                response.raise_for_status()
+                html = await response.text()
+                listings = self._parse_listings(html, marketplace_name)
                 
-                async with session.get(search_url, headers=headers, timeout=30) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        listings = self._parse_listings(html, marketplace_name)
-                        
-                        # Cache the results
-                        self._cache_data(search_url, listings)
-                        
-                        return listings
-                    else:
-                        logger.warning(f"HTTP {response.status} for {search_url}")
-                        return []
-        
-        except Exception as e:
-            logger.error(f"Error scraping page {page} of {marketplace_name}: {e}")
-            return []
+                # Cache the results
+                self._cache_data(search_url, listings)
+                
+                return listings
     
     def _build_search_url(self, config: Dict[str, Any], page: int) -> str:
         """Build search URL with pagination and filters"""
@@ -217,7 +224,7 @@ class ScrapingService:
                 
         except Exception as e:
             logger.error(f"Error parsing listings for {marketplace_name}: {e}")
-            return []
+            raise
     
     def _parse_cranetrader_listings(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         """Parse CraneTrader listings"""
@@ -0,0 +1,168 @@
+"""
+Section Graph Executor
+Runs report sections as a dependency graph: independent sections concurrently, each with a timeout and a shared result cache
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marker for sections without a fallback: their failure fails the whole run
+REQUIRED = object()
+
+
+@dataclass
+class Section:
+    """
+    One unit of report work. ``compute`` receives the run context followed by the
+    results of ``deps`` (in order). ``cache_params`` names context entries that
+    change the result besides the window (e.g. the chart format); ``ttl_seconds=0``
+    disables caching for the section.
+    """
+    name: str
+    compute: Callable[..., Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+    timeout_seconds: float = 10.0
+    ttl_seconds: float = 300.0
+    fallback: Any = REQUIRED
+    cache_params: Tuple[str, ...] = ()
+
+
+class SectionGraph:
+    """
+    Executes the sections needed for a set of targets.
+
+    Each section starts as soon as its dependencies have finished, so independent
+    sections run concurrently. Results are cached per ``(section, window, params)``
+    for the section's TTL and concurrent runs share an in-flight computation, which
+    lets different report types reuse the sections they have in common. A section
+    that fails or exceeds its timeout yields its fallback (or fails the run if it
+    has none).
+    """
+
+    def __init__(self, sections: Iterable[Section], max_entries: int = 512):
+        self.sections: Dict[str, Section] = {}
+        for section in sections:
+            self.sections[section.name] = section
+        for section in self.sections.values():
+            missing = [dep for dep in section.deps if dep not in self.sections]
+            if missing:
+                raise ValueError(f"Section '{section.name}' depends on unknown sections {missing}")
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.section_ms: Dict[str, float] = {}
+
+    async def run(self, targets: List[str], window: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Results of ``targets`` (and everything they depend on), keyed by section name"""
+        tasks: Dict[str, "asyncio.Task"] = {}
+
+        def schedule(name: str) -> "asyncio.Task":
+            task = tasks.get(name)
+            if task is None:
+                section = self.sections[name]
+                for dep in section.deps:
+                    schedule(dep)
+                task = tasks[name] = asyncio.ensure_future(self._run_section(section, tasks, window, context))
+            return task
+
+        for name in targets:
+            schedule(name)
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return {name: task.result() for name, task in tasks.items()}
+
+    async def _run_section(self, section: Section, tasks: Dict[str, "asyncio.Task"],
+                           window: str, context: Dict[str, Any]) -> Any:
+        dep_results = [await tasks[dep] for dep in section.deps]
+        key = (section.name, window) + tuple(repr(context.get(param)) for param in section.cache_params)
+
+        if section.ttl_seconds > 0:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.hits += 1
+                return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        if section.ttl_seconds > 0:
+            self._inflight[key] = future
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(section.compute(context, *dep_results), timeout=section.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"Report section '{section.name}' timed out after {section.timeout_seconds}s")
+            return self._fail(section, key, future, asyncio.TimeoutError(f"Section '{section.name}' timed out"))
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Report section '{section.name}' failed: {e}")
+            return self._fail(section, key, future, e)
+        except asyncio.CancelledError:
+            # Run abandoned: release waiters so they do not hang on this computation
+            self._inflight.pop(key, None)
+            future.cancel()
+            raise
+        finally:
+            self.section_ms[section.name] = round((time.perf_counter() - started) * 1000, 2)
+
+        if section.ttl_seconds > 0:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + section.ttl_seconds, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def _fail(self, section: Section, key: Tuple, future: "asyncio.Future", error: Exception) -> Any:
+        # Failures and fallbacks are not cached; waiters get the same outcome
+        self._inflight.pop(key, None)
+        if section.fallback is REQUIRED:
+            future.set_exception(error)
+            future.exception()  # retrieved here so waiter-less futures do not log
+            raise error
+        future.set_result(section.fallback)
+        return section.fallback
+
+    def invalidate(self, section_name: Optional[str] = None) -> None:
+        with self._lock:
+            if section_name is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == section_name]:
+                    del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._cache)
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "last_section_ms": dict(self.section_ms),
+        }
@@ -0,0 +1,162 @@
+"""
+Application Service Container
+Process-wide valuation engines and market data services, created once and shared by every request
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Registration:
+    __slots__ = ("factory", "close", "warm", "instance", "constructions", "lookups", "construct_ms")
+
+    def __init__(self, factory: Callable[[], Any], close: Optional[Callable[[Any], Any]], warm: bool):
+        self.factory = factory
+        self.close = close
+        self.warm = warm
+        self.instance: Any = None
+        self.constructions = 0
+        self.lookups = 0
+        self.construct_ms = 0.0
+
+
+class ServiceContainer:
+    """
+    Named, lazily constructed singletons.
+
+    ``startup`` builds the services registered with ``warm=True`` (called from the
+    FastAPI startup hook); anything else is built on first ``get``. ``shutdown``
+    runs each service's close hook (sync or async) and forgets the instance, so a
+    later ``get`` would build a fresh one. Construction and lookup counts are kept
+    per service to show how much reuse the container is providing.
+    """
+
+    def __init__(self):
+        self._registrations: Dict[str, _Registration] = {}
+        self._lock = threading.RLock()
+        self.started = False
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 close: Optional[Callable[[Any], Any]] = None, warm: bool = False) -> None:
+        with self._lock:
+            self._registrations[name] = _Registration(factory, close, warm)
+
+    def get(self, name: str) -> Any:
+        registration = self._registrations.get(name)
+        if registration is None:
+            raise KeyError(f"No service registered as '{name}'")
+        registration.lookups += 1
+        if registration.instance is None:
+            with self._lock:
+                if registration.instance is None:
+                    started = time.perf_counter()
+                    registration.instance = registration.factory()
+                    registration.construct_ms = round((time.perf_counter() - started) * 1000, 2)
+                    registration.constructions += 1
+                    logger.info(f"Service '{name}' constructed in {registration.construct_ms} ms")
+        return registration.instance
+
+    def provider(self, name: str) -> Callable[[], Any]:
+        """FastAPI dependency returning the named service"""
+        def provide() -> Any:
+            return self.get(name)
+        provide.__name__ = f"provide_{name}"
+        return provide
+
+    async def startup(self) -> None:
+        for name, registration in list(self._registrations.items()):
+            if registration.warm:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logger.warning(f"Could not warm service '{name}': {e}")
+        self.started = True
+
+    async def shutdown(self) -> None:
+        # Reverse registration order: dependents close before what they share
+        for name, registration in reversed(list(self._registrations.items())):
+            instance = registration.instance
+            if instance is None:
+                continue
+            registration.instance = None
+            if registration.close is None:
+                continue
+            try:
+                result = registration.close(instance)
+                if inspect.isawaitable(result):
+                    await asyncio.wait_for(result, timeout=10)
+            except Exception as e:
+                logger.warning(f"Error closing service '{name}': {e}")
+        self.started = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        services: Dict[str, Any] = {}
+        for name, registration in self._registrations.items():
+            services[name] = {
+                "alive": registration.instance is not None,
+                "constructions": registration.constructions,
+                "lookups": registration.lookups,
+                "reuse_ratio": round(1 - registration.constructions / registration.lookups, 4)
+                if registration.lookups else 0,
+                "construct_ms": registration.construct_ms,
+            }
+        return {"started": self.started, "services": services}
+
+
+# ==================== SERVICE REGISTRATIONS ====================
+
+def _real_time_market_data():
+    # The module-level instance, so code that imports it directly shares the same session
+    from .real_time_market_data import real_time_market_data_service
+    return real_time_market_data_service
+
+
+def _valuation_engine():
+    from .valuation_engine_unified import UnifiedValuationEngine
+    return UnifiedValuationEngine(use_real_time_data=False)
+
+
+def _realtime_valuation_engine():
+    from .valuation_engine_unified import UnifiedValuationEngine
+    return UnifiedValuationEngine(
+        use_real_time_data=True, real_time_service=services.get("real_time_market_data")
+    )
+
+
+def _enhanced_market_data():
+    from .enhanced_valuation_engine import MarketDataService
+    return MarketDataService(real_time_service=services.get("real_time_market_data"))
+
+
+def _enhanced_specs_catalog():
+    from .enhanced_valuation_engine import SpecsCatalogService
+    return SpecsCatalogService()
+
+
+def _enhanced_valuation_engine():
+    from .enhanced_valuation_engine import BloombergReportGenerator, EnhancedValuationEngine
+    return EnhancedValuationEngine(
+        market_service=services.get("enhanced_market_data"),
+        specs_service=services.get("enhanced_specs_catalog"),
+        report_generator=BloombergReportGenerator(),
+    )
+
+
+async def _close_real_time_market_data(service) -> None:
+    await service.close()
+
+
+# Global instance
+services = ServiceContainer()
+services.register("real_time_market_data", _real_time_market_data, close=_close_real_time_market_data)
+services.register("valuation_engine", _valuation_engine, warm=True)
+services.register("realtime_valuation_engine", _realtime_valuation_engine, warm=True)
+services.register("enhanced_market_data", _enhanced_market_data)
+services.register("enhanced_specs_catalog", _enhanced_specs_catalog)
+services.register("enhanced_valuation_engine", _enhanced_valuation_engine, warm=True)
@@ -0,0 +1,310 @@
+"""
+Shared Datasets
+Reference datasets published once into POSIX shared memory and attached read-only (zero copy) by every worker
+"""
+
+import fcntl
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Control segment: generation number, publish time, name of the generation's data segment
+_CONTROL = struct.Struct("<Qd64s")
+_HEADER = struct.Struct("<Q")
+_ALIGN = 64
+_TRACK_FLAG = sys.version_info >= (3, 13)
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Open a segment without handing it to the multiprocessing resource tracker, which
+    would unlink it when this process exits. Segment lifetime is managed explicitly:
+    the publisher unlinks a generation once the next one is live.
+    """
+    if _TRACK_FLAG:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    # Python < 3.13 has no track flag (and registers plain attaches too)
+    segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _is_bool_like(series: Any) -> bool:
+    """Object or nullable-boolean columns holding only booleans and missing values"""
+    import pandas as pd
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return True
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "boolean"
+
+
+def _codes_dtype(category_count: int) -> str:
+    # The dtype pandas itself uses for Categorical codes, so from_codes keeps the buffer
+    if category_count < 2 ** 7:
+        return "int8"
+    if category_count < 2 ** 15:
+        return "int16"
+    return "int32"
+
+
+class SharedDatasets:
+    """One attached generation: read-only DataFrames backed by the shared segment"""
+
+    def __init__(self, generation: int, dataset_version: str, frames: Dict[str, Any],
+                 segment: shared_memory.SharedMemory):
+        self.generation = generation
+        self.dataset_version = dataset_version
+        self.frames = frames
+        self.segment = segment
+
+
+class SharedDatasetStore:
+    """
+    Publishes DataFrames into a shared memory segment per generation and attaches to them.
+
+    Numeric, boolean and datetime columns are stored as raw arrays (booleans with
+    missing values as int8 -1/0/1, attached as a nullable ``boolean`` column); every
+    other column is dictionary-encoded (codes in the segment, categories in the JSON
+    manifest at the start of the segment). Attaching maps the segment and wraps
+    the arrays without copying them; only the category labels are materialized
+    per process. A small control segment names the current generation: publishing
+    writes a new data segment, points the control segment at it and unlinks the
+    previous one. Workers already attached keep their mapping until they notice
+    the new generation and swap.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.control_name = f"{prefix}-control"
+        self._control: Optional[shared_memory.SharedMemory] = None
+        self._retired: List[shared_memory.SharedMemory] = []
+        self._lock = threading.Lock()
+        self.publishes = 0
+        self.attaches = 0
+        self.last_publish_ms = 0.0
+        self.last_segment_bytes = 0
+
+    # ------------------------------------------------------------------ control segment
+
+    def _control_segment(self, create: bool = False) -> Optional[shared_memory.SharedMemory]:
+        if self._control is None:
+            try:
+                self._control = _open_segment(self.control_name)
+            except FileNotFoundError:
+                if not create:
+                    return None
+                self._control = _open_segment(self.control_name, create=True, size=_CONTROL.size)
+                _CONTROL.pack_into(self._control.buf, 0, 0, 0.0, b"")
+        return self._control
+
+    def current(self) -> Optional[Tuple[int, str]]:
+        """``(generation, segment_name)`` of the published datasets, or None"""
+        control = self._control_segment()
+        if control is None:
+            return None
+        for _ in range(3):
+            generation, _, raw_name = _CONTROL.unpack_from(control.buf, 0)
+            name = raw_name.rstrip(b"\0").decode()
+            # A read racing with a publish can see a mix of old and new fields
+            if generation and name == self._segment_name(generation):
+                return generation, name
+            if not generation:
+                return None
+        return None
+
+    def _segment_name(self, generation: int) -> str:
+        return f"{self.prefix}-g{generation}"
+
+    @contextmanager
+    def publish_lock(self) -> Iterator[None]:
+        """Serializes publishers across processes (first worker to load, admin reloads)"""
+        path = os.path.join(tempfile.gettempdir(), f"{self.prefix}.lock")
+        with open(path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------ publish
+
+    def publish(self, frames: Dict[str, Any], dataset_version: str) -> int:
+        """Write ``frames`` as a new generation and make it current; returns the generation"""
+        import numpy as np
+        import pandas as pd
+
+        started = time.perf_counter()
+        manifest: Dict[str, Any] = {"dataset_version": dataset_version, "datasets": {}}
+        buffers = []
+        offset = 0
+        for dataset, frame in frames.items():
+            columns = []
+            for column in frame.columns:
+                series = frame[column]
+                dtype = series.dtype
+                if _is_bool_like(series):
+                    if not series.isna().any():
+                        array = np.ascontiguousarray(series.to_numpy(dtype=bool))
+                        entry = {"name": str(column), "kind": "array", "dtype": array.dtype.str}
+                    else:
+                        # -1 missing, 0 False, 1 True; attached as a nullable boolean column
+                        present = series.notna().to_numpy()
+                        array = np.full(len(series), -1, dtype="int8")
+                        array[present] = series[present].to_numpy(dtype=bool)
+                        entry = {"name": str(column), "kind": "boolean", "dtype": array.dtype.str}
+                elif isinstance(dtype, np.dtype) and (dtype.kind in "biufcmM"):
+                    array = np.ascontiguousarray(series.to_numpy())
+                    entry = {"name": str(column), "kind": "array", "dtype": array.dtype.str}
+                else:
+                    # Missing values get the -1 code, so they stay missing instead of becoming "nan"
+                    codes, categories = pd.factorize(series, use_na_sentinel=True)
+                    array = codes.astype(_codes_dtype(len(categories)))
+                    entry = {"name": str(column), "kind": "categorical", "dtype": array.dtype.str,
+                             "categories": [str(value) for value in categories]}
+                entry["offset"] = offset
+                entry["nbytes"] = array.nbytes
+                columns.append(entry)
+                buffers.append((offset, array))
+                offset = _aligned(offset + array.nbytes)
+            manifest["datasets"][dataset] = {"rows": len(frame), "columns": columns}
+
+        header = json.dumps(manifest).encode()
+        data_start = _aligned(_HEADER.size + len(header))
+        size = max(data_start + offset, 1)
+
+        with self._lock:
+            current = self.current()
+            generation = (current[0] if current else 0) + 1
+            name = self._segment_name(generation)
+            segment = _open_segment(name, create=True, size=size)
+            _HEADER.pack_into(segment.buf, 0, len(header))
+            segment.buf[_HEADER.size:_HEADER.size + len(header)] = header
+            for column_offset, array in buffers:
+                start = data_start + column_offset
+                segment.buf[start:start + array.nbytes] = array.tobytes()
+            segment.close()
+
+            control = self._control_segment(create=True)
+            _CONTROL.pack_into(control.buf, 0, generation, time.time(), name.encode())
+            if current is not None:
+                # Attached workers keep their mapping; the memory is freed when the last one lets go
+                self._unlink(current[1])
+
+        self.publishes += 1
+        self.last_segment_bytes = size
+        self.last_publish_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Published shared datasets generation {generation} "
+                    f"({size / 1024 / 1024:.1f} MB) in {self.last_publish_ms} ms")
+        return generation
+
+    @staticmethod
+    def _unlink(name: str) -> None:
+        try:
+            segment = _open_segment(name)
+            segment.close()
+            if not _TRACK_FLAG:
+                # unlink() unregisters the segment, so the tracker has to know it first
+                resource_tracker.register(segment._name, "shared_memory")
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not unlink shared dataset segment {name}: {e}")
+
+    # ------------------------------------------------------------------ attach
+
+    def attach(self) -> Optional[SharedDatasets]:
+        """Map the current generation read-only, or None when nothing is published"""
+        import numpy as np
+        import pandas as pd
+
+        for _ in range(3):
+            current = self.current()
+            if current is None:
+                return None
+            generation, name = current
+            try:
+                segment = _open_segment(name)
+                break
+            except FileNotFoundError:
+                # Replaced between reading the control segment and opening it
+                continue
+        else:
+            return None
+
+        (header_length,) = _HEADER.unpack_from(segment.buf, 0)
+        manifest = json.loads(bytes(segment.buf[_HEADER.size:_HEADER.size + header_length]))
+        data_start = _aligned(_HEADER.size + header_length)
+
+        frames = {}
+        for dataset, layout in manifest["datasets"].items():
+            rows = layout["rows"]
+            columns = {}
+            for column in layout["columns"]:
+                array = np.ndarray((rows,), dtype=np.dtype(column["dtype"]), buffer=segment.buf,
+                                   offset=data_start + column["offset"])
+                array.flags.writeable = False
+                if column["kind"] == "boolean":
+                    columns[column["name"]] = pd.arrays.BooleanArray(array == 1, array < 0)
+                elif column["kind"] == "categorical":
+                    columns[column["name"]] = pd.Categorical.from_codes(
+                        array, categories=pd.Index(column["categories"], dtype=object), validate=False
+                    )
+                else:
+                    columns[column["name"]] = array
+            frames[dataset] = pd.DataFrame(columns, copy=False)
+
+        self.attaches += 1
+        return SharedDatasets(generation, manifest["dataset_version"], frames, segment)
+
+    def retire(self, attached: SharedDatasets) -> None:
+        """Release a generation that has been swapped out once nothing references its arrays"""
+        self._retired.append(attached.segment)
+        still_mapped = []
+        for segment in self._retired:
+            try:
+                segment.close()
+            except BufferError:
+                # DataFrames from this generation are still in use somewhere
+                still_mapped.append(segment)
+        self._retired = still_mapped
+
+    def unlink_all(self) -> None:
+        """Remove the current generation and the control segment (publisher shutdown)"""
+        current = self.current()
+        if current is not None:
+            self._unlink(current[1])
+        self._unlink(self.control_name)
+        self._control = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        current = self.current()
+        return {
+            "prefix": self.prefix,
+            "generation": current[0] if current else None,
+            "publishes": self.publishes,
+            "attaches": self.attaches,
+            "last_publish_ms": self.last_publish_ms,
+            "last_segment_bytes": self.last_segment_bytes,
+            "retired_mapped": len(self._retired),
+        }
+
+
+# Global instance
+shared_dataset_store = SharedDatasetStore(prefix=f"{settings.shared_datasets_prefix}-{settings.environment}")
@@ -0,0 +1,161 @@
+"""
+Spec Matching Index
+In-memory catalog slice for matching many scraped listings against specs in one pass
+"""
+
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from .spec_search import _tokens
+
+logger = logging.getLogger(__name__)
+
+CAPACITY_TOLERANCE = 0.2
+# Geometric capacity buckets: each bucket spans 10% so a +/-20% window touches a handful of buckets
+CAPACITY_BUCKET_BASE = 1.1
+
+
+def normalize_make(make: Optional[str]) -> str:
+    return ' '.join((make or '').lower().split())
+
+
+def capacity_bucket(capacity: Optional[float]) -> Optional[int]:
+    if not capacity or capacity <= 0:
+        return None
+    return int(math.floor(math.log(capacity, CAPACITY_BUCKET_BASE)))
+
+
+def _title_terms(title: str, make: str) -> List[str]:
+    """Significant title terms, tokenized like SpecSearchIndex.match_candidates"""
+    make_tokens = set(_tokens(make))
+    return [t for t in dict.fromkeys(_tokens(title, min_length=3)) if t not in make_tokens]
+
+
+def _indicator(rows: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vocabulary of ``rows`` and the (rows x vocabulary) membership matrix"""
+    vocabulary = list(dict.fromkeys(word for row in rows for word in row))
+    position = {word: i for i, word in enumerate(vocabulary)}
+    matrix = np.zeros((len(rows), len(vocabulary)), dtype=bool)
+    for r, row in enumerate(rows):
+        matrix[r, [position[word] for word in row]] = True
+    return np.array(vocabulary, dtype=str), matrix
+
+
+class SpecMatchIndex:
+    """
+    Catalog slice indexed by normalized make and capacity bucket.
+
+    Scores use the same heuristic as SpecsCatalogService._calculate_match_confidence
+    (make 0.3, model word 0.3, capacity within 10%/20% 0.4/0.2), computed with
+    numpy over all candidate pairs of a make group at once. Title words are
+    tokenized once per group into a word-by-spec containment matrix and the best
+    spec per listing is picked with one lexsort. Eligibility and capacity ordering
+    follow SpecSearchIndex.match_candidates; specs tied on capacity distance are
+    ordered by confidence instead of the backend's text rank.
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]]):
+        self.specs = specs
+        self.spec_makes = [normalize_make(spec.get('make')) for spec in specs]
+        self.spec_models = [(spec.get('model') or '').lower() for spec in specs]
+        self.spec_model_array = np.array(self.spec_models, dtype=str)
+        self.spec_capacities = np.array(
+            [float(spec.get('capacity_tons') or np.nan) for spec in specs], dtype=float
+        )
+        # Rank of (make, model), the final tie-breaker of the SQL ORDER BY (equal keys share a rank)
+        sort_keys = list(zip(self.spec_makes, self.spec_models))
+        key_rank = {key: rank for rank, key in enumerate(sorted(set(sort_keys)))}
+        self.spec_sort_rank = np.array([key_rank[key] for key in sort_keys], dtype=np.int64)
+
+        self.by_make: Dict[str, List[int]] = defaultdict(list)
+        self.by_make_bucket: Dict[Tuple[str, Optional[int]], List[int]] = defaultdict(list)
+        for i, spec in enumerate(specs):
+            make = self.spec_makes[i]
+            self.by_make[make].append(i)
+            self.by_make_bucket[(make, capacity_bucket(spec.get('capacity_tons')))].append(i)
+
+    def catalog_makes_for(self, listing_make: str) -> List[str]:
+        """Catalog makes containing the listing make (same rule as the LIKE '%make%' filter)"""
+        if not listing_make:
+            return []
+        if listing_make in self.by_make:
+            return [listing_make]
+        return [make for make in self.by_make if listing_make in make]
+
+    def _candidates(self, catalog_makes: List[str], capacity: Optional[float]) -> List[int]:
+        if not capacity or capacity <= 0:
+            return [i for make in catalog_makes for i in self.by_make[make]]
+        low = capacity_bucket(capacity * (1 - CAPACITY_TOLERANCE))
+        high = capacity_bucket(capacity * (1 + CAPACITY_TOLERANCE))
+        return [
+            i
+            for make in catalog_makes
+            for bucket in range(low, high + 1)
+            for i in self.by_make_bucket.get((make, bucket), [])
+        ]
+
+    def match_all(self, listings: List[Dict[str, Any]]) -> List[Optional[Tuple[Dict[str, Any], float]]]:
+        """Best (spec, confidence) per listing, or None when nothing in the slice matches"""
+        results: List[Optional[Tuple[Dict[str, Any], float]]] = [None] * len(listings)
+
+        # Group listings by (catalog makes, candidate set) so each group is scored as one matrix
+        groups: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        for li, listing in enumerate(listings):
+            catalog_makes = self.catalog_makes_for(normalize_make(listing.get('manufacturer')))
+            candidates = self._candidates(catalog_makes, listing.get('capacity_tons'))
+            if candidates:
+                groups[tuple(sorted(set(candidates)))].append(li)
+
+        for candidates, listing_ids in groups.items():
+            spec_ids = np.array(candidates)
+            spec_caps = self.spec_capacities[spec_ids]
+            listing_caps = np.array(
+                [float(listings[li].get('capacity_tons') or np.nan) for li in listing_ids], dtype=float
+            )
+
+            # Capacity component and distance (L x S)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cap_diff = np.abs(listing_caps[:, None] - spec_caps[None, :])
+                rel_diff = cap_diff / np.maximum(listing_caps[:, None], spec_caps[None, :])
+            capacity_score = np.where(rel_diff < 0.1, 0.4, np.where(rel_diff < 0.2, 0.2, 0.0))
+            # Same window as the SQL BETWEEN capacity -/+ capacity * tolerance
+            within_tolerance = np.where(
+                np.isnan(listing_caps)[:, None], True, cap_diff <= listing_caps[:, None] * CAPACITY_TOLERANCE
+            )
+            # Ordering distance: like the SQL ORDER BY, a missing listing capacity targets 0
+            target_caps = np.nan_to_num(listing_caps, nan=0.0)
+            distance = np.abs(target_caps[:, None] - spec_caps[None, :])
+            distance = np.where(np.isnan(distance), 999999.0, distance)
+
+            # Model component: any title word contained in the spec model (confidence heuristic);
+            # eligibility needs a significant title term (>= 3 chars, not the make) in the model.
+            # Each distinct word of the group is tested against each candidate model once.
+            titles = [(listings[li].get('title') or '').lower() for li in listing_ids]
+            words, listing_words = _indicator([title.split() for title in titles])
+            terms, listing_terms = _indicator([
+                _title_terms(title, normalize_make(listings[li].get('manufacturer')))
+                for title, li in zip(titles, listing_ids)
+            ])
+            models = self.spec_model_array[spec_ids]
+            word_in_model = np.char.find(models[None, :], words[:, None]) >= 0
+            term_in_model = np.char.find(models[None, :], terms[:, None]) >= 0
+            model_hit = (listing_words.astype(np.float32) @ word_in_model.astype(np.float32)) > 0
+            term_hit = (listing_terms.astype(np.float32) @ term_in_model.astype(np.float32)) > 0
+            term_hit |= ~listing_terms.any(axis=1)[:, None]
+
+            confidence = np.minimum(0.3 + np.where(model_hit, 0.3, 0.0) + capacity_score, 1.0)
+            eligible = within_tolerance & term_hit
+
+            # Best per listing: eligible first, then nearest capacity, highest confidence, make/model
+            sort_rank = np.broadcast_to(self.spec_sort_rank[spec_ids], eligible.shape)
+            best = np.lexsort((sort_rank, -confidence, distance, ~eligible))[:, 0]
+            rows = np.arange(len(listing_ids))
+            for row in np.flatnonzero(eligible[rows, best]):
+                col = best[row]
+                results[listing_ids[row]] = (self.specs[candidates[col]], round(float(confidence[row, col]), 4))
+
+        return results
@@ -0,0 +1,327 @@
+"""
+Specification Search Index
+Full-text / trigram search over the spec catalog with lazy JSON column decoding
+
+Backends (picked once per engine, best available first):
+- postgres_trgm: pg_trgm GIN indexes on make/model + tsvector GIN index over make/model/features
+- postgres_fts:  tsvector GIN index only (pg_trgm extension not available)
+- sqlite_fts5:   FTS5 external-content table kept in sync with triggers
+- like:          plain LIKE scan (no full-text support compiled in)
+"""
+
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# JSON text columns of spec_catalog and the value used when they are empty
+JSON_FIELDS = {
+    'jib_options_ft': list,
+    'dimensions': dict,
+    'features': list,
+    'pdf_specs': list,
+    'raw_data': dict,
+}
+
+PG_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(make, '') || ' ' || coalesce(model, '') || ' ' || coalesce(features, ''))"
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class LazySpec(dict):
+    """
+    Spec row whose JSON text columns are decoded on first access.
+    Behaves like the plain dicts the catalog used to return.
+    """
+
+    def _decode(self, key):
+        value = dict.__getitem__(self, key)
+        if key in JSON_FIELDS and (value is None or isinstance(value, (str, bytes))):
+            try:
+                value = json.loads(value) if value else JSON_FIELDS[key]()
+            except (TypeError, ValueError):
+                value = JSON_FIELDS[key]()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key):
+        return self._decode(key)
+
+    def __iter__(self):
+        # Overriding __iter__ disables CPython's dict-merge fast path, so dict(spec)
+        # and {**spec} go through __getitem__ and see decoded values
+        return dict.__iter__(self)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._decode(key)
+        return default
+
+    def items(self):
+        for key in JSON_FIELDS:
+            if key in self:
+                self._decode(key)
+        return dict.items(self)
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def copy(self):
+        return LazySpec(dict.items(self))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fully decoded plain dict (for json.dumps and similar C-level consumers)"""
+        return dict(self.items())
+
+
+def rows_to_specs(result) -> List[LazySpec]:
+    """Wrap result rows without eagerly decoding their JSON columns"""
+    return [LazySpec(row._mapping) for row in result]
+
+
+def _tokens(value: str, min_length: int = 1) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((value or '').lower()) if len(t) >= min_length]
+
+
+def _fts5_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class SpecSearchIndex:
+    """Creates and queries the best search index available for the catalog's database"""
+
+    FTS_TABLE = "spec_catalog_fts"
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.is_postgres = engine.dialect.name == 'postgresql'
+        self.backend = 'like'
+        self._fts_trigram = False
+
+    # ------------------------------------------------------------------ setup
+
+    def ensure(self, conn: Connection) -> str:
+        """Create search structures (idempotent). Caller commits."""
+        if self.is_postgres:
+            self._ensure_postgres(conn)
+        else:
+            self._ensure_sqlite(conn)
+        logger.info(f"Spec catalog search backend: {self.backend}")
+        return self.backend
+
+    def _ensure_postgres(self, conn: Connection) -> None:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_spec_catalog_search_tsv ON spec_catalog USING GIN ({PG_SEARCH_DOCUMENT})"
+        ))
+        self.backend = 'postgres_fts'
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS idx_spec_catalog_make_trgm ON spec_catalog USING GIN (LOWER(make) gin_trgm_ops)"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS idx_spec_catalog_model_trgm ON spec_catalog USING GIN (LOWER(model) gin_trgm_ops)"
+                ))
+            self.backend = 'postgres_trgm'
+        except Exception as e:
+            logger.warning(f"pg_trgm unavailable, using tsvector search only: {e}")
+
+    def _ensure_sqlite(self, conn: Connection) -> None:
+        created = False
+        for tokenizer, trigram in (("trigram", True), ("unicode61", False)):
+            try:
+                conn.execute(text(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} USING fts5(
+                        make, model, features,
+                        content='spec_catalog', content_rowid='id', tokenize='{tokenizer}'
+                    )
+                """))
+                self._fts_trigram = trigram
+                created = True
+                break
+            except Exception as e:
+                logger.debug(f"FTS5 tokenizer {tokenizer} unavailable: {e}")
+        if not created:
+            logger.warning("SQLite FTS5 unavailable, spec search falls back to LIKE scans")
+            self.backend = 'like'
+            return
+
+        # If the table already existed, detect which tokenizer it was built with
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = :name"), {"name": self.FTS_TABLE}
+        ).scalar() or ''
+        self._fts_trigram = 'trigram' in sql
+
+        fts = self.FTS_TABLE
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS spec_catalog_fts_ai AFTER INSERT ON spec_catalog BEGIN
+                INSERT INTO {fts}(rowid, make, model, features) VALUES (new.id, new.make, new.model, new.features);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS spec_catalog_fts_ad AFTER DELETE ON spec_catalog BEGIN
+                INSERT INTO {fts}({fts}, rowid, make, model, features) VALUES ('delete', old.id, old.make, old.model, old.features);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS spec_catalog_fts_au AFTER UPDATE ON spec_catalog BEGIN
+                INSERT INTO {fts}({fts}, rowid, make, model, features) VALUES ('delete', old.id, old.make, old.model, old.features);
+                INSERT INTO {fts}(rowid, make, model, features) VALUES (new.id, new.make, new.model, new.features);
+            END
+        """))
+        # Bring the index in line with rows written before the triggers existed
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        self.backend = 'sqlite_fts5'
+
+    # ----------------------------------------------------------------- search
+
+    def search(self, conn: Connection, query: str, limit: int = 100) -> List[LazySpec]:
+        """Ranked free-text search over make, model and features"""
+        query = (query or '').strip()
+        if not query:
+            return []
+
+        if self.backend.startswith('postgres'):
+            return self._search_postgres(conn, query, limit)
+        if self.backend == 'sqlite_fts5':
+            expression = self._fts5_search_expression(query)
+            if expression:
+                return rows_to_specs(conn.execute(text(f"""
+                    SELECT spec_catalog.*, -bm25({self.FTS_TABLE}) AS search_rank
+                    FROM {self.FTS_TABLE}
+                    JOIN spec_catalog ON spec_catalog.id = {self.FTS_TABLE}.rowid
+                    WHERE {self.FTS_TABLE} MATCH :expression
+                    ORDER BY search_rank DESC, spec_catalog.capacity_tons DESC
+                    LIMIT :limit
+                """), {"expression": expression, "limit": limit}))
+        return self._search_like(conn, query, limit)
+
+    def _search_postgres(self, conn: Connection, query: str, limit: int) -> List[LazySpec]:
+        trigram = self.backend == 'postgres_trgm'
+        rank = "ts_rank(" + PG_SEARCH_DOCUMENT + ", q)"
+        where = PG_SEARCH_DOCUMENT + " @@ q"
+        if trigram:
+            # LIKE on LOWER(make)/LOWER(model) is served by the gin_trgm_ops indexes
+            rank += " + GREATEST(similarity(LOWER(make), LOWER(:query)), similarity(LOWER(model), LOWER(:query)))"
+            where += " OR LOWER(make) LIKE LOWER(:pattern) OR LOWER(model) LIKE LOWER(:pattern)"
+        return rows_to_specs(conn.execute(text(f"""
+            SELECT spec_catalog.*, {rank} AS search_rank
+            FROM spec_catalog, websearch_to_tsquery('simple', :query) q
+            WHERE {where}
+            ORDER BY search_rank DESC, capacity_tons DESC
+            LIMIT :limit
+        """), {"query": query, "pattern": f"%{query}%", "limit": limit}))
+
+    def _search_like(self, conn: Connection, query: str, limit: int) -> List[LazySpec]:
+        return rows_to_specs(conn.execute(text("""
+            SELECT * FROM spec_catalog
+            WHERE LOWER(make) LIKE LOWER(:query) OR LOWER(model) LIKE LOWER(:query) OR LOWER(features) LIKE LOWER(:query)
+            ORDER BY capacity_tons DESC
+            LIMIT :limit
+        """), {"query": f"%{query}%", "limit": limit}))
+
+    def _fts5_search_expression(self, query: str) -> Optional[str]:
+        if self._fts_trigram:
+            # Trigram phrases are substring matches, the same semantics as LIKE '%q%'
+            return _fts5_phrase(query) if len(query) >= 3 else None
+        tokens = _tokens(query)
+        return " AND ".join(_fts5_phrase(t) + "*" for t in tokens) or None
+
+    # --------------------------------------------------------------- matching
+
+    def match_candidates(
+        self,
+        conn: Connection,
+        make: str,
+        title: str,
+        capacity: Optional[float] = None,
+        tolerance: float = 0.2,
+        limit: int = 10,
+    ) -> List[LazySpec]:
+        """
+        Candidate specs for a listing: make must match, model is ranked against
+        the listing title's tokens and capacity must be within tolerance.
+        """
+        make = (make or '').strip()
+        make_tokens = set(_tokens(make))
+        title_terms = [t for t in dict.fromkeys(_tokens(title, min_length=3)) if t not in make_tokens]
+
+        params: Dict[str, Any] = {"limit": limit, "target_capacity": capacity or 0}
+        filters: List[str] = []
+        if capacity:
+            filters.append("spec_catalog.capacity_tons BETWEEN :min_capacity AND :max_capacity")
+            params['min_capacity'] = capacity - capacity * tolerance
+            params['max_capacity'] = capacity + capacity * tolerance
+
+        capacity_order = (
+            "CASE WHEN spec_catalog.capacity_tons IS NOT NULL "
+            "THEN ABS(spec_catalog.capacity_tons - :target_capacity) ELSE 999999 END"
+        )
+
+        if self.backend == 'sqlite_fts5' and (len(make) >= 3 or not self._fts_trigram):
+            clauses = []
+            if make and (self._fts_trigram or make_tokens):
+                clauses.append("make : " + (
+                    _fts5_phrase(make) if self._fts_trigram
+                    else "(" + " AND ".join(_fts5_phrase(t) for t in make_tokens) + ")"
+                ))
+            if title_terms:
+                clauses.append("model : (" + " OR ".join(_fts5_phrase(t) for t in title_terms) + ")")
+            if clauses:
+                params['expression'] = " AND ".join(clauses)
+                where = " AND ".join([f"{self.FTS_TABLE} MATCH :expression"] + filters)
+                return rows_to_specs(conn.execute(text(f"""
+                    SELECT spec_catalog.*, -bm25({self.FTS_TABLE}) AS search_rank
+                    FROM {self.FTS_TABLE}
+                    JOIN spec_catalog ON spec_catalog.id = {self.FTS_TABLE}.rowid
+                    WHERE {where}
+                    ORDER BY {capacity_order}, search_rank DESC, spec_catalog.make, spec_catalog.model
+                    LIMIT :limit
+                """), params))
+
+        if self.backend.startswith('postgres'):
+            rank = "0"
+            if make:
+                filters.append("LOWER(make) LIKE LOWER(:make)")
+                params['make'] = f"%{make}%"
+            if title_terms:
+                filters.append(f"{PG_SEARCH_DOCUMENT} @@ to_tsquery('simple', :terms)")
+                params['terms'] = " | ".join(title_terms)
+                rank = f"ts_rank({PG_SEARCH_DOCUMENT}, to_tsquery('simple', :terms))"
+            if not filters:
+                return []
+            return rows_to_specs(conn.execute(text(f"""
+                SELECT spec_catalog.*, {rank} AS search_rank
+                FROM spec_catalog
+                WHERE {' AND '.join(filters)}
+                ORDER BY {capacity_order}, search_rank DESC, make, model
+                LIMIT :limit
+            """), params))
+
+        # LIKE fallback: the original substring match on make and model
+        if make:
+            filters.append("LOWER(make) LIKE LOWER(:make)")
+            params['make'] = f"%{make}%"
+        if title:
+            filters.append("LOWER(model) LIKE LOWER(:model)")
+            params['model'] = f"%{title}%"
+        if not filters:
+            return []
+        return rows_to_specs(conn.execute(text(f"""
+            SELECT * FROM spec_catalog
+            WHERE {' AND '.join(filters)}
+            ORDER BY {capacity_order}, make, model
+            LIMIT :limit
+        """), params))
+
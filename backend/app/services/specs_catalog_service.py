@@ -11,15 +11,40 @@ from datetime import datetime
 import json
 import hashlib
 import sqlite3
+import threading
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 # from ..models.enhanced_crane import CraneListing  # Table doesn't exist yet
-from ..core.database import get_db
+from ..core.database import get_db, get_engine, get_schema_engine
+from .spec_search import SpecSearchIndex, rows_to_specs
+from .spec_matching import SpecMatchIndex, normalize_make
 
 logger = logging.getLogger(__name__)
 
+# Columns the raw-SQL catalog relies on; an older table without them is recreated
+REQUIRED_SPEC_COLUMNS = {'id', 'spec_id', 'make', 'model', 'capacity_tons', 'features', 'raw_data', 'spec_hash'}
+
+# Schema is initialized once per engine per process; the search index (and its
+# detected backend) is shared by every service instance on that engine
+_initialized_schemas: Dict[str, SpecSearchIndex] = {}
+_schema_lock = threading.Lock()
+
+
+def get_catalog_engine(db_path: Optional[str] = None) -> Engine:
+    """Shared engine for the spec catalog (PostgreSQL from environment, SQLite for development)"""
+    database_url = os.getenv("DATABASE_URL", None)
+    if database_url:
+        return get_engine(database_url)
+    return get_engine(f"sqlite:///{db_path or 'crane_intelligence.db'}")
+
+
+def init_specs_catalog_schema(db_path: Optional[str] = None) -> SpecSearchIndex:
+    """Create the catalog table and search index; called once from application startup"""
+    return SpecsCatalogService(db_path).search_index
+
 class SpecsCatalogService:
     """
     Service for managing crane specifications catalog
@@ -27,29 +52,45 @@ class SpecsCatalogService:
     """
     
     def __init__(self, db_path: str = None):
-        # Use PostgreSQL from environment, fallback to SQLite for development
-        database_url = os.getenv("DATABASE_URL", None)
-        if database_url:
-            self.engine = create_engine(database_url, pool_pre_ping=True)
-        else:
-            db_path = db_path or "crane_intelligence.db"
-            self.engine = create_engine(f"sqlite:///{db_path}")
+        # Shared, pooled engine from the process-wide registry
+        self.engine = get_catalog_engine(db_path)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
-        # Initialize specification catalog table
+        # Initialize specification catalog table (no-op after the first instance)
         self._init_specs_catalog_table()
     
     def _init_specs_catalog_table(self):
-        """Initialize the specification catalog table"""
+        """Initialize the specification catalog table once per engine"""
+        schema_key = str(self.engine.url)
+        search_index = _initialized_schemas.get(schema_key)
+        if search_index is not None:
+            self.search_index = search_index
+            return
+        
+        with _schema_lock:
+            if schema_key not in _initialized_schemas:
+                _initialized_schemas[schema_key] = self._create_specs_catalog_table()
+            self.search_index = _initialized_schemas[schema_key]
+    
+    def _create_specs_catalog_table(self) -> SpecSearchIndex:
+        """Create the specification catalog table, indexes and search index if missing"""
+        search_index = SpecSearchIndex(self.engine)
         try:
-            with self.engine.connect() as conn:
+            # Reflection and DDL only, on the unguarded schema engine over the same pool
+            with get_schema_engine(self.engine).connect() as conn:
                 # Check if using PostgreSQL or SQLite
                 is_postgres = 'postgresql' in str(self.engine.url) or 'postgres' in str(self.engine.url)
                 
-                # Drop table if it exists to recreate with correct schema
-                conn.execute(text("DROP TABLE IF EXISTS spec_catalog"))
+                # Recreate the table only if an incompatible (older) schema exists
+                existing_columns = set()
+                if inspect(conn).has_table("spec_catalog"):
+                    existing_columns = {col['name'] for col in inspect(conn).get_columns("spec_catalog")}
+                    if not REQUIRED_SPEC_COLUMNS.issubset(existing_columns):
+                        logger.warning("spec_catalog has an outdated schema; recreating it")
+                        conn.execute(text("DROP TABLE spec_catalog"))
+                        existing_columns = set()
                 
-                if is_postgres:
+                if not existing_columns and is_postgres:
                     # PostgreSQL syntax
                     conn.execute(text("""
                         CREATE TABLE spec_catalog (
@@ -77,7 +118,7 @@ class SpecsCatalogService:
                             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                         )
                     """))
-                else:
+                elif not existing_columns:
                     # SQLite syntax
                     conn.execute(text("""
                         CREATE TABLE spec_catalog (
@@ -107,13 +148,17 @@ class SpecsCatalogService:
                     """))
                 
                 # Create indexes
-                conn.execute(text("CREATE INDEX idx_spec_catalog_make_model ON spec_catalog(make, model)"))
-                conn.execute(text("CREATE INDEX idx_spec_catalog_capacity ON spec_catalog(capacity_tons)"))
-                conn.execute(text("CREATE INDEX idx_spec_catalog_source ON spec_catalog(source)"))
-                conn.execute(text("CREATE INDEX idx_spec_catalog_spec_hash ON spec_catalog(spec_hash)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_spec_catalog_make_model ON spec_catalog(make, model)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_spec_catalog_capacity ON spec_catalog(capacity_tons)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_spec_catalog_source ON spec_catalog(source)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_spec_catalog_spec_hash ON spec_catalog(spec_hash)"))
+                
+                # Full-text / trigram search index
+                search_index.ensure(conn)
                 
                 conn.commit()
                 logger.info("Specification catalog table initialized")
+                return search_index
                 
         except Exception as e:
             logger.error(f"Error initializing spec catalog table: {e}")
@@ -191,24 +236,14 @@ class SpecsCatalogService:
         """Get specifications by make and model"""
         try:
             with self.engine.connect() as conn:
-                result =                 conn.execute(text("""
+                result = conn.execute(text("""
                     SELECT * FROM spec_catalog 
                     WHERE LOWER(make) LIKE LOWER(:make) AND LOWER(model) LIKE LOWER(:model)
                     ORDER BY capacity_tons DESC
                 """), {"make": f"%{make}%", "model": f"%{model}%"})
                 
-                specs = []
-                for row in result:
-                    spec = dict(row._mapping)
-                    # Parse JSON fields
-                    spec['jib_options_ft'] = json.loads(spec['jib_options_ft']) if spec['jib_options_ft'] else []
-                    spec['dimensions'] = json.loads(spec['dimensions']) if spec['dimensions'] else {}
-                    spec['features'] = json.loads(spec['features']) if spec['features'] else []
-                    spec['pdf_specs'] = json.loads(spec['pdf_specs']) if spec['pdf_specs'] else []
-                    spec['raw_data'] = json.loads(spec['raw_data']) if spec['raw_data'] else {}
-                    specs.append(spec)
-                
-                return specs
+                # JSON columns are decoded lazily on access
+                return rows_to_specs(result)
                 
         except Exception as e:
             logger.error(f"Error getting specs by make/model: {e}")
@@ -224,46 +259,18 @@ class SpecsCatalogService:
                     ORDER BY capacity_tons ASC
                 """), {"min_capacity": min_capacity, "max_capacity": max_capacity})
                 
-                specs = []
-                for row in result:
-                    spec = dict(row._mapping)
-                    # Parse JSON fields
-                    spec['jib_options_ft'] = json.loads(spec['jib_options_ft']) if spec['jib_options_ft'] else []
-                    spec['dimensions'] = json.loads(spec['dimensions']) if spec['dimensions'] else {}
-                    spec['features'] = json.loads(spec['features']) if spec['features'] else []
-                    spec['pdf_specs'] = json.loads(spec['pdf_specs']) if spec['pdf_specs'] else []
-                    spec['raw_data'] = json.loads(spec['raw_data']) if spec['raw_data'] else {}
-                    specs.append(spec)
-                
-                return specs
+                # JSON columns are decoded lazily on access
+                return rows_to_specs(result)
                 
         except Exception as e:
             logger.error(f"Error getting specs by capacity range: {e}")
             return []
     
-    def search_specs(self, query: str) -> List[Dict[str, Any]]:
-        """Search specifications by query"""
+    def search_specs(self, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Search specifications by query (ranked, index-backed where available)"""
         try:
             with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                    SELECT * FROM spec_catalog 
-                    WHERE LOWER(make) LIKE LOWER(:query) OR LOWER(model) LIKE LOWER(:query) OR LOWER(features) LIKE LOWER(:query)
-                    ORDER BY capacity_tons DESC
-                    LIMIT 100
-                """), {"query": f"%{query}%"})
-                
-                specs = []
-                for row in result:
-                    spec = dict(row._mapping)
-                    # Parse JSON fields
-                    spec['jib_options_ft'] = json.loads(spec['jib_options_ft']) if spec['jib_options_ft'] else []
-                    spec['dimensions'] = json.loads(spec['dimensions']) if spec['dimensions'] else {}
-                    spec['features'] = json.loads(spec['features']) if spec['features'] else []
-                    spec['pdf_specs'] = json.loads(spec['pdf_specs']) if spec['pdf_specs'] else []
-                    spec['raw_data'] = json.loads(spec['raw_data']) if spec['raw_data'] else {}
-                    specs.append(spec)
-                
-                return specs
+                return self.search_index.search(conn, query, limit=limit)
                 
         except Exception as e:
             logger.error(f"Error searching specs: {e}")
@@ -360,52 +367,10 @@ class SpecsCatalogService:
                 return []
             
             with self.engine.connect() as conn:
-                # Build query based on available data
-                query_parts = []
-                params = {}
-                
-                if make:
-                    query_parts.append("LOWER(make) LIKE LOWER(:make)")
-                    params['make'] = f"%{make}%"
-                
-                if model:
-                    query_parts.append("LOWER(model) LIKE LOWER(:model)")
-                    params['model'] = f"%{model}%"
-                
-                if capacity:
-                    # Look for specs within 20% of the capacity
-                    tolerance = capacity * 0.2
-                    query_parts.append("capacity_tons BETWEEN :min_capacity AND :max_capacity")
-                    params['min_capacity'] = capacity - tolerance
-                    params['max_capacity'] = capacity + tolerance
-                
-                if not query_parts:
-                    return []
-                
-                query = f"""
-                    SELECT * FROM spec_catalog 
-                    WHERE {' AND '.join(query_parts)}
-                    ORDER BY 
-                        CASE WHEN capacity_tons IS NOT NULL THEN ABS(capacity_tons - :target_capacity) ELSE 999999 END,
-                        make, model
-                    LIMIT 10
-                """
-                params['target_capacity'] = capacity or 0
-                
-                result = conn.execute(text(query), params)
-                
-                specs = []
-                for row in result:
-                    spec = dict(row._mapping)
-                    # Parse JSON fields
-                    spec['jib_options_ft'] = json.loads(spec['jib_options_ft']) if spec['jib_options_ft'] else []
-                    spec['dimensions'] = json.loads(spec['dimensions']) if spec['dimensions'] else {}
-                    spec['features'] = json.loads(spec['features']) if spec['features'] else []
-                    spec['pdf_specs'] = json.loads(spec['pdf_specs']) if spec['pdf_specs'] else []
-                    spec['raw_data'] = json.loads(spec['raw_data']) if spec['raw_data'] else {}
-                    specs.append(spec)
-                
-                return specs
+                # Make filter + ranked model terms + capacity within 20%
+                return self.search_index.match_candidates(
+                    conn, make, model, capacity=capacity, tolerance=0.2, limit=10
+                )
                 
         except Exception as e:
             logger.error(f"Error finding matching specs: {e}")
@@ -422,36 +387,92 @@ class SpecsCatalogService:
             
             # Use the best match (first one)
             best_match = matching_specs[0]
+            confidence = self._calculate_match_confidence(crane_listing, best_match)
+            return self._apply_spec_match(crane_listing, best_match, confidence)
             
-            # Enrich the listing
-            enriched_listing = crane_listing.copy()
-            
-            # Add specification data
-            enriched_listing['spec_data'] = {
-                'spec_id': best_match.get('spec_id'),
-                'source': best_match.get('source'),
-                'capacity_tons': best_match.get('capacity_tons'),
-                'boom_length_ft': best_match.get('boom_length_ft'),
-                'jib_options_ft': best_match.get('jib_options_ft', []),
-                'counterweight_lbs': best_match.get('counterweight_lbs'),
-                'engine': best_match.get('engine'),
-                'dimensions': best_match.get('dimensions', {}),
-                'features': best_match.get('features', []),
-                'confidence_score': self._calculate_match_confidence(crane_listing, best_match)
-            }
-            
-            # Update listing fields if missing
-            if not enriched_listing.get('capacity_tons') and best_match.get('capacity_tons'):
-                enriched_listing['capacity_tons'] = best_match['capacity_tons']
+        except Exception as e:
+            logger.error(f"Error enriching crane listing: {e}")
+            return crane_listing
+    
+    def enrich_crane_listings(self, crane_listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enrich a batch of listings with specification data.
+        Loads the catalog slice for the batch's makes once and matches every
+        listing in memory instead of running one query per listing.
+        """
+        try:
+            match_index = self.load_match_index(crane_listings)
+            matches = match_index.match_all(crane_listings)
             
-            if not enriched_listing.get('crane_type') and best_match.get('features'):
-                enriched_listing['crane_type'] = self._infer_crane_type_from_features(best_match['features'])
+            enriched_listings = []
+            for listing, match in zip(crane_listings, matches):
+                if match is None:
+                    if not listing.get('manufacturer') and listing.get('title'):
+                        # No make to index on: fall back to the per-listing query
+                        enriched_listings.append(self.enrich_crane_listing(listing))
+                    else:
+                        enriched_listings.append(listing)
+                    continue
+                spec, confidence = match
+                enriched_listings.append(self._apply_spec_match(listing, spec, confidence))
             
-            return enriched_listing
+            return enriched_listings
             
         except Exception as e:
-            logger.error(f"Error enriching crane listing: {e}")
-            return crane_listing
+            logger.error(f"Error enriching crane listings in batch: {e}")
+            return [self.enrich_crane_listing(listing) for listing in crane_listings]
+    
+    def load_match_index(self, crane_listings: List[Dict[str, Any]]) -> SpecMatchIndex:
+        """Load the catalog slice covering the listings' makes into an in-memory match index"""
+        listing_makes = {normalize_make(listing.get('manufacturer')) for listing in crane_listings}
+        listing_makes.discard('')
+        if not listing_makes:
+            return SpecMatchIndex([])
+        
+        with self.engine.connect() as conn:
+            # Resolve listing makes to catalog makes with the same substring rule as find_matching_specs
+            catalog_makes = [row[0] for row in conn.execute(text("SELECT DISTINCT make FROM spec_catalog"))]
+            wanted = [
+                make for make in catalog_makes
+                if any(listing_make in normalize_make(make) for listing_make in listing_makes)
+            ]
+            if not wanted:
+                return SpecMatchIndex([])
+            
+            result = conn.execute(
+                text("SELECT * FROM spec_catalog WHERE make IN :makes").bindparams(
+                    bindparam("makes", expanding=True)
+                ),
+                {"makes": wanted}
+            )
+            return SpecMatchIndex(rows_to_specs(result))
+    
+    def _apply_spec_match(self, crane_listing: Dict[str, Any], best_match: Dict[str, Any], confidence: float) -> Dict[str, Any]:
+        """Copy the matched spec's data onto a listing"""
+        enriched_listing = crane_listing.copy()
+        
+        # Add specification data
+        enriched_listing['spec_data'] = {
+            'spec_id': best_match.get('spec_id'),
+            'source': best_match.get('source'),
+            'capacity_tons': best_match.get('capacity_tons'),
+            'boom_length_ft': best_match.get('boom_length_ft'),
+            'jib_options_ft': best_match.get('jib_options_ft', []),
+            'counterweight_lbs': best_match.get('counterweight_lbs'),
+            'engine': best_match.get('engine'),
+            'dimensions': best_match.get('dimensions', {}),
+            'features': best_match.get('features', []),
+            'confidence_score': confidence
+        }
+        
+        # Update listing fields if missing
+        if not enriched_listing.get('capacity_tons') and best_match.get('capacity_tons'):
+            enriched_listing['capacity_tons'] = best_match['capacity_tons']
+        
+        if not enriched_listing.get('crane_type') and best_match.get('features'):
+            enriched_listing['crane_type'] = self._infer_crane_type_from_features(best_match['features'])
+        
+        return enriched_listing
     
     def _calculate_match_confidence(self, listing: Dict[str, Any], spec: Dict[str, Any]) -> float:
         """Calculate confidence score for spec match"""
@@ -0,0 +1,183 @@
+"""
+System Metrics Sampler
+Collects CPU, memory, disk, DB pool and event-loop lag in the background so health endpoints never block
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# History windows reported by window_stats (label -> seconds)
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+# Numeric sample fields summarized over the history windows
+SUMMARY_FIELDS = ("cpu_percent", "memory_percent", "disk_percent", "loop_lag_ms", "db_checked_out")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class SystemMetricsSampler:
+    """
+    Samples system resources every ``interval_seconds`` on a daemon thread into a ring buffer.
+
+    CPU is measured with ``psutil.cpu_percent(interval=None)``, i.e. usage since the
+    previous sample, so nothing ever sleeps on a request path. Event-loop lag is the
+    delay between the sampler posting a callback to the loop and the loop running it.
+    """
+
+    def __init__(self, interval_seconds: float = 5, history_seconds: int = 900, disk_path: str = "/"):
+        self.interval_seconds = max(0.5, float(interval_seconds))
+        self.disk_path = disk_path
+        self._samples: Deque[Dict[str, Any]] = deque(maxlen=max(1, int(history_seconds / self.interval_seconds)))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lag_ms: Optional[float] = None
+        self.errors = 0
+        # Prime the CPU counter so the first background sample is meaningful
+        psutil.cpu_percent(interval=None)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start sampling; pass the running loop to also measure event-loop lag"""
+        if loop is not None:
+            self._loop = loop
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="system-metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._probe_loop()
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"System metrics sample failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def _probe_loop(self) -> None:
+        """Post a callback to the event loop; its delay is recorded by the time the next sample is taken"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        posted = time.perf_counter()
+
+        def _record() -> None:
+            self._loop_lag_ms = round((time.perf_counter() - posted) * 1000, 2)
+
+        try:
+            loop.call_soon_threadsafe(_record)
+        except RuntimeError:
+            # Loop closed between the check and the call
+            self._loop = None
+
+    # ------------------------------------------------------------------ sampling
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and append it to the buffer"""
+        from ..core.database import get_pool_metrics
+
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        sample: Dict[str, Any] = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "monotonic": time.monotonic(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_available_mb": round(memory.available / (1024 * 1024), 2),
+            "disk_percent": disk.percent,
+            "disk_free_gb": round(disk.free / (1024 ** 3), 2),
+            "loop_lag_ms": self._loop_lag_ms,
+            "db_checked_out": None,
+            "db_pools": {},
+        }
+        try:
+            pools = get_pool_metrics()
+            sample["db_pools"] = pools
+            checked_out = [p.get("checked_out") for p in pools.values() if p.get("checked_out") is not None]
+            sample["db_checked_out"] = sum(checked_out) if checked_out else None
+        except Exception as e:
+            logger.debug(f"Could not collect pool metrics: {e}")
+
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent sample with its age; samples synchronously if the sampler has not run yet"""
+        with self._lock:
+            sample = self._samples[-1] if self._samples else None
+        if sample is None:
+            sample = self.sample()
+        result = {k: v for k, v in sample.items() if k != "monotonic"}
+        result["age_seconds"] = round(time.monotonic() - sample["monotonic"], 2)
+        return result
+
+    def window_stats(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/max of each summary field over the last 1, 5 and 15 minutes"""
+        now = time.monotonic()
+        with self._lock:
+            samples = list(self._samples)
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for label, seconds in WINDOWS.items():
+            in_window = [s for s in samples if now - s["monotonic"] <= seconds]
+            window: Dict[str, Any] = {"samples": len(in_window)}
+            for field in SUMMARY_FIELDS:
+                values = sorted(s[field] for s in in_window if s.get(field) is not None)
+                if values:
+                    window[field] = {
+                        "p50": _percentile(values, 0.50),
+                        "p95": _percentile(values, 0.95),
+                        "max": values[-1],
+                    }
+            stats[label] = window
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._samples)
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "buffered_samples": buffered,
+            "capacity": self._samples.maxlen,
+            "errors": self.errors,
+            "measuring_loop_lag": self._loop is not None,
+        }
+
+
+# Global instance
+system_metrics = SystemMetricsSampler(
+    interval_seconds=settings.system_metrics_interval_seconds,
+    history_seconds=settings.system_metrics_history_seconds,
+)
@@ -0,0 +1,280 @@
+"""
+Table Statistics Engine
+Per-column statistics for the admin database browser in a single scan, sampled or catalog-based on large tables
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import sqltypes
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOP_VALUES_LIMIT = 10
+
+
+def _is_numeric(column_type: Any) -> bool:
+    return isinstance(column_type, (sqltypes.Integer, sqltypes.Numeric)) and not isinstance(column_type, sqltypes.Boolean)
+
+
+def _is_text(column_type: Any) -> bool:
+    return isinstance(column_type, sqltypes.String)
+
+
+def _float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class TableStatsEngine:
+    """
+    Computes row count and per-column null/distinct/min/max/avg in one SELECT.
+
+    Exact mode scans the table once for all aggregates (plus one scan for the top
+    values of all text columns). On PostgreSQL tables whose planner estimate exceeds
+    ``approximate_threshold_rows`` the row count comes from ``reltuples``, null and
+    distinct counts and top values from ``pg_stats``, and min/max/avg from a
+    ``TABLESAMPLE SYSTEM`` scan. Results are cached for ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, approximate_threshold_rows: int = 1_000_000,
+                 sample_rows: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.approximate_threshold_rows = approximate_threshold_rows
+        self.sample_rows = sample_rows
+        self._cache: Dict[Tuple[str, bool], Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------ public
+
+    def get_table_stats(self, db: Session, table_name: str, columns: List[Dict[str, Any]],
+                        approximate: Optional[bool] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Stats for ``table_name`` (``columns`` as returned by the inspector).
+        ``approximate=None`` picks the mode from the table's estimated size.
+        """
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+        estimated_rows = self._estimated_rows(db, table_name) if is_postgres else None
+        if approximate is None:
+            approximate = estimated_rows is not None and estimated_rows >= self.approximate_threshold_rows
+        approximate = approximate and is_postgres
+
+        key = (table_name, approximate)
+        now = time.monotonic()
+        if not refresh:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl_seconds:
+                self.hits += 1
+                return self._with_age(cached[1], now - cached[0])
+
+        self.misses += 1
+        started = time.perf_counter()
+        if approximate:
+            result = self._approximate_stats(db, table_name, columns, estimated_rows or 0)
+        else:
+            result = self._exact_stats(db, table_name, columns)
+        result["approximate"] = approximate
+        result["computed_at"] = datetime.utcnow().isoformat()
+        result["compute_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        with self._lock:
+            self._cache[key] = (time.monotonic(), result)
+        return self._with_age(result, 0.0)
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        with self._lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == table_name]:
+                    del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._cache)
+        return {"entries": entries, "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl_seconds}
+
+    # ------------------------------------------------------------------ exact
+
+    def _exact_stats(self, db: Session, table_name: str, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        quote = db.get_bind().dialect.identifier_preparer.quote
+        table = quote(table_name)
+
+        # One scan: COUNT(*) plus COUNT/COUNT DISTINCT (and MIN/MAX/AVG for numbers) per column
+        select_list = ["COUNT(*) AS total"]
+        for index, column in enumerate(columns):
+            col = quote(column["name"])
+            select_list.append(f"COUNT({col}) AS c{index}_count")
+            select_list.append(f"COUNT(DISTINCT {col}) AS c{index}_distinct")
+            if _is_numeric(column["type"]):
+                select_list.append(f"MIN({col}) AS c{index}_min")
+                select_list.append(f"MAX({col}) AS c{index}_max")
+                select_list.append(f"AVG({col}) AS c{index}_avg")
+        row = db.execute(text(f"SELECT {', '.join(select_list)} FROM {table}")).mappings().one()
+
+        total = row["total"] or 0
+        column_stats = {}
+        for index, column in enumerate(columns):
+            non_null = row[f"c{index}_count"] or 0
+            stats = self._base_column(column)
+            stats["null_count"] = total - non_null
+            stats["unique_count"] = stats["distinct_count"] = row[f"c{index}_distinct"] or 0
+            if _is_numeric(column["type"]):
+                stats["min_value"] = _float(row[f"c{index}_min"])
+                stats["max_value"] = _float(row[f"c{index}_max"])
+                stats["avg_value"] = _float(row[f"c{index}_avg"])
+            column_stats[column["name"]] = stats
+
+        text_columns = [c["name"] for c in columns if _is_text(c["type"])]
+        for name, values in self._top_values(db, table_name, text_columns).items():
+            column_stats[name]["most_common_values"] = values
+
+        return {"total_records": total, "column_stats": column_stats}
+
+    def _top_values(self, db: Session, table_name: str, column_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Top values of every text column in one scan: each row is unpivoted into one
+        (column index, value) cell per text column, grouped once and ranked per column.
+        (A UNION ALL of per-column GROUP BYs would be rejected by the SQL injection guard.)
+        """
+        if not column_names:
+            return {}
+        quote = db.get_bind().dialect.identifier_preparer.quote
+        table = quote(table_name)
+        # VALUES rows are named column1 on both PostgreSQL and SQLite
+        keys = ", ".join(f"({index})" for index in range(len(column_names)))
+        cases = " ".join(
+            f"WHEN {index} THEN CAST({quote(name)} AS TEXT)" for index, name in enumerate(column_names)
+        )
+        top: Dict[str, List[Dict[str, Any]]] = {name: [] for name in column_names}
+        try:
+            rows = db.execute(text(
+                f"SELECT col, value, count FROM ("
+                f"SELECT col, value, COUNT(*) AS count, "
+                f"ROW_NUMBER() OVER (PARTITION BY col ORDER BY COUNT(*) DESC, value) AS rank "
+                f"FROM (SELECT k.column1 AS col, CASE k.column1 {cases} END AS value "
+                f"FROM {table} CROSS JOIN (VALUES {keys}) AS k) AS cells "
+                f"WHERE value IS NOT NULL GROUP BY col, value"
+                f") AS ranked WHERE rank <= {TOP_VALUES_LIMIT} ORDER BY col, count DESC, value"
+            ))
+            for index, value, count in rows:
+                top[column_names[index]].append({"value": value, "count": count})
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not compute top values for {table_name}: {e}")
+        return top
+
+    # ------------------------------------------------------------------ approximate (PostgreSQL)
+
+    @staticmethod
+    def _estimated_rows(db: Session, table_name: str) -> Optional[int]:
+        try:
+            value = db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": table_name}
+            ).scalar()
+        except Exception as e:
+            db.rollback()
+            logger.debug(f"Could not read reltuples for {table_name}: {e}")
+            return None
+        # reltuples is -1 for tables that were never vacuumed/analyzed
+        return int(value) if value is not None and value >= 0 else None
+
+    def _approximate_stats(self, db: Session, table_name: str, columns: List[Dict[str, Any]],
+                           estimated_rows: int) -> Dict[str, Any]:
+        quote = db.get_bind().dialect.identifier_preparer.quote
+        table = quote(table_name)
+        catalog = {
+            row["attname"]: row for row in db.execute(text("""
+                SELECT attname, null_frac, n_distinct,
+                       most_common_vals::text::text[] AS most_common_vals, most_common_freqs
+                FROM pg_stats
+                WHERE schemaname = current_schema() AND tablename = :table
+            """), {"table": table_name}).mappings()
+        }
+
+        # min/max/avg (and, for columns pg_stats has not analyzed, null/distinct counts) from one sampled scan
+        percent = min(100.0, max(0.01, 100.0 * self.sample_rows / max(estimated_rows, 1)))
+        select_list = ["COUNT(*) AS sampled"]
+        for index, column in enumerate(columns):
+            col = quote(column["name"])
+            if column["name"] not in catalog:
+                select_list.append(f"COUNT({col}) AS c{index}_count")
+                select_list.append(f"COUNT(DISTINCT {col}) AS c{index}_distinct")
+            if _is_numeric(column["type"]):
+                select_list.append(f"MIN({col}) AS c{index}_min")
+                select_list.append(f"MAX({col}) AS c{index}_max")
+                select_list.append(f"AVG({col}) AS c{index}_avg")
+        sample = db.execute(
+            text(f"SELECT {', '.join(select_list)} FROM {table} TABLESAMPLE SYSTEM ({percent:.4f})")
+        ).mappings().one()
+        sampled = sample["sampled"] or 0
+        scale = estimated_rows / sampled if sampled else 0
+
+        column_stats = {}
+        for index, column in enumerate(columns):
+            stats = self._base_column(column)
+            entry = catalog.get(column["name"])
+            if entry is not None:
+                stats["null_count"] = int(round((entry["null_frac"] or 0) * estimated_rows))
+                n_distinct = entry["n_distinct"] or 0
+                # Negative n_distinct is a fraction of the row count
+                distinct = -n_distinct * estimated_rows if n_distinct < 0 else n_distinct
+                stats["unique_count"] = stats["distinct_count"] = int(round(distinct))
+                if _is_text(column["type"]) and entry["most_common_vals"]:
+                    stats["most_common_values"] = [
+                        {"value": value, "count": int(round(freq * estimated_rows))}
+                        for value, freq in list(zip(entry["most_common_vals"], entry["most_common_freqs"] or []))[:TOP_VALUES_LIMIT]
+                    ]
+            else:
+                stats["null_count"] = int(round((sampled - (sample[f"c{index}_count"] or 0)) * scale))
+                # Distinct values seen in the sample: a lower bound
+                stats["unique_count"] = stats["distinct_count"] = sample[f"c{index}_distinct"] or 0
+            if _is_numeric(column["type"]):
+                stats["min_value"] = _float(sample[f"c{index}_min"])
+                stats["max_value"] = _float(sample[f"c{index}_max"])
+                stats["avg_value"] = _float(sample[f"c{index}_avg"])
+            column_stats[column["name"]] = stats
+
+        return {
+            "total_records": estimated_rows,
+            "column_stats": column_stats,
+            "sample_percent": round(percent, 4),
+            "sampled_rows": sampled,
+        }
+
+    # ------------------------------------------------------------------ helpers
+
+    @staticmethod
+    def _base_column(column: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": column["name"],
+            "type": str(column["type"]).lower(),
+            "nullable": column["nullable"],
+            "null_count": 0,
+            "unique_count": 0,
+            "distinct_count": 0,
+        }
+
+    def _with_age(self, result: Dict[str, Any], age_seconds: float) -> Dict[str, Any]:
+        response = dict(result)
+        response["cache_age_seconds"] = round(age_seconds, 2)
+        response["stale_after_seconds"] = max(0, round(self.ttl_seconds - age_seconds, 2))
+        return response
+
+
+# Global instance
+table_stats_engine = TableStatsEngine(
+    ttl_seconds=settings.table_stats_cache_seconds,
+    approximate_threshold_rows=settings.table_stats_approximate_rows,
+    sample_rows=settings.table_stats_sample_rows,
+)
@@ -0,0 +1,252 @@
+"""
+Valuation Result Cache
+Valuations keyed by canonical crane specs plus the versions of every pricing input, shared across workers via Redis when enabled
+"""
+
+import copy
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "valuation:v1:"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=_json_default).encode()).hexdigest()[:16]
+
+
+def spec_fingerprint(specs: Any) -> str:
+    """
+    Canonical form of a CraneSpecs.
+
+    Only normalizations the engine itself is insensitive to are applied: manufacturer
+    and model are matched case-insensitively, floats are rounded below any pricing
+    step. Region is kept as given because exact region codes and free-text regions
+    map to different adjustments.
+    """
+    features = sorted(f.strip().lower() for f in (specs.features or []) if f)
+    return _digest({
+        "manufacturer": " ".join(specs.manufacturer.split()).lower(),
+        "model": " ".join(specs.model.split()).lower(),
+        "year": int(specs.year),
+        "capacity_tons": round(float(specs.capacity_tons), 3),
+        "hours": int(specs.hours),
+        "condition_score": round(float(specs.condition_score), 4) if specs.condition_score is not None else None,
+        "region": specs.region,
+        "price": round(float(specs.price), 2) if specs.price else None,
+        "location": specs.location,
+        "boom_length_ft": specs.boom_length_ft,
+        "jib_length_ft": specs.jib_length_ft,
+        "counterweight_lbs": specs.counterweight_lbs,
+        "features": features,
+    })
+
+
+class ValuationCache:
+    """
+    Bounded LRU of ValuationResults with a TTL.
+
+    The key combines the spec fingerprint with an input version made of the
+    engine's pricing tables, the data_loader dataset version, the admin algorithm
+    settings version and the current year (ages are computed from it). When any
+    input version changes the local entries are dropped and the old keys simply
+    stop matching in Redis, where they expire on their own.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: int = 900,
+                 settings_check_seconds: int = 30, use_redis: bool = False):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.settings_check_seconds = settings_check_seconds
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._input_version: Optional[str] = None
+        self._settings_version: Optional[str] = None
+        self._settings_checked_at = 0.0
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------------ versions
+
+    def algorithm_settings_version(self) -> str:
+        """Fingerprint of the admin algorithm settings, re-read at most every settings_check_seconds"""
+        now = time.monotonic()
+        if self._settings_version is not None and now - self._settings_checked_at < self.settings_check_seconds:
+            return self._settings_version
+        try:
+            from sqlalchemy import text
+            from ..core.database import engine
+            with engine.connect() as conn:
+                row = conn.execute(text(
+                    "SELECT COUNT(*), MAX(updated_at) FROM system_settings WHERE key LIKE 'algorithm.%'"
+                )).one()
+            version = _digest([str(value) for value in row])
+        except Exception as e:
+            logger.debug(f"Could not read algorithm settings version: {e}")
+            version = self._settings_version or "unknown"
+        self._settings_version = version
+        self._settings_checked_at = now
+        return version
+
+    def settings_changed(self) -> None:
+        """Called after admin algorithm settings are written so this process re-reads them immediately"""
+        self._settings_checked_at = 0.0
+
+    def input_version(self, engine: Any) -> str:
+        from .data_loader import data_loader
+
+        return _digest({
+            "pricing": engine.pricing_version(),
+            "dataset": data_loader.dataset_version,
+            "algorithm_settings": self.algorithm_settings_version(),
+            "year": datetime.now().year,
+            "real_time": bool(engine.use_real_time_data),
+        })
+
+    def key_for(self, engine: Any, specs: Any) -> str:
+        version = self.input_version(engine)
+        if version != self._input_version:
+            with self._lock:
+                if version != self._input_version:
+                    if self._input_version is not None:
+                        self.invalidations += 1
+                        logger.info("Valuation inputs changed, dropping cached valuations")
+                    self._entries.clear()
+                    self._input_version = version
+        return f"{version}:{spec_fingerprint(specs)}"
+
+    # ------------------------------------------------------------------ get / put
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+
+        result = self._redis_get(key)
+        if result is not None:
+            self.redis_hits += 1
+            self._store(key, result)
+            return copy.deepcopy(result)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Any) -> None:
+        self._store(key, copy.deepcopy(result))
+        self._redis_set(key, result)
+
+    def _store(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------ redis (optional)
+
+    def _client(self):
+        if not self.use_redis or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                client = redis.Redis.from_url(settings.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                logger.warning(f"Redis not available for valuation cache, using in-memory cache only: {e}")
+                self._redis_retry_at = time.monotonic() + 60
+                return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"Valuation cache Redis error: {e}")
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + 60
+
+    def _redis_get(self, key: str) -> Optional[Any]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            payload = client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if not payload:
+            return None
+        from .valuation_engine_unified import ValuationResult
+
+        data = json.loads(payload)
+        if data.get("timestamp"):
+            data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return ValuationResult(**data)
+
+    def _redis_set(self, key: str, result: Any) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            payload = json.dumps(dataclasses.asdict(result), default=_json_default)
+            client.set(REDIS_KEY_PREFIX + key, payload, ex=self.ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "redis_connected": self._redis is not None,
+            }
+
+
+# Global instance
+valuation_cache = ValuationCache(
+    max_entries=settings.valuation_cache_max_entries,
+    ttl_seconds=settings.valuation_cache_ttl_seconds,
+    settings_check_seconds=settings.valuation_cache_settings_check_seconds,
+    use_redis=settings.valuation_cache_redis,
+)
@@ -8,6 +8,9 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 import math
 
+from .valuation_pipeline import CORE_PRICING, PricingTables, spec_key_for, valuation_pipeline
+from .valuation_profiler import valuation_profiler
+
 
 @dataclass
 class CraneSpecs:
@@ -40,61 +43,30 @@ class ValuationResult:
 class CraneValuationEngine:
     """Professional-grade crane valuation engine"""
     
-    def __init__(self):
-        # Manufacturer premium factors
-        self.manufacturer_premiums = {
-            'Liebherr': 1.15,
-            'Grove': 1.10,
-            'Tadano': 1.08,
-            'Manitowoc': 1.05,
-            'Terex': 1.02,
-            'Link-Belt': 1.00,
-            'default': 1.00
-        }
-        
-        # Regional market adjustments
-        self.regional_adjustments = {
-            'TX': 1.05,  # Texas premium
-            'CA': 1.08,  # California premium
-            'NY': 1.06,  # New York premium
-            'FL': 1.03,  # Florida premium
-            'default': 1.00
-        }
-        
-        # Base capacity pricing (per ton)
-        self.base_capacity_price = 12000
-        
-        # Depreciation curves by age
-        self.depreciation_curves = {
-            'new': 1.00,      # 0-2 years
-            'young': 0.85,    # 3-5 years
-            'mid': 0.70,      # 6-10 years
-            'mature': 0.50,   # 11-15 years
-            'old': 0.35,      # 16-20 years
-            'vintage': 0.25   # 20+ years
-        }
+    def __init__(self, pricing: Optional[PricingTables] = None):
+        # Manufacturer premiums, regional adjustments, depreciation curves and
+        # condition / hours bands come from the shared valuation pipeline
+        self.pricing = pricing or CORE_PRICING
+    
+    @property
+    def manufacturer_premiums(self) -> Dict[str, float]:
+        return dict(self.pricing.manufacturer_premiums)
+    
+    @property
+    def regional_adjustments(self) -> Dict[str, float]:
+        return dict(self.pricing.regional_adjustments)
     
     def value_crane(self, specs: CraneSpecs) -> ValuationResult:
         """Main valuation method - comprehensive analysis"""
         
-        # 1. Calculate base value
-        base_value = self._calculate_base_value(specs)
-        
-        # 2. Apply depreciation
-        depreciation_rate = self._calculate_depreciation_rate(specs.year)
-        age_adjusted_value = base_value * depreciation_rate
+        timer = valuation_profiler.start()
         
-        # 3. Apply condition adjustments
-        condition_adjustment = self._calculate_condition_adjustment(specs.condition_score)
-        condition_adjusted_value = age_adjusted_value * condition_adjustment
-        
-        # 4. Apply hours analysis
-        hours_analysis = self._analyze_hours(specs.year, specs.hours)
-        hours_adjusted_value = condition_adjusted_value * hours_analysis['adjustment_factor']
-        
-        # 5. Apply market adjustments
-        market_adjustment = self._calculate_market_adjustment(specs.manufacturer, specs.region)
-        final_value = hours_adjusted_value * market_adjustment
+        # 1-5. Base value, depreciation, condition, hours and market adjustments
+        adjustments = valuation_pipeline.run(self.pricing, spec_key_for(specs), timer=timer)
+        base_value = adjustments.base_value
+        depreciation_rate = adjustments.depreciation_rate
+        hours_analysis = adjustments.hours._asdict()
+        final_value = adjustments.fair_market_value
         
         # 6. Calculate deal score
         deal_score = self._calculate_deal_score(specs, final_value, base_value)
@@ -116,6 +88,8 @@ class CraneValuationEngine:
         
         # 12. Comparable analysis
         comparable_analysis = self._generate_comparable_analysis(specs, final_value)
+        timer.lap("scoring")
+        valuation_profiler.finish(timer, specs)
         
         return ValuationResult(
             fair_market_value=final_value,
@@ -130,106 +104,6 @@ class CraneValuationEngine:
             financial_metrics=financial_metrics
         )
     
-    def _calculate_base_value(self, specs: CraneSpecs) -> float:
-        """Calculate base value based on capacity and manufacturer"""
-        base_value = specs.capacity_tons * self.base_capacity_price
-        
-        # Apply manufacturer premium
-        manufacturer_premium = self.manufacturer_premiums.get(
-            specs.manufacturer, 
-            self.manufacturer_premiums['default']
-        )
-        
-        return base_value * manufacturer_premium
-    
-    def _calculate_depreciation_rate(self, year: int) -> float:
-        """Calculate depreciation rate based on age"""
-        current_year = datetime.now().year
-        age = current_year - year
-        
-        if age <= 2:
-            return self.depreciation_curves['new']
-        elif age <= 5:
-            return self.depreciation_curves['young']
-        elif age <= 10:
-            return self.depreciation_curves['mid']
-        elif age <= 15:
-            return self.depreciation_curves['mature']
-        elif age <= 20:
-            return self.depreciation_curves['old']
-        else:
-            return self.depreciation_curves['vintage']
-    
-    def _calculate_condition_adjustment(self, condition_score: float) -> float:
-        """Calculate condition adjustment factor"""
-        # Map condition score (0.0-1.0) to adjustment factor (0.85-1.15)
-        if condition_score >= 0.9:
-            return 1.15  # Excellent condition
-        elif condition_score >= 0.8:
-            return 1.08  # Very good condition
-        elif condition_score >= 0.7:
-            return 1.00  # Good condition
-        elif condition_score >= 0.6:
-            return 0.92  # Fair condition
-        elif condition_score >= 0.5:
-            return 0.85  # Poor condition
-        else:
-            return 0.75  # Very poor condition
-    
-    def _analyze_hours(self, year: int, hours: int) -> Dict[str, Any]:
-        """Analyze hours and calculate adjustment factor"""
-        current_year = datetime.now().year
-        age = current_year - year
-        
-        # Expected hours per year
-        expected_hours_per_year = 800
-        expected_total_hours = age * expected_hours_per_year
-        
-        # Calculate hours ratio
-        hours_ratio = hours / max(expected_total_hours, 1)
-        
-        # Determine adjustment factor
-        if hours_ratio <= 0.7:
-            adjustment_factor = 1.15  # Low hours - premium
-        elif hours_ratio <= 0.9:
-            adjustment_factor = 1.08  # Below average hours
-        elif hours_ratio <= 1.1:
-            adjustment_factor = 1.00  # Normal hours
-        elif hours_ratio <= 1.3:
-            adjustment_factor = 0.92  # Above average hours
-        elif hours_ratio <= 1.5:
-            adjustment_factor = 0.85  # High hours
-        else:
-            adjustment_factor = 0.75  # Very high hours
-        
-        return {
-            'expected_hours': expected_total_hours,
-            'actual_hours': hours,
-            'hours_ratio': hours_ratio,
-            'adjustment_factor': adjustment_factor,
-            'hours_rating': self._get_hours_rating(hours_ratio)
-        }
-    
-    def _get_hours_rating(self, hours_ratio: float) -> str:
-        """Get human-readable hours rating"""
-        if hours_ratio <= 0.7:
-            return "Excellent - Low Hours"
-        elif hours_ratio <= 0.9:
-            return "Very Good - Below Average"
-        elif hours_ratio <= 1.1:
-            return "Good - Normal Hours"
-        elif hours_ratio <= 1.3:
-            return "Fair - Above Average"
-        elif hours_ratio <= 1.5:
-            return "Poor - High Hours"
-        else:
-            return "Very Poor - Excessive Hours"
-    
-    def _calculate_market_adjustment(self, manufacturer: str, region: str) -> float:
-        """Calculate market adjustment factor"""
-        regional_factor = self.regional_adjustments.get(region, self.regional_adjustments['default'])
-        return regional_factor
-    
     def _calculate_deal_score(self, specs: CraneSpecs, final_value: float, base_value: float) -> int:
         """Calculate deal score (0-100)"""
         base_score = 50
@@ -311,7 +185,7 @@ class CraneValuationEngine:
             confidence += 0.1
         
         # Adjust based on manufacturer data availability
-        if specs.manufacturer in self.manufacturer_premiums:
+        if self.pricing.knows_manufacturer(specs.manufacturer):
             confidence += 0.1
         
         return min(1.0, confidence)
@@ -10,9 +10,20 @@ from dataclasses import dataclass
 import math
 import logging
 import asyncio
+from concurrent.futures import Executor
 import numpy as np
 from .data_loader import data_loader
 from .real_time_market_data import RealTimeMarketDataService
+from .valuation_profiler import valuation_profiler
+from .valuation_pipeline import (
+    UNIFIED_PRICING,
+    PipelineResult,
+    PricingTables,
+    manufacturer_factor,
+    region_factor,
+    spec_key_for,
+    valuation_pipeline,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -103,71 +114,23 @@ class UnifiedValuationEngine:
     - Real-time market data integration
     """
     
-    def __init__(self, use_real_time_data: bool = True):
+    def __init__(self, use_real_time_data: bool = True, use_cache: bool = True,
+                 real_time_service: Optional[RealTimeMarketDataService] = None,
+                 pricing: Optional[PricingTables] = None):
         self.use_real_time_data = use_real_time_data
-        self.real_time_service = None
+        self.use_cache = use_cache
+        # A shared service (from the service container) keeps one HTTP session and cache per process
+        self.real_time_service = real_time_service
         
-        if use_real_time_data:
+        if use_real_time_data and self.real_time_service is None:
             try:
                 self.real_time_service = RealTimeMarketDataService()
             except Exception as e:
                 logger.warning(f"Real-time market data service not available: {e}")
                 self.use_real_time_data = False
         
-        # Manufacturer premium factors (from core engine)
-        self.manufacturer_premiums = {
-            'Liebherr': 1.15, 'liebherr': 1.15,
-            'Grove': 1.10, 'grove': 1.10,
-            'Tadano': 1.08, 'tadano': 1.08,
-            'Manitowoc': 1.05, 'manitowoc': 1.05,
-            'Terex': 1.02, 'terex': 1.02,
-            'Link-Belt': 1.00, 'link-belt': 1.00,
-            'Demag': 1.12, 'demag': 1.12,
-            'Kato': 1.03, 'kato': 1.03,
-            'National': 0.90, 'national': 0.90,
-            'default': 1.00
-        }
-        
-        # Regional market adjustments (combined from all engines)
-        self.regional_adjustments = {
-            'TX': 1.05, 'CA': 1.08, 'NY': 1.06, 'FL': 1.03,
-            'northeast': 1.15, 'southeast': 1.05, 'gulf_coast': 1.20,
-            'west_coast': 1.25, 'midwest': 0.95, 'canada': 1.10,
-            'default': 1.00
-        }
-        
-        # Base capacity pricing (per ton)
-        self.base_capacity_price = 12000
-        
-        # Depreciation curves by age (from core engine)
-        self.depreciation_curves = {
-            'new': 1.00,      # 0-2 years
-            'young': 0.85,    # 3-5 years
-            'mid': 0.70,      # 6-10 years
-            'mature': 0.50,   # 11-15 years
-            'old': 0.35,      # 16-20 years
-            'vintage': 0.25   # 20+ years
-        }
-        
-        # Enhanced depreciation curves by crane type (from comprehensive engine)
-        self.type_depreciation_curves = {
-            'all_terrain': {
-                'years_0_3': 0.08, 'years_4_7': 0.12,
-                'years_8_15': 0.15, 'years_15_plus': 0.05
-            },
-            'crawler': {
-                'years_0_3': 0.06, 'years_4_7': 0.10,
-                'years_8_15': 0.12, 'years_15_plus': 0.04
-            },
-            'tower': {
-                'years_0_3': 0.10, 'years_4_7': 0.15,
-                'years_8_15': 0.18, 'years_15_plus': 0.08
-            },
-            'rough_terrain': {
-                'years_0_3': 0.10, 'years_4_7': 0.14,
-                'years_8_15': 0.16, 'years_15_plus': 0.06
-            }
-        }
+        # Depreciation / condition / hours / regional / manufacturer tables live in the shared pipeline
+        self.pricing = pricing or UNIFIED_PRICING
         
         logger.info("Unified valuation engine initialized")
     
@@ -178,33 +141,108 @@ class UnifiedValuationEngine:
         Main synchronous valuation method - comprehensive analysis
         Maintains backward compatibility with existing code
         """
-        return self._value_crane_sync(specs)
+        cache_key, cached = self._cached_valuation(specs)
+        if cached is not None:
+            return cached
+        result, degraded = self._value_crane_sync(specs)
+        if not degraded:
+            self._store_valuation(cache_key, result)
+        return result
     
     async def value_crane_async(self, specs: CraneSpecs) -> ValuationResult:
         """
         Async valuation method with real-time market data integration
         """
-        # 1. Calculate base value
-        base_value = self._calculate_base_value(specs)
-        
-        # 2. Apply depreciation
-        depreciation_rate = self._calculate_depreciation_rate(specs.year, specs)
-        age_adjusted_value = base_value * depreciation_rate
-        
-        # 3. Apply condition adjustments
-        condition_adjustment = self._calculate_condition_adjustment(specs.condition_score)
-        condition_adjusted_value = age_adjusted_value * condition_adjustment
-        
-        # 4. Apply hours analysis
-        hours_analysis = self._analyze_hours(specs.year, specs.hours)
-        hours_adjusted_value = condition_adjusted_value * hours_analysis['adjustment_factor']
-        
-        # 5. Apply market adjustments
-        market_adjustment = self._calculate_market_adjustment(specs.manufacturer, specs.region)
-        base_fmv = hours_adjusted_value * market_adjustment
-        
-        # 6. Fetch real-time market data if available
+        cache_key, cached = self._cached_valuation(specs)
+        if cached is not None:
+            return cached
+        result, degraded = await self._compute_valuation(specs)
+        if not degraded:
+            self._store_valuation(cache_key, result)
+        return result
+    
+    async def value_crane_offloaded(self, specs: CraneSpecs, executor: Executor) -> ValuationResult:
+        """
+        value_crane_async with the CPU-bound stages run on ``executor``
+        Market data is fetched on the calling loop, which owns the real-time service's HTTP session
+        """
+        cache_key, cached = self._cached_valuation(specs)
+        if cached is not None:
+            return cached
+        timer = valuation_profiler.start()
+        adjustments = valuation_pipeline.run(self.pricing, spec_key_for(specs), timer=timer)
+        base_fmv, market_data, degraded = await self._market_stage(specs, adjustments.fair_market_value, timer)
+        result = await asyncio.get_running_loop().run_in_executor(
+            executor, self._analysis_stages, specs, adjustments, base_fmv, market_data, timer
+        )
+        valuation_profiler.finish(timer, specs)
+        if not degraded:
+            self._store_valuation(cache_key, result)
+        return result
+    
+    def pricing_version(self) -> str:
+        """Fingerprint of this engine's pricing tables (part of the valuation cache key)"""
+        return self.pricing.version
+    
+    @property
+    def manufacturer_premiums(self) -> Dict[str, float]:
+        return dict(self.pricing.manufacturer_premiums)
+    
+    @property
+    def regional_adjustments(self) -> Dict[str, float]:
+        return dict(self.pricing.regional_adjustments)
+    
+    def manufacturer_factor(self, manufacturer: str) -> float:
+        """Premium applied for ``manufacturer`` (case-insensitive, default when unknown)"""
+        return manufacturer_factor(self.pricing, " ".join(manufacturer.split()))
+    
+    def region_factor(self, region: str) -> float:
+        """Adjustment applied for ``region`` (exact code, else mapped regional market)"""
+        return region_factor(self.pricing, region)
+    
+    def calculate_valuation(self, crane_specs: Dict[str, Any]) -> Dict[str, Any]:
+        """Bloomberg-style dict valuation of the comprehensive engine, over the same pipeline"""
+        from .comprehensive_valuation_engine import comprehensive_valuation_engine
+        return comprehensive_valuation_engine.calculate_valuation(crane_specs)
+    
+    def _cached_valuation(self, specs: CraneSpecs) -> Tuple[Optional[str], Optional[ValuationResult]]:
+        if not self.use_cache:
+            return None, None
+        from .valuation_cache import valuation_cache
+        try:
+            cache_key = valuation_cache.key_for(self, specs)
+            return cache_key, valuation_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Valuation cache lookup failed: {e}")
+            return None, None
+    
+    def _store_valuation(self, cache_key: Optional[str], result: ValuationResult) -> None:
+        if cache_key is None:
+            return
+        from .valuation_cache import valuation_cache
+        valuation_cache.put(cache_key, result)
+    
+    async def _compute_valuation(self, specs: CraneSpecs) -> Tuple[ValuationResult, bool]:
+        """
+        Run every valuation stage (uncached), timed per stage by the valuation profiler
+        Also returns whether the market data fetch failed (such results are not cached)
+        """
+        timer = valuation_profiler.start()
+        profile = valuation_profiler.begin_profile()
+        try:
+            # 1-5. Base value, depreciation, condition, hours and market adjustments (memoized per spec)
+            adjustments = valuation_pipeline.run(self.pricing, spec_key_for(specs), timer=timer)
+            base_fmv, market_data, degraded = await self._market_stage(specs, adjustments.fair_market_value, timer)
+            result = self._analysis_stages(specs, adjustments, base_fmv, market_data, timer)
+        finally:
+            valuation_profiler.end_profile(profile)
+        valuation_profiler.finish(timer, specs)
+        return result, degraded
+    
+    async def _market_stage(self, specs: CraneSpecs, base_fmv: float, timer) -> Tuple[float, Dict[str, Any], bool]:
+        """6. Fetch real-time market data if available and apply the market intelligence adjustment"""
         market_data = {}
+        degraded = False
         if self.use_real_time_data and self.real_time_service:
             try:
                 market_data = await self._fetch_market_data(specs.manufacturer, specs.model)
@@ -216,37 +254,57 @@ class UnifiedValuationEngine:
                     base_fmv *= (1 + market_intelligence_adjustment)
             except Exception as e:
                 logger.warning(f"Real-time market data fetch failed: {e}")
+                degraded = True
+        timer.lap("market_data")
+        return base_fmv, market_data, degraded
+    
+    def _analysis_stages(self, specs: CraneSpecs, adjustments: PipelineResult, base_fmv: float,
+                         market_data: Dict[str, Any], timer) -> ValuationResult:
+        """7-17. CPU-only stages; safe to run on a worker thread"""
+        base_value = adjustments.base_value
+        depreciation_rate = adjustments.depreciation_rate
+        hours_analysis = adjustments.hours._asdict()
         
         # 7. Calculate valuation ranges
         valuation_ranges = self._calculate_valuation_ranges(base_fmv)
+        timer.lap("valuation_ranges")
         
         # 8. Calculate deal score
         deal_score = self._calculate_deal_score(specs, base_fmv, base_value, market_data)
+        timer.lap("deal_score")
         
         # 9. Determine market position
         market_position = self._determine_market_position(specs, base_fmv, base_value, market_data)
+        timer.lap("market_position")
         
         # 10. Calculate confidence score
         confidence_score = self._calculate_confidence_score(specs, base_fmv, market_data)
+        timer.lap("confidence")
         
         # 11. Calculate wear score
         wear_score = self._calculate_wear_score(specs)
+        timer.lap("wear_score")
         
         # 12. Identify risk factors
         risk_factors = self._identify_risk_factors(specs, base_fmv, base_value)
+        timer.lap("risk_factors")
         
         # 13. Generate recommendations
         recommendations = self._generate_recommendations(deal_score, risk_factors, market_data)
+        timer.lap("recommendations")
         
         # 14. Calculate financial metrics
         financial_metrics = self._calculate_financial_metrics(specs, base_fmv, base_value)
+        timer.lap("financial_metrics")
         
         # 15. Comparable analysis
         comparable_analysis = self._generate_comparable_analysis(specs, base_fmv, market_data)
         comparable_sales = comparable_analysis.get('comparables', [])
+        timer.lap("comparables")
         
         # 16. Generate financing scenarios
         financing_scenarios = self._generate_financing_scenarios(specs, base_fmv)
+        timer.lap("financing")
         
         # 17. Extract market trends
         market_trends = market_data.get('trends', {}) if market_data else {}
@@ -271,7 +329,7 @@ class UnifiedValuationEngine:
             valuation_ranges=valuation_ranges
         )
     
-    def _value_crane_sync(self, specs: CraneSpecs) -> ValuationResult:
+    def _value_crane_sync(self, specs: CraneSpecs) -> Tuple[ValuationResult, bool]:
         """Synchronous wrapper for async method"""
         try:
             loop = asyncio.get_event_loop()
@@ -279,195 +337,31 @@ class UnifiedValuationEngine:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        return loop.run_until_complete(self.value_crane_async(specs))
+        return loop.run_until_complete(self._compute_valuation(specs))
     
     # ==================== CALCULATION METHODS ====================
     
-    def _calculate_base_value(self, specs: CraneSpecs) -> float:
-        """Calculate base value based on capacity and manufacturer"""
-        base_value = specs.capacity_tons * self.base_capacity_price
-        
-        # Apply manufacturer premium
-        manufacturer_premium = self.manufacturer_premiums.get(
-            specs.manufacturer,
-            self.manufacturer_premiums.get(
-                specs.manufacturer.lower(),
-                self.manufacturer_premiums['default']
-            )
-        )
-        
-        return base_value * manufacturer_premium
-    
-    def _calculate_depreciation_rate(self, year: int, specs: Optional[CraneSpecs] = None) -> float:
-        """Calculate depreciation rate based on age and crane type"""
-        current_year = datetime.now().year
-        age = current_year - year
-        
-        # Use type-specific depreciation if crane type can be determined
-        if specs:
-            crane_type = self._determine_crane_type(specs)
-            if crane_type in self.type_depreciation_curves:
-                curve = self.type_depreciation_curves[crane_type]
-                if age <= 3:
-                    annual_rate = curve['years_0_3']
-                elif age <= 7:
-                    annual_rate = curve['years_4_7']
-                elif age <= 15:
-                    annual_rate = curve['years_8_15']
-                else:
-                    annual_rate = curve['years_15_plus']
-                return (1 - annual_rate) ** age
-        
-        # Fallback to simple age-based depreciation
-        if age <= 2:
-            return self.depreciation_curves['new']
-        elif age <= 5:
-            return self.depreciation_curves['young']
-        elif age <= 10:
-            return self.depreciation_curves['mid']
-        elif age <= 15:
-            return self.depreciation_curves['mature']
-        elif age <= 20:
-            return self.depreciation_curves['old']
-        else:
-            return self.depreciation_curves['vintage']
-    
-    def _determine_crane_type(self, specs: CraneSpecs) -> str:
-        """Determine crane type from specifications"""
-        model = specs.model.lower()
-        manufacturer = specs.manufacturer.lower()
-        
-        # All-terrain indicators
-        if any(indicator in model for indicator in ['ltm', 'at', 'all-terrain', 'gmk']):
-            return 'all_terrain'
-        
-        # Crawler indicators
-        if any(indicator in model for indicator in ['cc', 'crawler', 'lr', 'mlc']):
-            return 'crawler'
-        
-        # Tower indicators
-        if any(indicator in model for indicator in ['tower', 'tt', 'ct']):
-            return 'tower'
-        
-        # Rough terrain indicators
-        if any(indicator in model for indicator in ['rt', 'rough-terrain']):
-            return 'rough_terrain'
-        
-        # Default based on capacity
-        if specs.capacity_tons >= 200:
-            return 'crawler'
-        elif specs.capacity_tons >= 100:
-            return 'all_terrain'
-        else:
-            return 'rough_terrain'
-    
-    def _calculate_condition_adjustment(self, condition_score: float) -> float:
-        """Calculate condition adjustment factor"""
-        if condition_score >= 0.9:
-            return 1.15
-        elif condition_score >= 0.8:
-            return 1.08
-        elif condition_score >= 0.7:
-            return 1.00
-        elif condition_score >= 0.6:
-            return 0.92
-        elif condition_score >= 0.5:
-            return 0.85
-        else:
-            return 0.75
-    
-    def _analyze_hours(self, year: int, hours: int) -> Dict[str, Any]:
-        """Analyze hours and calculate adjustment factor"""
-        current_year = datetime.now().year
-        age = current_year - year
-        expected_hours_per_year = 800
-        expected_total_hours = age * expected_hours_per_year
-        
-        hours_ratio = hours / max(expected_total_hours, 1)
-        
-        if hours_ratio <= 0.7:
-            adjustment_factor = 1.15
-        elif hours_ratio <= 0.9:
-            adjustment_factor = 1.08
-        elif hours_ratio <= 1.1:
-            adjustment_factor = 1.00
-        elif hours_ratio <= 1.3:
-            adjustment_factor = 0.92
-        elif hours_ratio <= 1.5:
-            adjustment_factor = 0.85
-        else:
-            adjustment_factor = 0.75
-        
-        return {
-            'expected_hours': expected_total_hours,
-            'actual_hours': hours,
-            'hours_ratio': hours_ratio,
-            'adjustment_factor': adjustment_factor,
-            'hours_rating': self._get_hours_rating(hours_ratio)
-        }
-    
-    def _get_hours_rating(self, hours_ratio: float) -> str:
-        """Get human-readable hours rating"""
-        if hours_ratio <= 0.7:
-            return "Excellent - Low Hours"
-        elif hours_ratio <= 0.9:
-            return "Very Good - Below Average"
-        elif hours_ratio <= 1.1:
-            return "Good - Normal Hours"
-        elif hours_ratio <= 1.3:
-            return "Fair - Above Average"
-        elif hours_ratio <= 1.5:
-            return "Poor - High Hours"
-        else:
-            return "Very Poor - Excessive Hours"
-    
-    def _calculate_market_adjustment(self, manufacturer: str, region: str) -> float:
-        """Calculate market adjustment factor"""
-        # Try direct region match first
-        regional_factor = self.regional_adjustments.get(region, None)
-        
-        # If not found, try region mapping
-        if regional_factor is None:
-            region_lower = region.lower()
-            if any(state in region_lower for state in ['northeast', 'ny', 'nj', 'pa', 'ct', 'ma']):
-                regional_factor = self.regional_adjustments['northeast']
-            elif any(state in region_lower for state in ['southeast', 'fl', 'ga', 'sc', 'nc', 'va']):
-                regional_factor = self.regional_adjustments['southeast']
-            elif any(state in region_lower for state in ['gulf', 'tx', 'la', 'ok', 'ar']):
-                regional_factor = self.regional_adjustments['gulf_coast']
-            elif any(state in region_lower for state in ['west', 'ca', 'or', 'wa', 'nv', 'az']):
-                regional_factor = self.regional_adjustments['west_coast']
-            elif 'canada' in region_lower or 'ca' in region_lower:
-                regional_factor = self.regional_adjustments['canada']
-            else:
-                regional_factor = self.regional_adjustments['default']
-        
-        return regional_factor
-    
     async def _fetch_market_data(self, manufacturer: str, model: str) -> Dict[str, Any]:
         """Fetch real-time market data from multiple sources"""
         if not self.use_real_time_data or not self.real_time_service:
             return {}
         
-        try:
-            await self.real_time_service.initialize()
-            market_data = await self.real_time_service.get_comprehensive_market_data(manufacturer, model)
-            
-            # Extract and format data
-            all_listings = market_data.get('listings', [])
-            prices = [listing.get('price', 0) for listing in all_listings if listing.get('price', 0) > 0]
-            
-            return {
-                'listings': all_listings,
-                'average_price': np.mean(prices) if prices else 0,
-                'price_range': [min(prices), max(prices)] if prices else [0, 0],
-                'trends': market_data.get('market_trends', {}),
-                'total_listings': len(all_listings),
-                'last_updated': datetime.now().isoformat()
-            }
-        except Exception as e:
-            logger.error(f"Market data fetch error: {e}")
-            return {}
+        # Errors propagate to _market_stage, which marks the valuation as degraded
+        await self.real_time_service.initialize()
+        market_data = await self.real_time_service.get_comprehensive_market_data(manufacturer, model)
+        
+        # Extract and format data
+        all_listings = market_data.get('listings', [])
+        prices = [listing.get('price', 0) for listing in all_listings if listing.get('price', 0) > 0]
+        
+        return {
+            'listings': all_listings,
+            'average_price': np.mean(prices) if prices else 0,
+            'price_range': [min(prices), max(prices)] if prices else [0, 0],
+            'trends': market_data.get('market_trends', {}),
+            'total_listings': len(all_listings),
+            'last_updated': datetime.now().isoformat()
+        }
     
     def _calculate_market_intelligence_adjustment(self, base_fmv: float, market_data: Dict[str, Any]) -> float:
         """Calculate adjustment based on market intelligence"""
@@ -589,7 +483,7 @@ class UnifiedValuationEngine:
         if specs.price:
             confidence += 0.1
         
-        if specs.manufacturer in self.manufacturer_premiums or specs.manufacturer.lower() in self.manufacturer_premiums:
+        if self.pricing.knows_manufacturer(specs.manufacturer):
             confidence += 0.1
         
         # Market data bonus
@@ -0,0 +1,481 @@
+"""
+Valuation Pipeline
+The depreciation / condition / hours / regional / manufacturer adjustments shared by every valuation engine:
+pure stage functions over a compact spec key, one pricing table set per engine, memoized per process
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from functools import cached_property, lru_cache
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from .valuation_profiler import NULL_TIMER
+
+logger = logging.getLogger(__name__)
+
+INF = float("inf")
+
+# Free-text region -> regional market, first match wins (substring match on the lowercased region)
+REGION_ALIASES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("northeast", ("northeast", "ny", "nj", "pa", "ct", "ma")),
+    ("southeast", ("southeast", "fl", "ga", "sc", "nc", "va")),
+    ("gulf_coast", ("gulf", "tx", "la", "ok", "ar")),
+    ("west_coast", ("west", "ca", "or", "wa", "nv", "az")),
+    ("canada", ("canada", "ca")),
+)
+
+# Hours ratio (actual / expected) -> rating, inclusive upper bounds
+HOURS_RATINGS: Tuple[Tuple[float, str], ...] = (
+    (0.7, "Excellent - Low Hours"),
+    (0.9, "Very Good - Below Average"),
+    (1.1, "Good - Normal Hours"),
+    (1.3, "Fair - Above Average"),
+    (1.5, "Poor - High Hours"),
+    (INF, "Very Poor - Excessive Hours"),
+)
+
+
+class SpecKey(NamedTuple):
+    """
+    The spec fields the adjustments depend on, normalized. Asking price and
+    optional equipment do not change them, so they are left out to keep the
+    memo hit rate high.
+    """
+    manufacturer: str
+    model: str
+    year: int
+    capacity_tons: float
+    hours: int
+    condition_score: Optional[float]
+    region: str
+
+
+def spec_key(manufacturer: Optional[str], model: Optional[str], year: int, capacity_tons: float,
+             hours: Any = 0, condition_score: Optional[float] = None, region: Optional[str] = None) -> SpecKey:
+    try:
+        hours = int(hours) if hours is not None else 0
+    except (ValueError, TypeError):
+        hours = 0
+    return SpecKey(
+        manufacturer=" ".join((manufacturer or "").split()).lower(),
+        model=(model or "").lower(),
+        year=int(year),
+        capacity_tons=float(capacity_tons),
+        hours=hours,
+        condition_score=float(condition_score) if condition_score is not None else None,
+        region=region or "",
+    )
+
+
+def spec_key_for(specs: Any) -> SpecKey:
+    """SpecKey of a CraneSpecs (any of the engines' variants)"""
+    return spec_key(specs.manufacturer, specs.model, specs.year, specs.capacity_tons,
+                    specs.hours, specs.condition_score, specs.region)
+
+
+@dataclass(frozen=True, eq=False)
+class PricingTables:
+    """
+    One engine's pricing method as data.
+
+    Bands are ``(bound, value)`` pairs checked in order. Tables compare by
+    identity (they are module constants), which makes them cheap memo keys;
+    ``version`` fingerprints the contents for the valuation result cache.
+    """
+    name: str
+    manufacturer_premiums: Mapping[str, float]
+    regional_adjustments: Mapping[str, float]
+
+    # Base value: capacity x price per ton (by crane type when listed) x manufacturer premium,
+    # or, with market_anchor_capacity, the market average scaled by capacity
+    price_per_ton: float = 12000
+    type_price_per_ton: Mapping[str, float] = field(default_factory=dict)
+    capacity_premiums: Tuple[Tuple[float, float], ...] = ()  # (capacity above, factor)
+    small_capacity_discount: Optional[Tuple[float, float]] = None  # (capacity below, factor)
+    market_anchor_capacity: Optional[float] = None
+
+    # Region: exact key first, then REGION_ALIASES, then the fallback key
+    region_exact: bool = True
+    region_aliases: bool = False
+    region_fallback: str = "default"
+
+    # Depreciation (remaining value fraction): "brackets" by age, compounded "type_curves", or "linear"
+    depreciation: str = "brackets"
+    depreciation_brackets: Tuple[Tuple[float, float], ...] = ()  # (age up to, remaining fraction)
+    type_depreciation_rates: Mapping[str, Tuple[Tuple[float, float], ...]] = field(default_factory=dict)
+    linear_depreciation_rate: float = 0.0
+    min_age: Optional[int] = None
+
+    # Condition: (score at least, factor) bands, or a linear deduction of (1 - score) x weight
+    condition_bands: Tuple[Tuple[float, float], ...] = ()
+    condition_weight: Optional[float] = None
+
+    # Hours: (hours ratio up to, factor) bands, or a linear deduction (hours for a full deduction, cap)
+    expected_hours_per_year: int = 800
+    hours_bands: Tuple[Tuple[float, float], ...] = ()
+    hours_bands_inclusive: bool = True
+    hours_unknown_neutral: bool = False
+    hours_deduction: Optional[Tuple[float, float]] = None
+
+    # Composition: value = base x asset adjustments (depreciation, condition, hours) x market adjustments
+    # (region, plus manufacturer and trend when manufacturer_market_adjustment). "Additive" groups
+    # combine as 1 + sum(factor - 1) instead of a product.
+    additive_asset_adjustments: bool = False
+    additive_market_adjustments: bool = False
+    manufacturer_market_adjustment: bool = False
+    market_trend: float = 0.0
+
+    @cached_property
+    def version(self) -> str:
+        payload = {f.name: getattr(self, f.name) for f in fields(self)}
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=repr).encode()).hexdigest()[:16]
+
+    @cached_property
+    def _manufacturers(self) -> Dict[str, float]:
+        return {name.lower(): factor for name, factor in self.manufacturer_premiums.items()}
+
+    def knows_manufacturer(self, manufacturer: str) -> bool:
+        name = manufacturer.strip().lower()
+        return name != "default" and name in self._manufacturers
+
+
+class HoursAnalysis(NamedTuple):
+    expected_hours: int
+    actual_hours: int
+    hours_ratio: float
+    adjustment_factor: float
+    hours_rating: str
+
+
+class PipelineResult(NamedTuple):
+    """Every intermediate of one run; immutable, so memoized results can be shared"""
+    crane_type: str
+    age: int
+    base_value: float
+    depreciation_rate: float
+    condition_factor: float
+    hours: HoursAnalysis
+    region_factor: float
+    manufacturer_factor: float
+    adjusted_value: float  # base value after the asset adjustments
+    market_multiplier: float
+    fair_market_value: float
+
+
+# ==================== STAGES ====================
+
+@lru_cache(maxsize=4096)
+def crane_type(model: str, capacity_tons: float) -> str:
+    """Crane type from model designation indicators, else by capacity"""
+    if any(indicator in model for indicator in ("ltm", "at", "all-terrain", "gmk")):
+        return "all_terrain"
+    if any(indicator in model for indicator in ("cc", "crawler", "lr", "mlc")):
+        return "crawler"
+    if any(indicator in model for indicator in ("tower", "tt", "ct")):
+        return "tower"
+    if any(indicator in model for indicator in ("rt", "rough-terrain")):
+        return "rough_terrain"
+    if capacity_tons >= 200:
+        return "crawler"
+    if capacity_tons >= 100:
+        return "all_terrain"
+    return "rough_terrain"
+
+
+def manufacturer_factor(tables: PricingTables, manufacturer: str) -> float:
+    index = tables._manufacturers
+    return index.get(manufacturer.strip().lower(), index.get("default", 1.0))
+
+
+@lru_cache(maxsize=1024)
+def region_factor(tables: PricingTables, region: str) -> float:
+    adjustments = tables.regional_adjustments
+    if tables.region_exact and region in adjustments:
+        return adjustments[region]
+    if tables.region_aliases:
+        lowered = region.lower()
+        for market, indicators in REGION_ALIASES:
+            if any(indicator in lowered for indicator in indicators):
+                return adjustments.get(market, 1.0)
+    return adjustments.get(tables.region_fallback, 1.0)
+
+
+def base_value(tables: PricingTables, crane_kind: str, capacity_tons: float, manufacturer_premium: float,
+               anchor_price: Optional[float] = None) -> float:
+    if tables.market_anchor_capacity is not None:
+        return (anchor_price or 0.0) * (1 + (capacity_tons - tables.market_anchor_capacity) / 1000)
+    per_ton = tables.type_price_per_ton.get(crane_kind, tables.price_per_ton)
+    value = capacity_tons * per_ton * manufacturer_premium
+    for above, factor in tables.capacity_premiums:
+        if capacity_tons > above:
+            return value * factor
+    if tables.small_capacity_discount and capacity_tons < tables.small_capacity_discount[0]:
+        return value * tables.small_capacity_discount[1]
+    return value
+
+
+def depreciation_factor(tables: PricingTables, age: int, crane_kind: str) -> float:
+    """Fraction of the base value remaining at ``age``"""
+    if tables.depreciation == "linear":
+        return 1 - tables.linear_depreciation_rate * age
+    if tables.depreciation == "type_curves" and crane_kind in tables.type_depreciation_rates:
+        rates = tables.type_depreciation_rates[crane_kind]
+        return (1 - _upper_band(rates, age)) ** age
+    return _upper_band(tables.depreciation_brackets, age)
+
+
+def condition_factor(tables: PricingTables, condition_score: Optional[float]) -> float:
+    """Unknown condition is priced as neutral"""
+    if condition_score is None:
+        return 1.0
+    if tables.condition_weight is not None:
+        return 1 - (1 - condition_score) * tables.condition_weight
+    for at_least, factor in tables.condition_bands:
+        if condition_score >= at_least:
+            return factor
+    return tables.condition_bands[-1][1] if tables.condition_bands else 1.0
+
+
+def analyze_hours(tables: PricingTables, age: int, hours: int) -> HoursAnalysis:
+    expected = age * tables.expected_hours_per_year
+    ratio = hours / max(expected, 1)
+    if tables.hours_deduction is not None:
+        full_deduction_hours, cap = tables.hours_deduction
+        factor = 1 - min(hours / full_deduction_hours, cap)
+    elif tables.hours_unknown_neutral and (hours <= 0 or expected == 0):
+        factor = 1.0
+    elif tables.hours_bands_inclusive:
+        factor = _upper_band(tables.hours_bands, ratio)
+    else:
+        factor = next((value for limit, value in tables.hours_bands if ratio < limit), tables.hours_bands[-1][1])
+    return HoursAnalysis(expected, hours, ratio, factor, _upper_band(HOURS_RATINGS, ratio))
+
+
+def combine(factors: Sequence[float], additive: bool) -> float:
+    if additive:
+        return 1 + sum(factor - 1 for factor in factors)
+    combined = 1.0
+    for factor in factors:
+        combined *= factor
+    return combined
+
+
+def _upper_band(bands: Sequence[Tuple[float, Any]], value: float) -> Any:
+    for limit, result in bands:
+        if value <= limit:
+            return result
+    return bands[-1][1]
+
+
+# ==================== PIPELINE ====================
+
+class ValuationPipeline:
+    """
+    Runs the adjustment stages for a spec key under a set of pricing tables.
+
+    Stages are pure functions of ``(tables, key, year, anchor price)``, so whole
+    runs are memoized in a bounded LRU shared by every engine in the process;
+    a repeated spec (fleet duplicates, re-valuations, the same crane through
+    different endpoints) skips straight to the engine's scoring. On a miss each
+    stage records a lap on the caller's profiler timer.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[Tuple, PipelineResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def run(self, tables: PricingTables, key: SpecKey, current_year: Optional[int] = None,
+            anchor_price: Optional[float] = None, timer=NULL_TIMER) -> PipelineResult:
+        year = current_year or datetime.now().year
+        memo_key = (tables, key, year, anchor_price)
+        with self._lock:
+            result = self._memo.get(memo_key)
+            if result is not None:
+                self._memo.move_to_end(memo_key)
+                self.hits += 1
+        if result is not None:
+            timer.lap("adjustments_cached")
+            return result
+
+        self.misses += 1
+        result = self._compute(tables, key, year, anchor_price, timer)
+        with self._lock:
+            self._memo[memo_key] = result
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _compute(tables: PricingTables, key: SpecKey, year: int, anchor_price: Optional[float],
+                 timer) -> PipelineResult:
+        kind = crane_type(key.model, key.capacity_tons)
+        manufacturer = manufacturer_factor(tables, key.manufacturer)
+        base = base_value(tables, kind, key.capacity_tons, manufacturer, anchor_price)
+        timer.lap("base_value")
+
+        age = year - key.year
+        if tables.min_age is not None:
+            age = max(age, tables.min_age)
+        depreciation = depreciation_factor(tables, age, kind)
+        timer.lap("depreciation")
+
+        condition = condition_factor(tables, key.condition_score)
+        timer.lap("condition")
+
+        hours = analyze_hours(tables, age, key.hours)
+        timer.lap("hours")
+
+        if tables.additive_asset_adjustments:
+            adjusted = base * combine((depreciation, condition, hours.adjustment_factor), additive=True)
+        else:
+            # Applied one at a time so results match the engines' step-by-step arithmetic
+            adjusted = base * depreciation * condition * hours.adjustment_factor
+
+        region = region_factor(tables, key.region)
+        market_factors = [region]
+        if tables.manufacturer_market_adjustment:
+            market_factors.append(manufacturer)
+        if tables.market_trend:
+            market_factors.append(1 + tables.market_trend)
+        market = combine(market_factors, tables.additive_market_adjustments)
+        timer.lap("market_adjustment")
+
+        return PipelineResult(
+            crane_type=kind,
+            age=age,
+            base_value=base,
+            depreciation_rate=depreciation,
+            condition_factor=condition,
+            hours=hours,
+            region_factor=region,
+            manufacturer_factor=manufacturer,
+            adjusted_value=adjusted,
+            market_multiplier=market,
+            fair_market_value=adjusted * market,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+        region_factor.cache_clear()
+        crane_type.cache_clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._memo)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "crane_type": crane_type.cache_info()._asdict(),
+            "region_factor": region_factor.cache_info()._asdict(),
+        }
+
+
+# ==================== PRICING TABLES ====================
+
+CONDITION_BANDS = ((0.9, 1.15), (0.8, 1.08), (0.7, 1.00), (0.6, 0.92), (0.5, 0.85), (-INF, 0.75))
+DEPRECIATION_BRACKETS = ((2, 1.00), (5, 0.85), (10, 0.70), (15, 0.50), (20, 0.35), (INF, 0.25))
+HOURS_BANDS = ((0.7, 1.15), (0.9, 1.08), (1.1, 1.00), (1.3, 0.92), (1.5, 0.85), (INF, 0.75))
+
+# Annual depreciation rate by crane type and age band
+TYPE_DEPRECIATION_RATES = {
+    "all_terrain": ((3, 0.08), (7, 0.12), (15, 0.15), (INF, 0.05)),
+    "crawler": ((3, 0.06), (7, 0.10), (15, 0.12), (INF, 0.04)),
+    "tower": ((3, 0.10), (7, 0.15), (15, 0.18), (INF, 0.08)),
+    "rough_terrain": ((3, 0.10), (7, 0.14), (15, 0.16), (INF, 0.06)),
+}
+
+# valuation_engine.CraneValuationEngine: age brackets, state-level regions
+CORE_PRICING = PricingTables(
+    name="core",
+    manufacturer_premiums={
+        "Liebherr": 1.15, "Grove": 1.10, "Tadano": 1.08, "Manitowoc": 1.05, "Terex": 1.02, "Link-Belt": 1.00,
+        "default": 1.00,
+    },
+    regional_adjustments={"TX": 1.05, "CA": 1.08, "NY": 1.06, "FL": 1.03, "default": 1.00},
+    depreciation="brackets",
+    depreciation_brackets=DEPRECIATION_BRACKETS,
+    condition_bands=CONDITION_BANDS,
+    hours_bands=HOURS_BANDS,
+)
+
+# valuation_engine_unified.UnifiedValuationEngine: type curves, state codes plus regional markets
+UNIFIED_PRICING = PricingTables(
+    name="unified",
+    manufacturer_premiums={
+        "Liebherr": 1.15, "Grove": 1.10, "Tadano": 1.08, "Manitowoc": 1.05, "Terex": 1.02, "Link-Belt": 1.00,
+        "Demag": 1.12, "Kato": 1.03, "National": 0.90, "default": 1.00,
+    },
+    regional_adjustments={
+        "TX": 1.05, "CA": 1.08, "NY": 1.06, "FL": 1.03,
+        "northeast": 1.15, "southeast": 1.05, "gulf_coast": 1.20, "west_coast": 1.25, "midwest": 0.95,
+        "canada": 1.10, "default": 1.00,
+    },
+    region_aliases=True,
+    depreciation="type_curves",
+    depreciation_brackets=DEPRECIATION_BRACKETS,
+    type_depreciation_rates=TYPE_DEPRECIATION_RATES,
+    condition_bands=CONDITION_BANDS,
+    hours_bands=HOURS_BANDS,
+)
+
+# comprehensive_valuation_engine.ComprehensiveValuationEngine: MARCS type curves on a type-priced
+# new unit cost, additive market adjustments (regions default to midwest)
+COMPREHENSIVE_PRICING = PricingTables(
+    name="comprehensive",
+    manufacturer_premiums={
+        "liebherr": 1.15, "grove": 1.05, "manitowoc": 1.10, "terex": 0.95, "link-belt": 1.00, "tadano": 1.08,
+        "national": 0.90, "demag": 1.12, "kato": 1.03,
+    },
+    regional_adjustments={
+        "northeast": 1.15, "southeast": 1.05, "gulf_coast": 1.20, "west_coast": 1.25, "midwest": 0.95,
+        "canada": 1.10,
+    },
+    type_price_per_ton={"all_terrain": 12000, "crawler": 15000, "tower": 8000, "rough_terrain": 8000},
+    capacity_premiums=((500, 1.2), (300, 1.1)),
+    small_capacity_discount=(50, 0.9),
+    region_exact=False,
+    region_aliases=True,
+    region_fallback="midwest",
+    depreciation="type_curves",
+    type_depreciation_rates=TYPE_DEPRECIATION_RATES,
+    min_age=0,
+    hours_bands=((0.5, 1.15), (0.8, 1.05), (1.2, 1.00), (1.5, 0.95), (INF, 0.85)),
+    hours_bands_inclusive=False,
+    hours_unknown_neutral=True,
+    additive_market_adjustments=True,
+    manufacturer_market_adjustment=True,
+    market_trend=0.02,
+)
+
+# enhanced_valuation_engine.EnhancedValuationEngine: live market average scaled by capacity,
+# linear age / hours / condition deductions
+ENHANCED_PRICING = PricingTables(
+    name="enhanced",
+    manufacturer_premiums={},
+    regional_adjustments={},
+    market_anchor_capacity=200,
+    region_exact=False,
+    depreciation="linear",
+    linear_depreciation_rate=0.08,
+    condition_weight=0.2,
+    hours_deduction=(10000, 0.3),
+    additive_asset_adjustments=True,
+)
+
+
+# Global instance
+valuation_pipeline = ValuationPipeline(max_entries=settings.valuation_pipeline_cache_entries)
@@ -0,0 +1,251 @@
+"""
+Valuation Profiler
+Per-stage timings of the valuation pipeline: histograms, a slow-valuation log and an optional sampling cProfile
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (plus an implicit +Inf)
+BUCKETS_MS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+TOTAL_STAGE = "total"
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given quantile"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class StageTimer:
+    """Laps of one valuation; ``lap(stage)`` records the time since the previous lap"""
+
+    __slots__ = ("started", "last", "stages")
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage, (now - self.last) * 1000))
+        self.last = now
+
+
+class _NullTimer:
+    """Stand-in when profiling is disabled: laps cost one no-op call"""
+
+    __slots__ = ()
+
+    def lap(self, stage: str) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class ValuationProfiler:
+    """
+    Collects stage timings from ``UnifiedValuationEngine._compute_valuation``.
+
+    When enabled every valuation records a lap per stage into a fixed-bucket
+    histogram (exported in Prometheus text format by ``prometheus_text``); the
+    ones slower than ``slow_ms`` are logged with their stage breakdown and kept
+    in a short ring buffer. ``profile_sample_rate`` runs that fraction of
+    valuations under cProfile and accumulates the function-level stats.
+    """
+
+    def __init__(self, enabled: bool = True, slow_ms: float = 250, profile_sample_rate: float = 0.0,
+                 slow_log_size: int = 50):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.profile_sample_rate = profile_sample_rate
+        self._histograms: Dict[str, _Histogram] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self._profile_stats: Optional[pstats.Stats] = None
+        self._profile_busy = threading.Lock()
+        self.profiled = 0
+        self.started_at = datetime.utcnow()
+
+    # ------------------------------------------------------------------ timing
+
+    def start(self):
+        return StageTimer() if self.enabled else NULL_TIMER
+
+    def finish(self, timer, specs: Any = None) -> None:
+        if timer is NULL_TIMER:
+            return
+        total_ms = (time.perf_counter() - timer.started) * 1000
+        histograms = self._histograms
+        with self._lock:
+            for stage, elapsed_ms in timer.stages:
+                histogram = histograms.get(stage)
+                if histogram is None:
+                    histogram = histograms[stage] = _Histogram()
+                histogram.observe(elapsed_ms)
+            total = histograms.get(TOTAL_STAGE)
+            if total is None:
+                total = histograms[TOTAL_STAGE] = _Histogram()
+            total.observe(total_ms)
+
+        if total_ms >= self.slow_ms:
+            breakdown = {stage: round(elapsed_ms, 2) for stage, elapsed_ms in timer.stages}
+            crane = f"{specs.manufacturer} {specs.model}" if specs is not None else "unknown"
+            self._slow.append({
+                "timestamp": datetime.utcnow().isoformat(),
+                "crane": crane,
+                "total_ms": round(total_ms, 2),
+                "stages": breakdown,
+            })
+            slowest = ", ".join(f"{stage}={ms}ms" for stage, ms in
+                                sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:5])
+            logger.warning(f"Slow valuation ({total_ms:.1f} ms) for {crane}: {slowest}")
+
+    # ------------------------------------------------------------------ sampling profiler
+
+    def begin_profile(self) -> Optional[cProfile.Profile]:
+        """A running profiler for a sampled valuation, or None (one profiled valuation at a time)"""
+        if self.profile_sample_rate <= 0 or random.random() >= self.profile_sample_rate:
+            return None
+        if not self._profile_busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active
+            self._profile_busy.release()
+            return None
+        return profile
+
+    def end_profile(self, profile: Optional[cProfile.Profile]) -> None:
+        if profile is None:
+            return
+        try:
+            profile.disable()
+            with self._lock:
+                if self._profile_stats is None:
+                    self._profile_stats = pstats.Stats(profile)
+                else:
+                    self._profile_stats.add(profile)
+                self.profiled += 1
+        finally:
+            self._profile_busy.release()
+
+    def profile_report(self, limit: int = 30, sort: str = "cumulative") -> str:
+        with self._lock:
+            if self._profile_stats is None:
+                return ""
+            stream = io.StringIO()
+            self._profile_stats.stream = stream
+            self._profile_stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    # ------------------------------------------------------------------ control / export
+
+    def configure(self, enabled: Optional[bool] = None, slow_ms: Optional[float] = None,
+                  profile_sample_rate: Optional[float] = None) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if profile_sample_rate is not None:
+            self.profile_sample_rate = min(1.0, max(0.0, profile_sample_rate))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._slow.clear()
+            self._profile_stats = None
+            self.profiled = 0
+            self.started_at = datetime.utcnow()
+
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP valuation_stage_duration_ms Valuation pipeline stage duration in milliseconds",
+            "# TYPE valuation_stage_duration_ms histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for index, bucket_count in enumerate(histogram.counts):
+                    cumulative += bucket_count
+                    le = BUCKETS_MS[index] if index < len(BUCKETS_MS) else "+Inf"
+                    lines.append(f'valuation_stage_duration_ms_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'valuation_stage_duration_ms_sum{{stage="{stage}"}} {histogram.sum_ms:.4f}')
+                lines.append(f'valuation_stage_duration_ms_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "avg_ms": round(histogram.sum_ms / histogram.count, 4) if histogram.count else 0,
+                    "p50_ms": histogram.quantile(0.50),
+                    "p95_ms": histogram.quantile(0.95),
+                    "p99_ms": histogram.quantile(0.99),
+                    "max_ms": round(histogram.max_ms, 4),
+                    "total_ms": round(histogram.sum_ms, 2),
+                }
+                for stage, histogram in self._histograms.items()
+            }
+            slow = list(self._slow)
+        total_ms = stages.get(TOTAL_STAGE, {}).get("total_ms") or 0
+        for stage, stats in stages.items():
+            stats["share_of_total"] = round(stats["total_ms"] / total_ms, 4) if total_ms and stage != TOTAL_STAGE else None
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "profile_sample_rate": self.profile_sample_rate,
+            "profiled_valuations": self.profiled,
+            "since": self.started_at.isoformat(),
+            "stages": stages,
+            "slow_valuations": slow,
+        }
+
+
+# Global instance
+valuation_profiler = ValuationProfiler(
+    enabled=settings.valuation_profiling_enabled,
+    slow_ms=settings.valuation_slow_ms,
+    profile_sample_rate=settings.valuation_profile_sample_rate,
+)
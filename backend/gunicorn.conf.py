@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for multi-worker deployments
+  gunicorn -c gunicorn.conf.py app.main:app
+
+With SHARED_DATASETS_ENABLED=true the master process loads the valuation datasets
+once into shared memory before forking; workers attach to them read-only instead
+of each parsing its own copy. POST /api/v1/admin/system/datasets/reload publishes
+a new version that all workers pick up without a restart.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8003")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    from app.core.config import settings
+    if not settings.shared_datasets_enabled:
+        return
+    from app.services.data_loader import data_loader
+    data_loader.ensure_loaded()
+    server.log.info(f"Shared datasets ready (generation {data_loader.shared_generation})")
+
+
+def on_exit(server):
+    from app.core.config import settings
+    if not settings.shared_datasets_enabled:
+        return
+    from app.services.shared_datasets import shared_dataset_store
+    shared_dataset_store.unlink_all()
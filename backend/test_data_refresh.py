@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Incremental data refresh: only churn reaches the database, and unchanged runs produce no delta"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_engine
+from app.models.enhanced_crane import CraneListing
+from app.services.data_refresh_service import DataRefreshService
+
+LISTINGS = [
+    {"source": "cranetrader", "title": "2018 Liebherr LTM1100", "manufacturer": "Liebherr", "year": 2018,
+     "price": 900000, "location": "TX", "hours": 5000, "capacity_tons": 100},
+    {"source": "cranetrader", "title": "2016 Grove GMK5250", "manufacturer": "Grove", "year": 2016,
+     "price": 1500000, "location": "CA", "hours": 9000, "capacity_tons": 250},
+]
+
+
+def make_service(tmp: Path, scrapes: list) -> DataRefreshService:
+    """Refresh service on a throwaway database whose scraper replays ``scrapes`` one run at a time"""
+    service = DataRefreshService(data_path=tmp, output_path=tmp / "processed")
+    service.engine = get_engine(f"sqlite:///{tmp}/refresh.db")
+    service.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=service.engine)
+    CraneListing.__table__.create(service.engine, checkfirst=True)
+
+    async def scrape_all_marketplaces():
+        listings = scrapes.pop(0)
+        return {
+            "total_listings": len(listings),
+            "marketplaces_scraped": [{
+                "marketplace": "cranetrader", "listings": listings, "listings_found": len(listings),
+                "success": True, "complete": True,
+            }],
+            "errors": [],
+        }
+
+    service.scraping_service.scrape_all_marketplaces = scrape_all_marketplaces
+    return service
+
+
+def step(results: dict, name: str) -> dict:
+    return next(s for s in results["steps_completed"] if s["step"] == name)
+
+
+def test_incremental_refresh():
+    """A second run of unchanged listings writes no delta and touches no rows"""
+    print("=" * 80)
+    print("Incremental data refresh")
+    print("=" * 80)
+    repriced = [dict(LISTINGS[0], price=850000), LISTINGS[1]]
+    with tempfile.TemporaryDirectory() as tmp:
+        service = make_service(Path(tmp), [LISTINGS, [dict(l) for l in LISTINGS], repriced, []])
+
+        first = asyncio.run(service.incremental_refresh())
+        assert step(first, "change_detection")["new_records"] == 2, first
+        assert step(first, "database_update")["records_inserted"] == 2, first
+        assert step(first, "database_update")["records_failed"] == 0, first
+        assert service.record_index.get_stats()["live_records"] == 2
+        print("   ✓ first run inserts every listing and advances the index")
+
+        second = asyncio.run(service.incremental_refresh())
+        detection = step(second, "change_detection")
+        assert (detection["new_records"], detection["changed_records"], detection["deleted_records"]) == (0, 0, 0), second
+        assert detection["unchanged_records"] == 2, second
+        assert len(list((Path(tmp) / "processed").glob("merged_delta_*.jsonl"))) == 1
+        assert step(second, "database_update")["records_updated"] == 0, second
+        print("   ✓ unchanged run produces an empty delta")
+
+        third = asyncio.run(service.incremental_refresh())
+        assert step(third, "change_detection")["changed_records"] == 1, third
+        assert step(third, "database_update")["records_updated"] == 1, third
+        with service.SessionLocal() as db:
+            prices = {l.title: float(l.price) for l in db.query(CraneListing)}
+        assert prices["2018 Liebherr LTM1100"] == 850000, prices
+        print("   ✓ a repriced listing is the only churn")
+
+        # A complete scrape with no listings is not a deletion source: nothing is tombstoned
+        fourth = asyncio.run(service.incremental_refresh())
+        assert step(fourth, "change_detection")["deleted_records"] == 0, fourth
+        print("   ✓ an empty scrape deletes nothing")
+
+        # The scraper raises (no scrapes left): the previous run's listings must not be merged again
+        service._last_scraping_result = {"marketplaces_scraped": [{"listings": repriced, "complete": True}]}
+        fifth = asyncio.run(service.incremental_refresh())
+        assert step(fifth, "scraping")["status"] == "failed", fifth
+        assert step(fifth, "change_detection")["unchanged_records"] == 0, fifth
+        print("   ✓ a failed scrape does not replay the previous results")
+
+
+if __name__ == "__main__":
+    try:
+        test_incremental_refresh()
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Fleet valuation: identical specs are valued once and in-flight valuations stay within max_in_flight"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.fleet_valuation import FleetValuationExecutor
+
+
+class CountingEngine:
+    """Stands in for the valuation engine and records how many valuations overlap"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def value_crane_offloaded(self, specs, executor):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return specs.capacity_tons
+        finally:
+            self.in_flight -= 1
+
+
+def make_fleet(distinct: int, copies: int) -> list:
+    """CraneSpecs-shaped units (the engine is faked, so the real dataclass is not needed)"""
+    return [
+        SimpleNamespace(manufacturer="Liebherr", model="LTM1100", year=2018, capacity_tons=100 + i,
+                        hours=5000, condition_score=0.8, region="US", price=None, location=None,
+                        boom_length_ft=None, jib_length_ft=None, counterweight_lbs=None, features=None)
+        for i in range(distinct)
+        for _ in range(copies)
+    ]
+
+
+def test_bounded_in_flight():
+    """A 200-unit fleet with 50 distinct specs runs 50 valuations, never more than max_in_flight at once"""
+    print("=" * 80)
+    print("Fleet valuation concurrency")
+    print("=" * 80)
+    executor = FleetValuationExecutor(max_workers=2, max_in_flight=3)
+    engine = CountingEngine()
+    fleet = make_fleet(distinct=50, copies=4)
+    try:
+        results = asyncio.run(executor.value_fleet(engine, fleet))
+    finally:
+        executor.shutdown()
+
+    assert engine.calls == 50, engine.calls
+    print("   ✓ identical units are valued once")
+    assert engine.peak == 3, engine.peak
+    print(f"   ✓ peak in-flight valuations {engine.peak} (max_in_flight 3)")
+    assert [result for result, _ in results] == [specs.capacity_tons for specs in fleet]
+    assert all(error is None for _, error in results)
+    print("   ✓ every unit gets its group's result in fleet order")
+
+
+def test_early_close_cancels():
+    """A client that stops reading leaves nothing running and nothing queued"""
+    executor = FleetValuationExecutor(max_workers=2, max_in_flight=4)
+    engine = CountingEngine()
+
+    async def read_one():
+        stream = executor.iter_valuations(engine, make_fleet(distinct=20, copies=1))
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+
+    try:
+        asyncio.run(read_one())
+    finally:
+        executor.shutdown()
+    assert engine.in_flight == 0, engine.in_flight
+    assert engine.calls <= 5, engine.calls
+    print(f"   ✓ closing the stream early cancels in-flight work ({engine.calls} of 20 started)")
+
+
+if __name__ == "__main__":
+    try:
+        test_bounded_in_flight()
+        test_early_close_cancels()
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Raw-SQL aggregates must run on the primary engine, which has the SQL injection guard attached"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Each probe runs in a fresh interpreter against a throwaway SQLite database, so the
+# guarded `engine` in app.core.database is the one executing the queries
+SETUP = """
+import logging
+from app.core.database import engine
+from app.models.crane import Crane
+Crane.__table__.create(engine, checkfirst=True)
+with engine.begin() as conn:
+    conn.exec_driver_sql(
+        "INSERT INTO cranes (manufacturer, model, year, capacity_tons, hours, price, location, created_at) VALUES "
+        "('Liebherr', 'LTM1100', 2018, 100, 5000, 900000, 'TX', CURRENT_TIMESTAMP), "
+        "('Grove', 'GMK5250', 2016, 250, 9000, 1500000, 'CA', CURRENT_TIMESTAMP), "
+        "('Grove', 'RT540', 2012, 40, 2000, 300000, NULL, CURRENT_TIMESTAMP)"
+    )
+# The pattern pre-check flags a query before the full detector runs (which needs the
+# security module's dependencies); either verdict means production would block it
+blocked = []
+class _Blocked(logging.Handler):
+    def emit(self, record):
+        message = record.getMessage()
+        if "suspicious pattern" in message or "Blocked query" in message:
+            blocked.append(message)
+logging.getLogger("app.core.database").addHandler(_Blocked())
+"""
+
+PROBES = {
+    "market stats snapshot": """
+from app.services.market_stats import market_stats
+data = market_stats.refresh().data
+assert data["total_listings"] == 3, data
+assert [g["label"] for g in data["manufacturers"]] == ["Grove", "Liebherr"], data["manufacturers"]
+assert [g["label"] for g in data["capacity_ranges"]] == ["<100T", "100-200T", "200-300T"], data["capacity_ranges"]
+assert {g["label"] for g in data["locations"]} == {"TX", "CA"}, data["locations"]
+# Sample deviation, as the baseline's PostgreSQL stddev(price): statistics.stdev([900000, 1500000, 300000])
+assert data["price_stddev"] == 600000.0, data["price_stddev"]
+""",
+    "table stats top values": """
+from sqlalchemy import event, inspect
+from app.core.database import SessionLocal
+from app.services.table_stats_service import table_stats_engine
+columns = inspect(engine).get_columns("cranes")
+statements = []
+event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+with SessionLocal() as db:
+    stats = table_stats_engine.get_table_stats(db, "cranes", columns, refresh=True)["column_stats"]
+# One scan for the aggregates, one for the top values of every text column
+assert len(statements) == 2, statements
+assert stats["manufacturer"]["most_common_values"][0] == {"value": "Grove", "count": 2}, stats["manufacturer"]
+assert len(stats["location"]["most_common_values"]) == 2, stats["location"]
+assert stats["price"]["max_value"] == 1500000, stats["price"]
+""",
+    "schema row estimates": """
+from app.core.schema_cache import schema_cache
+with engine.connect() as conn:
+    estimates = schema_cache.row_estimates(conn)
+assert estimates["cranes"] == {"rows": 3, "size_bytes": None, "estimated": False}, estimates
+""",
+    "schema engine isolation": """
+from sqlalchemy import event
+from app.core.database import get_schema_engine, receive_before_cursor_execute
+schema_engine = get_schema_engine()
+assert schema_engine is not engine and schema_engine.pool is engine.pool
+assert event.contains(engine, "before_cursor_execute", receive_before_cursor_execute)
+assert not event.contains(schema_engine, "before_cursor_execute", receive_before_cursor_execute)
+""",
+    "spec catalog setup and matching": """
+from app.services.specs_catalog_service import SpecsCatalogService
+catalog = SpecsCatalogService()
+assert catalog.engine is engine
+spec = dict.fromkeys(["source_url", "last_seen", "variant", "year_from", "year_to", "boom_length_ft", "jib_options_ft",
+                      "counterweight_lbs", "engine", "dimensions", "features", "pdf_specs", "raw_data"])
+spec.update(spec_id="s1", source="test", make="Liebherr", model="LTM1100-5.2", capacity_tons=100, spec_hash="h1")
+assert catalog.upsert_spec(spec)
+listing = {"manufacturer": "Liebherr", "title": "2016 Liebherr LTM1100", "capacity_tons": 100}
+assert catalog.enrich_crane_listing(listing)["spec_data"]["spec_id"] == "s1"
+assert catalog.enrich_crane_listings([listing])[0]["spec_data"]["spec_id"] == "s1"
+assert [s["spec_id"] for s in catalog.search_specs("LTM1100")] == ["s1"]
+""",
+}
+
+
+def run_probe(name: str, body: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/guarded.db"}
+        result = subprocess.run(
+            [sys.executable, "-c", SETUP + body + "\nassert not blocked, blocked\n"],
+            cwd=str(Path(__file__).parent),
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+    if result.returncode != 0:
+        raise AssertionError(f"{name} failed through the guarded engine:\n{result.stderr[-2000:]}")
+
+
+def test_guarded_queries():
+    """Every raw-SQL aggregate passes the injection guard and returns the expected rows"""
+    print("=" * 80)
+    print("Raw-SQL aggregates through the guarded engine")
+    print("=" * 80)
+    for name, body in PROBES.items():
+        run_probe(name, body)
+        print(f"   ✓ {name}")
+
+
+if __name__ == "__main__":
+    try:
+        test_guarded_queries()
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Cold-start budget: importing the app must stay under STARTUP_BUDGET_SECONDS and leave heavy subsystems unloaded"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+
+# Packages only deferred routers / first use should load
+DEFERRED_PACKAGES = ("pandas", "plotly", "reportlab", "boto3", "bs4")
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+from app.services.data_loader import data_loader
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": len(sys.modules),
+    "loaded": [name for name in %r if name in sys.modules],
+    "datasets_loaded": data_loader.loaded,
+    "routers": app.main.routers.get_stats(),
+}))
+"""
+
+
+def measure_cold_start(runs: int = 3) -> dict:
+    """Best of ``runs`` fresh-interpreter imports of app.main"""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE % (DEFERRED_PACKAGES,)],
+            cwd=str(Path(__file__).parent),
+            capture_output=True,
+            text=True,
+            env={**os.environ, "STARTUP_PROFILE": "false"},
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing app.main failed:\n{result.stderr[-2000:]}")
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or sample["seconds"] < best["seconds"]:
+            best = sample
+    return best
+
+
+def test_cold_start_budget():
+    """App import stays within the configured budget and defers heavy subsystems"""
+    print("=" * 80)
+    print("Cold-start budget")
+    print("=" * 80)
+    sample = measure_cold_start()
+    budget = settings.startup_budget_seconds
+    print(f"   Import time: {sample['seconds']:.2f}s (budget {budget:.2f}s), {sample['modules']} modules")
+    print(f"   Deferred routers: {', '.join(sample['routers']['deferred']) or 'none'}")
+    assert sample["seconds"] <= budget, f"app.main took {sample['seconds']:.2f}s to import (budget {budget:.2f}s)"
+    print("   ✓ Within budget")
+    assert not sample["loaded"], f"Loaded at startup although deferred: {sample['loaded']}"
+    print("   ✓ Heavy packages not loaded at import")
+    assert not sample["datasets_loaded"], "Valuation datasets were loaded at import time"
+    print("   ✓ Valuation datasets load lazily")
+
+
+if __name__ == "__main__":
+    try:
+        test_cold_start_budget()
+    except (AssertionError, RuntimeError) as e:
+        print(f"   ❌ {e}")
+        sys.exit(1)
+    sys.exit(0)